@@ -0,0 +1,229 @@
+"""Model backends behind call_json / stream_json.
+
+``LLM_BACKEND`` picks one per process:
+
+- ``openai`` (default): the Responses API (``ai.client.OpenAIBackend``).
+- ``record`` / ``replay``: answers stored under ``LLM_REPLAY_PATH``, one JSON file per request
+  hash. ``record`` asks OpenAI for requests it has not seen and stores the reply. ``replay``
+  never goes online and raises ReplayMiss for unknown requests.
+- ``stub``: deterministic, schema-valid JSON generated from the request's schema, with
+  ``LLM_STUB_LATENCY_MS`` (± ``LLM_STUB_JITTER_MS``) latency and an ``LLM_STUB_ERROR_RATE``
+  share of failures, for load tests without network access.
+
+Backends return the reply text; retries, deadlines, the breaker and the response cache stay in
+ai.client.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass
+from datetime import date, timedelta
+from functools import cached_property
+from typing import Any, AsyncIterator, Dict, Iterator
+
+from .cache import make_key
+
+DEFAULT_REPLAY_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "llm_replay")
+
+
+@dataclass(frozen=True)
+class LLMRequest:
+    model: str
+    input: str
+    schema: Dict[str, Any]
+    temperature: float
+    max_tokens: int
+
+    @cached_property
+    def key(self) -> str:
+        return make_key(model=self.model, input=self.input, schema=self.schema,
+                        temperature=self.temperature, max_tokens=self.max_tokens)
+
+
+class Backend:
+    """Blocking ``complete`` is required; the async and streaming forms default to it."""
+
+    name = "base"
+
+    def cache_model(self, model: str) -> str:
+        """Model name used in response cache keys, so answers of different backends never mix."""
+        return model
+
+    def complete(self, request: LLMRequest, timeout: float) -> str:
+        raise NotImplementedError
+
+    async def acomplete(self, request: LLMRequest, timeout: float) -> str:
+        return await asyncio.to_thread(self.complete, request, timeout)
+
+    def stream(self, request: LLMRequest, timeout: float) -> Iterator[str]:
+        yield self.complete(request, timeout)
+
+    async def astream(self, request: LLMRequest, timeout: float) -> AsyncIterator[str]:
+        yield await self.acomplete(request, timeout)
+
+
+class ReplayMiss(LookupError):
+    pass
+
+
+class ReplayBackend(Backend):
+    def __init__(self, path: str, record: bool, inner: Backend):
+        self.path = path
+        self.record = record
+        self.inner = inner
+        self.name = "record" if record else "replay"
+
+    def _file(self, request: LLMRequest) -> str:
+        return os.path.join(self.path, request.key + ".json")
+
+    def _load(self, request: LLMRequest) -> str | None:
+        try:
+            with open(self._file(request), encoding="utf-8") as f:
+                return json.load(f)["output"]
+        except FileNotFoundError:
+            return None
+
+    def _store(self, request: LLMRequest, output: str) -> None:
+        os.makedirs(self.path, exist_ok=True)
+        target = self._file(request)
+        tmp = f"{target}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            # the prompt is kept for reading recordings; lookups only use the file name
+            json.dump({"model": request.model, "input": request.input, "output": output}, f, ensure_ascii=False, indent=1)
+        os.replace(tmp, target)
+
+    def _miss(self, request: LLMRequest) -> ReplayMiss:
+        return ReplayMiss(f"no recorded response for request {request.key[:12]} in {self.path}")
+
+    def complete(self, request: LLMRequest, timeout: float) -> str:
+        output = self._load(request)
+        if output is None:
+            if not self.record:
+                raise self._miss(request)
+            output = self.inner.complete(request, timeout)
+            self._store(request, output)
+        return output
+
+    async def acomplete(self, request: LLMRequest, timeout: float) -> str:
+        output = await asyncio.to_thread(self._load, request)
+        if output is None:
+            if not self.record:
+                raise self._miss(request)
+            output = await self.inner.acomplete(request, timeout)
+            await asyncio.to_thread(self._store, request, output)
+        return output
+
+
+class StubError(RuntimeError):
+    pass
+
+
+_NAMES = ("milk", "eggs", "rice", "tomatoes", "spinach", "chicken breast", "yoghurt", "bread", "onions", "cheddar")
+_UNITS = ("g", "ml", "pcs", "kg", "l")
+
+
+def fake_json(schema: Dict[str, Any], rng: random.Random, items: int = 3, key: str = "") -> Any:
+    """A value that satisfies ``schema`` (the subset the prompts use); every property is filled."""
+    if "enum" in schema:
+        return rng.choice(schema["enum"])
+    kind = schema.get("type") or ("object" if "properties" in schema else "string")
+    if kind == "object":
+        return {k: fake_json(v, rng, items, k) for k, v in schema.get("properties", {}).items()}
+    if kind == "array":
+        return [fake_json(schema.get("items", {}), rng, items, key) for _ in range(items)]
+    if kind == "integer":
+        return rng.randint(1, 7)
+    if kind == "number":
+        return round(rng.uniform(0.5, 5), 1)
+    if kind == "boolean":
+        return rng.random() < 0.5
+    if key == "name":
+        return rng.choice(_NAMES)
+    if key == "unit":
+        return rng.choice(_UNITS)
+    if key.endswith("date"):
+        return (date.today() + timedelta(days=rng.randint(1, 14))).isoformat()
+    return f"{key or 'text'} {rng.randint(1, 99)}"
+
+
+class StubBackend(Backend):
+    name = "stub"
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0,
+                 items: int = 3, token_delay: float = 0.0, chunk_chars: int = 16, seed: int = 0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.items = items
+        self.token_delay = token_delay
+        self.chunk_chars = chunk_chars
+        self._rng = random.Random(seed)  # latency and failures; replies are seeded per request
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "StubBackend":
+        return cls(
+            latency=float(os.getenv("LLM_STUB_LATENCY_MS", "0")) / 1000,
+            jitter=float(os.getenv("LLM_STUB_JITTER_MS", "0")) / 1000,
+            error_rate=float(os.getenv("LLM_STUB_ERROR_RATE", "0")),
+            items=int(os.getenv("LLM_STUB_ARRAY_ITEMS", "3")),
+            token_delay=float(os.getenv("LLM_STUB_TOKEN_MS", "0")) / 1000,
+            seed=int(os.getenv("LLM_STUB_SEED", "0")),
+        )
+
+    def cache_model(self, model: str) -> str:
+        return f"stub/{model}"
+
+    def reply(self, request: LLMRequest) -> str:
+        rng = random.Random(request.key)
+        return json.dumps(fake_json({"type": "object", **request.schema}, rng, self.items), ensure_ascii=False)
+
+    def _draw(self, timeout: float) -> tuple[float, str | None]:
+        """(seconds to wait, error to raise after waiting or None)."""
+        with self._lock:
+            delay = max(0.0, self.latency + self._rng.uniform(-self.jitter, self.jitter))
+            failed = self._rng.random() < self.error_rate
+        if delay > timeout:
+            return timeout, "stub model timed out"
+        return delay, "stub model failure" if failed else None
+
+    def _chunks(self, text: str) -> list[str]:
+        return [text[i:i + self.chunk_chars] for i in range(0, len(text), self.chunk_chars)]
+
+    def complete(self, request: LLMRequest, timeout: float) -> str:
+        delay, error = self._draw(timeout)
+        time.sleep(delay)
+        if error:
+            raise StubError(error)
+        return self.reply(request)
+
+    async def acomplete(self, request: LLMRequest, timeout: float) -> str:
+        delay, error = self._draw(timeout)
+        await asyncio.sleep(delay)
+        if error:
+            raise StubError(error)
+        return self.reply(request)
+
+    def stream(self, request: LLMRequest, timeout: float) -> Iterator[str]:
+        # latency is the time to the first chunk; LLM_STUB_TOKEN_MS paces the rest
+        delay, error = self._draw(timeout)
+        time.sleep(delay)
+        if error:
+            raise StubError(error)
+        for chunk in self._chunks(self.reply(request)):
+            yield chunk
+            time.sleep(self.token_delay)
+
+    async def astream(self, request: LLMRequest, timeout: float) -> AsyncIterator[str]:
+        delay, error = self._draw(timeout)
+        await asyncio.sleep(delay)
+        if error:
+            raise StubError(error)
+        for chunk in self._chunks(self.reply(request)):
+            yield chunk
+            await asyncio.sleep(self.token_delay)
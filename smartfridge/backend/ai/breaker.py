@@ -0,0 +1,121 @@
+"""Circuit breaker for calls to the model.
+
+After ``LLM_BREAKER_FAILURES`` consecutive upstream failures (timeouts, connection errors, 5xx,
+429) the breaker opens: calls fail at once with ``CircuitOpen`` so callers go straight to their
+local fallbacks instead of waiting out a timeout. After ``LLM_BREAKER_COOLDOWN`` seconds one
+call is let through as a probe (half-open); its success closes the breaker, its failure opens it
+for another cooldown. State is per process.
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class CircuitOpen(RuntimeError):
+    def __init__(self, retry_after: float):
+        super().__init__(f"model temporarily unavailable (circuit open, retry in {retry_after:.0f}s)")
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    def __init__(self, failures: int, cooldown: float, is_failure: Callable[[BaseException], bool] = lambda e: True,
+                 ignore: tuple[type[BaseException], ...] = ()):
+        self.failures = failures
+        self.cooldown = cooldown
+        self.is_failure = is_failure
+        self.ignore = ignore
+        self._lock = threading.Lock()
+        self.state = CLOSED
+        self.consecutive = 0
+        self.opened_at: float | None = None
+        self._probing = False
+        self.counters = {"calls": 0, "successes": 0, "failures": 0, "rejected": 0, "opened": 0, "probes": 0}
+
+    def retry_after(self) -> float:
+        if self.state == CLOSED or self.opened_at is None:
+            return 0.0
+        return max(0.0, self.opened_at + self.cooldown - time.monotonic())
+
+    def _admit(self) -> bool:
+        """Let a call through or raise CircuitOpen; True when the call is the half-open probe."""
+        with self._lock:
+            if self.state == OPEN and self.retry_after() <= 0:
+                self.state = HALF_OPEN
+            if self.state == CLOSED:
+                self.counters["calls"] += 1
+                return False
+            if self.state == HALF_OPEN and not self._probing:
+                self._probing = True
+                self.counters["calls"] += 1
+                self.counters["probes"] += 1
+                return True
+            self.counters["rejected"] += 1
+            raise CircuitOpen(self.retry_after() or 1.0)  # half-open: the probe decides shortly
+
+    def _record(self, ok: bool, probe: bool) -> None:
+        with self._lock:
+            if probe:
+                self._probing = False
+            if ok:
+                self.counters["successes"] += 1
+                self.consecutive = 0
+                if probe or self.state == HALF_OPEN:
+                    self.state, self.opened_at = CLOSED, None
+                return
+            self.counters["failures"] += 1
+            self.consecutive += 1
+            if probe or (self.state == CLOSED and self.consecutive >= self.failures):
+                self.state, self.opened_at = OPEN, time.monotonic()
+                self.counters["opened"] += 1
+
+    def _release(self, probe: bool) -> None:
+        if probe:
+            with self._lock:
+                self._probing = False
+
+    @contextmanager
+    def guard(self) -> Iterator[None]:
+        """Wrap one upstream call; errors that are not upstream failures count as answers, and
+        ``ignore`` errors (raised before the upstream was reached) count as nothing."""
+        probe = self._admit()
+        try:
+            yield
+        except self.ignore:
+            self._release(probe)
+            raise
+        except Exception as e:
+            self._record(not self.is_failure(e), probe)
+            raise
+        except BaseException:
+            # cancelled or closed early (client went away): no verdict on the upstream
+            self._release(probe)
+            raise
+        else:
+            self._record(True, probe)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                # an open breaker past its cooldown lets the next call probe
+                "state": HALF_OPEN if self.state == OPEN and self.retry_after() <= 0 else self.state,
+                "consecutive_failures": self.consecutive,
+                "retry_after": round(self.retry_after(), 1),
+                "failure_threshold": self.failures,
+                "cooldown": self.cooldown,
+                **self.counters,
+            }
+
+
+def from_env(is_failure: Callable[[BaseException], bool], ignore: tuple[type[BaseException], ...] = ()) -> CircuitBreaker:
+    return CircuitBreaker(
+        failures=int(os.getenv("LLM_BREAKER_FAILURES", "5")),
+        cooldown=float(os.getenv("LLM_BREAKER_COOLDOWN", "30")),
+        is_failure=is_failure,
+        ignore=ignore,
+    )
@@ -0,0 +1,186 @@
+"""Two-tier cache for structured LLM responses.
+
+Tier 1 is a per-process LRU (``LLM_CACHE_MEMORY_SIZE`` entries). Tier 2 is a small SQLite file
+(``LLM_CACHE_PATH``) shared by every worker on the host, bounded to ``LLM_CACHE_MAX_ENTRIES``
+rows (least recently used are evicted). Both honour ``LLM_CACHE_TTL`` seconds. Set
+``LLM_CACHE_ENABLED=0`` to turn caching off, or ``LLM_CACHE_PATH=`` to keep only the memory tier.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+_DEFAULT_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "llm_cache.sqlite3")
+
+
+def _enabled() -> bool:
+    return os.getenv("LLM_CACHE_ENABLED", "1").lower() in {"1", "true", "yes"}
+
+
+def _ttl() -> int:
+    return int(os.getenv("LLM_CACHE_TTL", "3600"))
+
+
+def make_key(**parts: Any) -> str:
+    """Stable hash of everything that determines a response (model, prompt, schema, sampling)."""
+    raw = json.dumps(parts, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    def __init__(self, path: Optional[str], memory_size: int, max_entries: int):
+        self.path = path
+        self.memory_size = memory_size
+        self.max_entries = max_entries
+        self._memory: "OrderedDict[str, tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.counters = {"memory_hits": 0, "store_hits": 0, "misses": 0, "stores": 0, "bypassed": 0}
+
+    # -- tier 2 -------------------------------------------------------------------------------
+
+    def _db(self) -> Optional[sqlite3.Connection]:
+        if not self.path:
+            return None
+        conn = getattr(self._local, "conn", None)
+        # connections must not cross a fork (gunicorn preload) or a thread
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                " key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL, used_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS llm_cache_used_at ON llm_cache (used_at)")
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def _store_get(self, key: str, now: float) -> Optional[tuple[float, Dict[str, Any]]]:
+        try:
+            db = self._db()
+            if db is None:
+                return None
+            row = db.execute("SELECT value, expires_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if row[1] <= now:
+                db.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                return None
+            db.execute("UPDATE llm_cache SET used_at = ? WHERE key = ?", (now, key))
+            return row[1], json.loads(row[0])
+        except sqlite3.Error:
+            return None  # the cache must never break a request
+
+    def _store_put(self, key: str, value: Dict[str, Any], expires_at: float, now: float) -> None:
+        try:
+            db = self._db()
+            if db is None:
+                return
+            db.execute(
+                "INSERT INTO llm_cache (key, value, expires_at, used_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at, used_at = excluded.used_at",
+                (key, json.dumps(value, ensure_ascii=False), expires_at, now),
+            )
+            # bounded size: drop expired rows, then the least recently used overflow
+            db.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (now,))
+            db.execute(
+                "DELETE FROM llm_cache WHERE key IN ("
+                " SELECT key FROM llm_cache ORDER BY used_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+        except sqlite3.Error:
+            pass
+
+    # -- public API ---------------------------------------------------------------------------
+
+    def _remember(self, key: str, expires_at: float, value: Dict[str, Any]) -> None:
+        with self._lock:
+            self._memory[key] = (expires_at, value)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_size:
+                self._memory.popitem(last=False)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with self._lock:
+            hit = self._memory.get(key)
+            if hit is not None and hit[0] > now:
+                self._memory.move_to_end(key)
+                self.counters["memory_hits"] += 1
+                return hit[1]
+            if hit is not None:
+                del self._memory[key]
+        stored = self._store_get(key, now)
+        if stored is not None:
+            self._remember(key, *stored)
+            with self._lock:
+                self.counters["store_hits"] += 1
+            return stored[1]
+        with self._lock:
+            self.counters["misses"] += 1
+        return None
+
+    def set(self, key: str, value: Dict[str, Any], ttl: Optional[int] = None) -> None:
+        now = time.time()
+        expires_at = now + (ttl if ttl is not None else _ttl())
+        self._remember(key, expires_at, value)
+        self._store_put(key, value, expires_at, now)
+        with self._lock:
+            self.counters["stores"] += 1
+
+    def note_bypass(self) -> None:
+        with self._lock:
+            self.counters["bypassed"] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+        try:
+            db = self._db()
+            if db is not None:
+                db.execute("DELETE FROM llm_cache")
+        except sqlite3.Error:
+            pass
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            data = dict(self.counters, enabled=True, memory_entries=len(self._memory))
+        lookups = data["memory_hits"] + data["store_hits"] + data["misses"]
+        data["hit_rate"] = round((data["memory_hits"] + data["store_hits"]) / lookups, 3) if lookups else None
+        try:
+            db = self._db()
+            data["store_entries"] = db.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0] if db is not None else None
+        except sqlite3.Error:
+            data["store_entries"] = None
+        return data
+
+
+_cache: Optional[ResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> Optional[ResponseCache]:
+    """The process-wide cache, or None when caching is disabled."""
+    global _cache
+    if not _enabled():
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ResponseCache(
+                    path=os.getenv("LLM_CACHE_PATH", _DEFAULT_PATH) or None,
+                    memory_size=int(os.getenv("LLM_CACHE_MEMORY_SIZE", "256")),
+                    max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "5000")),
+                )
+    return _cache
+
+
+def stats() -> Dict[str, Any]:
+    cache = get_cache()
+    return cache.stats() if cache is not None else {"enabled": False}
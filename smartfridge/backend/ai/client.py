@@ -1,58 +1,261 @@
+import asyncio
+import copy
 import json
 import os
+import random
+import time
+import weakref
 from dataclasses import dataclass
-from typing import Any, Dict
+from typing import Any, AsyncIterator, Dict, Iterator
 import re
+import threading
 from datetime import date, timedelta
 
-from openai import OpenAI
+from openai import APIStatusError, AsyncOpenAI, DefaultAsyncHttpxClient, DefaultHttpxClient, OpenAI
 
+# openai>=1.x is built on httpx; newer SDK lines ship the httpx2 fork instead
+try:
+    import httpx2 as httpx
+except ImportError:  # pragma: no cover
+    import httpx
 
-def _client() -> OpenAI:
-    api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key:
-        raise RuntimeError("OPENAI_API_KEY is not set in environment")
-    base_url = os.getenv("OPENAI_BASE_URL")
-    kwargs = {"api_key": api_key}
+from . import backends, breaker as _breaker
+from .backends import Backend, LLMRequest, ReplayBackend, ReplayMiss, StubBackend
+from .breaker import CircuitOpen
+from .cache import get_cache, make_key
+from .context import InventoryContext, build_context
+from .json_stream import ArrayItemStream
+
+
+_client_lock = threading.Lock()
+_shared: dict = {"client": None, "pid": None, "config": None}
+# AsyncOpenAI clients per event loop: an async connection pool cannot be shared across loops
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, tuple]" = weakref.WeakKeyDictionary()
+
+
+def _forget_client() -> None:
+    # After fork the child must not reuse the parent's sockets. Drop the reference without
+    # closing it: closing would tear down connections the parent is still using.
+    _shared.update(client=None, pid=None, config=None)
+    _async_clients.clear()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_forget_client)
+
+
+def _client_options(max_connections: int) -> tuple[Any, Any, Dict[str, Any]]:
+    timeout = httpx.Timeout(
+        float(os.getenv("OPENAI_TIMEOUT", "60")),
+        connect=float(os.getenv("OPENAI_CONNECT_TIMEOUT", "5")),
+    )
+    limits = httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=int(os.getenv("OPENAI_MAX_KEEPALIVE", "10")),
+        keepalive_expiry=float(os.getenv("OPENAI_KEEPALIVE_EXPIRY", "60")),
+    )
+    kwargs = {"timeout": timeout, "max_retries": int(os.getenv("OPENAI_MAX_RETRIES", "2"))}
+    return timeout, limits, kwargs
+
+
+def _build_client(api_key: str, base_url: str | None) -> OpenAI:
+    """A new client with a bounded keep-alive pool and explicit timeouts."""
+    timeout, limits, kwargs = _client_options(int(os.getenv("OPENAI_MAX_CONNECTIONS", "20")))
+    kwargs.update(api_key=api_key, http_client=DefaultHttpxClient(timeout=timeout, limits=limits))
     if base_url:
         kwargs["base_url"] = base_url
     return OpenAI(**kwargs)
 
 
+def _build_async_client(api_key: str, base_url: str | None) -> AsyncOpenAI:
+    """Like _build_client; the pool is larger because one event loop serves every request of the process."""
+    timeout, limits, kwargs = _client_options(int(os.getenv("OPENAI_ASYNC_MAX_CONNECTIONS", "256")))
+    kwargs.update(api_key=api_key, http_client=DefaultAsyncHttpxClient(timeout=timeout, limits=limits))
+    if base_url:
+        kwargs["base_url"] = base_url
+    return AsyncOpenAI(**kwargs)
+
+
+class NotConfigured(RuntimeError):
+    """The model cannot be called at all (no API key); retrying or opening the breaker won't help."""
+
+
+def _config() -> tuple[str, str | None]:
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        raise NotConfigured("OPENAI_API_KEY is not set in environment")
+    return api_key, os.getenv("OPENAI_BASE_URL") or None
+
+
+def _client() -> OpenAI:
+    """Process-wide client so calls reuse pooled connections (and TLS sessions).
+
+    Rebuilt when the process forks (gunicorn workers) or the key/base URL changes.
+    """
+    config = _config()
+    pid = os.getpid()
+    client = _shared["client"]
+    if client is not None and _shared["pid"] == pid and _shared["config"] == config:
+        return client
+    with _client_lock:
+        if _shared["client"] is None or _shared["pid"] != pid or _shared["config"] != config:
+            _shared.update(client=_build_client(*config), pid=pid, config=config)
+        return _shared["client"]
+
+
+def _async_client() -> AsyncOpenAI:
+    """AsyncOpenAI client of the running event loop (one per ASGI worker process)."""
+    config = _config()
+    loop = asyncio.get_running_loop()
+    entry = _async_clients.get(loop)
+    if entry is None or entry[0] != config:
+        with _client_lock:
+            entry = (config, _build_async_client(*config))
+            _async_clients[loop] = entry
+    return entry[1]
+
+
 def _model() -> str:
     return os.getenv("OPENAI_MODEL", "gpt-4o-mini")
 
 
-def call_json(input_text: str, schema: Dict[str, Any], temperature: float = 0.3) -> Dict[str, Any]:
-    client = _client()
+def _upstream_failure(exc: BaseException) -> bool:
+    """Timeouts, connection errors, 5xx and 429 count against the breaker and are retried; other
+    4xx are answers, and so is a request missing from a replay recording. A missing API key is
+    neither: the breaker ignores NotConfigured and it is never retried."""
+    if isinstance(exc, APIStatusError):
+        return exc.status_code >= 500 or exc.status_code == 429
+    return not isinstance(exc, (ReplayMiss, NotConfigured))
+
+
+breaker = _breaker.from_env(_upstream_failure, ignore=(NotConfigured,))
+
+# Seconds a model request may take overall, retries included; LLM_DEADLINE_<NAME> overrides.
+# Short where the caller has a local fallback to answer with instead.
+_DEADLINES = {
+    "default": 60.0,
+    "menu": 60.0,
+    "parse_items": 8.0,
+    "suggest_shopping": 12.0,
+    "assistant": 12.0,
+    "shelf_life": 8.0,
+}
+
+
+def deadline_for(name: str) -> float:
+    return float(os.getenv(f"LLM_DEADLINE_{name.upper()}", _DEADLINES[name]))
+
+
+def _timeout(seconds: float) -> Any:
+    return httpx.Timeout(seconds, connect=min(float(os.getenv("OPENAI_CONNECT_TIMEOUT", "5")), seconds))
+
+
+def _backoff(attempt: int) -> float:
+    return min(0.5 * 2 ** attempt, 8.0) * (1 - 0.25 * random.random())
+
+
+def call_json(input_text: str, schema: Dict[str, Any], temperature: float = 0.3, cache: bool = True,
+              deadline: float | None = None) -> Dict[str, Any]:
+    """Structured completion; identical requests are answered from ai.cache unless ``cache=False``.
+
+    The model call gives up after ``deadline`` seconds (``deadline_for("default")`` if None) and
+    raises CircuitOpen at once while the breaker is open.
+    """
+    request = _llm_request(input_text, schema, temperature)
+    store = get_cache()
+    key = None
+    if store is not None:
+        if cache:
+            key = _cache_key(request)
+            hit = store.get(key)
+            if hit is not None:
+                return copy.deepcopy(hit)
+        else:
+            store.note_bypass()
+
+    result = _call_json_uncached(request, deadline or deadline_for("default"))
+    # unparseable replies ({"raw": ...}) are not worth replaying
+    if key is not None and isinstance(result, dict) and "raw" not in result:
+        store.set(key, copy.deepcopy(result))
+    return result
+
+
+def _llm_request(input_text: str, schema: Dict[str, Any], temperature: float) -> LLMRequest:
     max_tokens = int(os.getenv("OPENAI_MAX_OUTPUT_TOKENS", "1200"))
+    return LLMRequest(model=_model(), input=input_text, schema=schema, temperature=temperature, max_tokens=max_tokens)
 
-    try:
-        response = client.responses.create(
-            model=_model(),
-            input=input_text,
-            temperature=temperature,
-            max_output_tokens=max_tokens,
-            response_format={
-                "type": "json_schema",
-                "json_schema": {
-                    "name": "result",
-                    "schema": {"type": "object", **schema},
-                },
-            },
-        )
-        text = response.output_text
-    except TypeError:
-        # Older SDKs may not support response_format; fall back to instruction-only JSON
-        schema_text = json.dumps({"type": "object", **schema}, ensure_ascii=False)
-        fallback_prompt = input_text + "\n\nStrictly output a single JSON object that exactly matches the following JSON Schema. Do not include any extra text or explanations:\n" + schema_text
-        response = client.responses.create(
-            model=_model(),
-            input=fallback_prompt,
-            temperature=temperature,
-        )
-        text = response.output_text
 
+def _cache_key(request: LLMRequest) -> str:
+    return make_key(model=_backend().cache_model(request.model), input=request.input, schema=request.schema,
+                    temperature=request.temperature, max_tokens=request.max_tokens)
+
+
+def _call_json_uncached(request: LLMRequest, deadline: float) -> Dict[str, Any]:
+    backend = _backend()
+    stop = time.monotonic() + deadline
+    retries = int(os.getenv("OPENAI_MAX_RETRIES", "2"))
+    attempt = 0
+    while True:
+        # each attempt gets what is left of the deadline; retries are ours so they count against it
+        try:
+            with breaker.guard():
+                text = backend.complete(request, stop - time.monotonic())
+            return _parse_json_text(text)
+        except CircuitOpen:
+            raise
+        except Exception as e:
+            delay = _backoff(attempt)
+            if attempt >= retries or not _upstream_failure(e) or time.monotonic() + delay >= stop:
+                raise
+        attempt += 1
+        time.sleep(delay)
+
+
+async def acall_json(input_text: str, schema: Dict[str, Any], temperature: float = 0.3, cache: bool = True,
+                     deadline: float | None = None) -> Dict[str, Any]:
+    """call_json for async callers (AsyncOpenAI for the openai backend); shares its cache entries.
+
+    Cache lookups and stores touch the SQLite tier, so they run in a thread.
+    """
+    request = _llm_request(input_text, schema, temperature)
+    store = get_cache()
+    key = None
+    if store is not None:
+        if cache:
+            key = _cache_key(request)
+            hit = await asyncio.to_thread(store.get, key)
+            if hit is not None:
+                return copy.deepcopy(hit)
+        else:
+            store.note_bypass()
+
+    result = await _acall_json_uncached(request, deadline or deadline_for("default"))
+    if key is not None and isinstance(result, dict) and "raw" not in result:
+        await asyncio.to_thread(store.set, key, copy.deepcopy(result))
+    return result
+
+
+async def _acall_json_uncached(request: LLMRequest, deadline: float) -> Dict[str, Any]:
+    backend = _backend()
+    stop = time.monotonic() + deadline
+    retries = int(os.getenv("OPENAI_MAX_RETRIES", "2"))
+    attempt = 0
+    while True:
+        try:
+            with breaker.guard():
+                text = await backend.acomplete(request, stop - time.monotonic())
+            return _parse_json_text(text)
+        except CircuitOpen:
+            raise
+        except Exception as e:
+            delay = _backoff(attempt)
+            if attempt >= retries or not _upstream_failure(e) or time.monotonic() + delay >= stop:
+                raise
+        attempt += 1
+        await asyncio.sleep(delay)
+
+
+def _parse_json_text(text: str) -> Dict[str, Any]:
     try:
         return json.loads(text)
     except Exception:
@@ -67,25 +270,172 @@ def call_json(input_text: str, schema: Dict[str, Any], temperature: float = 0.3)
         return {"raw": text}
 
 
-def _fmt_item_line(it: dict) -> str:
-    name = it.get("name") or ""
-    qty = it.get("quantity")
-    unit = it.get("unit") or ""
-    exp = it.get("expiry_date")
-    if exp is not None:
-        try:
-            exp = exp.isoformat()  # datetime/date -> string
-        except Exception:
-            exp = str(exp)
-        exp_str = f" exp {exp}"
-    else:
-        exp_str = ""
-    return f"- {name} {qty}{unit}{exp_str}"
+def stream_json(input_text: str, schema: Dict[str, Any], temperature: float = 0.3, cache: bool = True,
+                deadline: float | None = None) -> Iterator[str]:
+    """Streaming form of call_json: yields the reply text as it is generated.
+
+    A cached reply is yielded as one chunk. A completed reply is parsed and stored under the
+    same key call_json uses, so streamed and blocking requests share cache entries. The whole
+    stream is one call for the breaker; ``deadline`` bounds each wait for the next chunk.
+    """
+    request = _llm_request(input_text, schema, temperature)
+    store = get_cache()
+    key = None
+    if store is not None:
+        if cache:
+            key = _cache_key(request)
+            hit = store.get(key)
+            if hit is not None:
+                yield json.dumps(hit, ensure_ascii=False)
+                return
+        else:
+            store.note_bypass()
+
+    parts = []
+    with breaker.guard():
+        for delta in _backend().stream(request, deadline or deadline_for("default")):
+            parts.append(delta)
+            yield delta
+
+    if key is not None:
+        result = _parse_json_text("".join(parts))
+        if isinstance(result, dict) and "raw" not in result:
+            store.set(key, result)
+
+
+async def astream_json(input_text: str, schema: Dict[str, Any], temperature: float = 0.3, cache: bool = True,
+                       deadline: float | None = None) -> AsyncIterator[str]:
+    """stream_json for async callers."""
+    request = _llm_request(input_text, schema, temperature)
+    store = get_cache()
+    key = None
+    if store is not None:
+        if cache:
+            key = _cache_key(request)
+            hit = await asyncio.to_thread(store.get, key)
+            if hit is not None:
+                yield json.dumps(hit, ensure_ascii=False)
+                return
+        else:
+            store.note_bypass()
+
+    parts = []
+    with breaker.guard():
+        async for delta in _backend().astream(request, deadline or deadline_for("default")):
+            parts.append(delta)
+            yield delta
+
+    if key is not None:
+        result = _parse_json_text("".join(parts))
+        if isinstance(result, dict) and "raw" not in result:
+            await asyncio.to_thread(store.set, key, result)
+
+
+def _request(request: LLMRequest) -> Dict[str, Any]:
+    return {
+        "model": request.model,
+        "input": request.input,
+        "temperature": request.temperature,
+        "max_output_tokens": request.max_tokens,
+        "response_format": {
+            "type": "json_schema",
+            "json_schema": {
+                "name": "result",
+                "schema": {"type": "object", **request.schema},
+            },
+        },
+    }
+
+
+def _instruction_request(request: LLMRequest) -> Dict[str, Any]:
+    """For SDKs without response_format: the schema goes into the prompt instead."""
+    schema_text = json.dumps({"type": "object", **request.schema}, ensure_ascii=False)
+    fallback_prompt = request.input + "\n\nStrictly output a single JSON object that exactly matches the following JSON Schema. Do not include any extra text or explanations:\n" + schema_text
+    return {"model": request.model, "input": fallback_prompt, "temperature": request.temperature}
 
 
-def build_menu_prompt(inventory: list[dict], days: int, meals_per_day: int, language: str = "zh") -> str:
-    names = ", ".join(sorted({i.get("name", "") for i in inventory if i.get("name")})) or "(no inventory)"
-    inv_text = "\n".join(_fmt_item_line(it) for it in inventory)
+class OpenAIBackend(Backend):
+    """The Responses API through the shared pooled clients (sync and per event loop)."""
+
+    name = "openai"
+
+    def complete(self, request: LLMRequest, timeout: float) -> str:
+        client = _client().with_options(timeout=_timeout(timeout), max_retries=0)
+        try:
+            response = client.responses.create(**_request(request))
+        except TypeError:
+            # Older SDKs may not support response_format; fall back to instruction-only JSON
+            response = client.responses.create(**_instruction_request(request))
+        return response.output_text
+
+    async def acomplete(self, request: LLMRequest, timeout: float) -> str:
+        client = _async_client().with_options(timeout=_timeout(timeout), max_retries=0)
+        try:
+            response = await client.responses.create(**_request(request))
+        except TypeError:
+            response = await client.responses.create(**_instruction_request(request))
+        return response.output_text
+
+    def stream(self, request: LLMRequest, timeout: float) -> Iterator[str]:
+        client = _client().with_options(timeout=_timeout(timeout))
+        try:
+            events = client.responses.create(**_request(request), stream=True)
+        except TypeError:
+            events = client.responses.create(**_instruction_request(request), stream=True)
+        with events:
+            for event in events:
+                if event.type == "response.output_text.delta":
+                    yield event.delta
+                elif event.type in ("response.failed", "error"):
+                    raise RuntimeError(getattr(event, "message", None) or "model stream failed")
+
+    async def astream(self, request: LLMRequest, timeout: float) -> AsyncIterator[str]:
+        client = _async_client().with_options(timeout=_timeout(timeout))
+        try:
+            events = await client.responses.create(**_request(request), stream=True)
+        except TypeError:
+            events = await client.responses.create(**_instruction_request(request), stream=True)
+        async with events:
+            async for event in events:
+                if event.type == "response.output_text.delta":
+                    yield event.delta
+                elif event.type in ("response.failed", "error"):
+                    raise RuntimeError(getattr(event, "message", None) or "model stream failed")
+
+
+_backends: Dict[str, Backend] = {}
+
+
+def _build_backend(name: str) -> Backend:
+    if name == "openai":
+        return OpenAIBackend()
+    if name == "stub":
+        return StubBackend.from_env()
+    if name in ("record", "replay"):
+        path = os.getenv("LLM_REPLAY_PATH") or backends.DEFAULT_REPLAY_PATH
+        return ReplayBackend(path, record=name == "record", inner=OpenAIBackend())
+    raise RuntimeError(f"unknown LLM_BACKEND {name!r} (openai, stub, record, replay)")
+
+
+def _backend() -> Backend:
+    """The process's backend for LLM_BACKEND, built on first use."""
+    name = os.getenv("LLM_BACKEND", "openai").lower()
+    backend = _backends.get(name)
+    if backend is None:
+        with _client_lock:
+            backend = _backends.setdefault(name, _build_backend(name))
+    return backend
+
+
+def _inventory_text(inventory: "list[dict] | InventoryContext") -> str:
+    """Prompt lines for the inventory; raw rows are ranked and cut to the token budget."""
+    if not isinstance(inventory, InventoryContext):
+        inventory = build_context(inventory)
+    return inventory.text
+
+
+def build_menu_prompt(inventory: "list[dict] | InventoryContext", days: int, meals_per_day: int, language: str = "zh") -> str:
+    inv_text = _inventory_text(inventory)
     lang_hint = "British English (en-GB)" if language == "en" else language
     return (
         f"You are a home meal planner. Based on the given inventory, generate a menu for {days} day(s), {meals_per_day} meal(s) per day."
@@ -171,9 +521,33 @@ PARSE_ITEMS_SCHEMA: Dict[str, Any] = {
 }
 
 
-def generate_menu(inventory: list[dict], days: int = 1, meals_per_day: int = 2, language: str = "zh") -> Dict[str, Any]:
+def generate_menu(inventory: "list[dict] | InventoryContext", days: int = 1, meals_per_day: int = 2, language: str = "zh", cache: bool = True) -> Dict[str, Any]:
+    prompt = build_menu_prompt(inventory, days, meals_per_day, language)
+    return call_json(prompt, MENU_SCHEMA, cache=cache, deadline=deadline_for("menu"))
+
+
+async def agenerate_menu(inventory: "list[dict] | InventoryContext", days: int = 1, meals_per_day: int = 2, language: str = "zh", cache: bool = True) -> Dict[str, Any]:
+    prompt = build_menu_prompt(inventory, days, meals_per_day, language)
+    return await acall_json(prompt, MENU_SCHEMA, cache=cache, deadline=deadline_for("menu"))
+
+
+def stream_menu(inventory: "list[dict] | InventoryContext", days: int = 1, meals_per_day: int = 2, language: str = "zh", cache: bool = True) -> Iterator[tuple[str, Any]]:
+    """Yields ("day", {...}) for each plan day as soon as it is complete, then ("done", full plan)."""
+    prompt = build_menu_prompt(inventory, days, meals_per_day, language)
+    plan = ArrayItemStream("plan")
+    for chunk in stream_json(prompt, MENU_SCHEMA, cache=cache, deadline=deadline_for("menu")):
+        for day in plan.feed(chunk):
+            yield "day", day
+    yield "done", _parse_json_text(plan.text)
+
+
+async def astream_menu(inventory: "list[dict] | InventoryContext", days: int = 1, meals_per_day: int = 2, language: str = "zh", cache: bool = True) -> AsyncIterator[tuple[str, Any]]:
     prompt = build_menu_prompt(inventory, days, meals_per_day, language)
-    return call_json(prompt, MENU_SCHEMA)
+    plan = ArrayItemStream("plan")
+    async for chunk in astream_json(prompt, MENU_SCHEMA, cache=cache, deadline=deadline_for("menu")):
+        for day in plan.feed(chunk):
+            yield "day", day
+    yield "done", _parse_json_text(plan.text)
 
 
 def _cn_to_number(fragment: str) -> float | None:
@@ -192,86 +566,127 @@ def _cn_to_number(fragment: str) -> float | None:
     return None
 
 
+_CN_DIGITS = "一二两三四五六七八九十半"
+_UNITS = (
+    "kg", "g", "千克", "克", "斤", "两",
+    "ml", "毫升", "l", "L",
+    "个", "块", "杯", "片", "袋", "盒", "瓶", "根", "颗", "pcs",
+)
+# A Chinese numeral followed by any single one of these characters counts as "numeral + unit"
+# (historically the units were joined into a character class, so e.g. "三kg" yields unit "k").
+_CN_UNIT_CHARS = frozenset("|".join(_UNITS))
+_SEGMENT_SEP = re.compile(r"[\n,，、;；]+")
+# One left-to-right scan finds every number and Chinese-numeral run; lookaheads capture what
+# follows each without consuming it: the text glued after a number (after optional spaces) and
+# the first non-space character after a numeral run. findall yields (number, glued, numerals, next).
+_TOKEN = re.compile(rf"(\d+(?:\.\d+)?)(?=\s*([^\d\s]*))|([{_CN_DIGITS}]+)(?=\s*(\S?))")
+_NAME_NOISE = re.compile(r"\d+(?:\.\d+)?|" + "|".join(_UNITS) + r"|\s")
+
+
+def _scan_segment(raw: str) -> tuple[float, str | None, int | None]:
+    """(quantity, unit, expiry offset in days) for one segment, from a single scan.
+
+    Rules, in precedence order:
+    - quantity: first number (its unit is the text glued after it, kept if it starts with a
+      known unit); else a Chinese numeral followed by a unit character; else a leading Chinese
+      numeral; else 1.
+    - expiry: "<digits>天" > "<numerals>天" > 明天/后天/今天 > "<digits or numeral>周".
+    """
+    first = cn_unit = None
+    day_digits = day_cn = week = None
+    for num, glued, cn, nxt in _TOKEN.findall(raw):
+        if num:
+            if first is None:
+                first = (num, glued)
+            nxt = glued[:1]
+            if nxt == "天":
+                if day_digits is None:
+                    day_digits = int(num.rpartition(".")[2])
+            elif nxt == "周" and week is None:
+                week = int(num.rpartition(".")[2])
+            continue
+        if cn_unit is None:
+            inner = cn.find("两", 1)
+            if inner > 0:
+                cn_unit = (cn[inner - 1], "两")
+            elif nxt in _CN_UNIT_CHARS:
+                cn_unit = (cn[-1], nxt)
+        if nxt == "天":
+            if day_cn is None:
+                day_cn = cn
+        elif nxt == "周" and week is None:
+            week = _cn_to_number(cn[-1]) or 1
+
+    unit = None
+    if first is not None:
+        qty = float(first[0])
+        if first[1].startswith(_UNITS):
+            unit = first[1]
+    elif cn_unit is not None:
+        qty = _cn_to_number(cn_unit[0]) or 1
+        unit = cn_unit[1]
+    elif raw[0] in _CN_DIGITS:
+        qty = _cn_to_number(raw[0]) or 1
+    else:
+        qty = 1.0
+
+    days = None
+    if day_digits is not None:
+        days = day_digits
+    elif day_cn is not None:
+        n = _cn_to_number(day_cn)
+        days = int(n) if n is not None else None
+    elif "明天" in raw:
+        days = 1
+    elif "后天" in raw:
+        days = 2
+    elif "今天" in raw:
+        days = 0
+    elif week is not None:
+        days = int(week) * 7
+    return qty, unit, days
+
+
 def _fallback_parse_items(text: str) -> list[dict]:
-    units = [
-        "kg", "g", "千克", "克", "斤", "两",
-        "ml", "毫升", "l", "L",
-        "个", "块", "杯", "片", "袋", "盒", "瓶", "根", "颗", "pcs",
-    ]
-    sep = re.compile(r"[\n,，、;；]+")
+    """Offline parser used when the model is unavailable: one item per line/comma-separated segment."""
+    today = date.today()
     items = []
-    for raw in [s.strip() for s in sep.split(text) if s.strip()]:
-        qty = None
-        unit = None
-        expiry: str | None = None
-        m = re.search(r"(\d+(?:\.\d+)?)\s*([^\d\s]*)?", raw)
-        if m:
-            try:
-                qty = float(m.group(1))
-            except Exception:
-                qty = None
-            u = (m.group(2) or "").strip()
-            if any(u.startswith(x) for x in units):
-                unit = u
-        if qty is None:
-            m2 = re.search(r"([一二两三四五六七八九十半])\s*([%s])" % "|".join(units), raw)
-            if m2:
-                qty = _cn_to_number(m2.group(1)) or 1
-                unit = m2.group(2)
-        if qty is None:
-            m3 = re.match(r"^([一二两三四五六七八九十半])+", raw)
-            if m3:
-                qty = _cn_to_number(m3.group(0)[0]) or 1
-        if qty is None:
-            qty = 1.0
-        # expiry detection: 明天/后天/\d+天内/两天后/一周内 等
-        # 1) digits: 3天内 / 3天后 / 7天
-        m_days = re.search(r"(\d+)(?:\s*)天(?:内|后)?", raw)
-        if m_days:
-            days = int(m_days.group(1))
-            expiry = (date.today() + timedelta(days=days)).isoformat()
-        else:
-            # 2) cn numerals: 三天内/两天后/十天
-            m_days_cn = re.search(r"([一二两三四五六七八九十半]+)\s*天(?:内|后)?", raw)
-            if m_days_cn:
-                cn = m_days_cn.group(1)
-                n = _cn_to_number(cn)
-                if n is not None:
-                    expiry = (date.today() + timedelta(days=int(n))).isoformat()
-            else:
-                # 3) 明天/后天/今天
-                if "明天" in raw:
-                    expiry = (date.today() + timedelta(days=1)).isoformat()
-                elif "后天" in raw:
-                    expiry = (date.today() + timedelta(days=2)).isoformat()
-                elif "今天" in raw:
-                    expiry = date.today().isoformat()
-                else:
-                    # 4) 一周内/两周内
-                    m_weeks = re.search(r"([一二两三四五六七八九十半]|\d+)\s*周(?:内|后)?", raw)
-                    if m_weeks:
-                        token = m_weeks.group(1)
-                        n = int(token) if token.isdigit() else (_cn_to_number(token) or 1)
-                        expiry = (date.today() + timedelta(days=int(n)*7)).isoformat()
-        name = re.sub(r"(\d+(?:\.\d+)?)|(" + "|".join(units) + ")|\s", "", raw)
-        name = re.sub(r"[，、,;；]*", "", name).strip()
+    for raw in _SEGMENT_SEP.split(text):
+        raw = raw.strip()
+        if not raw:
+            continue
+        name = _NAME_NOISE.sub("", raw)
         if not name:
             continue
+        qty, unit, days = _scan_segment(raw)
         item = {"name": name, "quantity": qty, "unit": unit or "pcs"}
-        if expiry:
-            item["expiry_date"] = expiry
+        if days is not None:
+            item["expiry_date"] = (today + timedelta(days=days)).isoformat()
         items.append(item)
     return items
 
 
-def parse_items_from_text(text: str) -> Dict[str, Any]:
-    prompt = (
+def build_parse_items_prompt(text: str) -> str:
+    return (
         "Parse the following text into an array of inventory items. Quantity is numeric; units like g/ml/pcs. "
         "Try to detect expiry date (YYYY-MM-DD). Output JSON only (strictly follow the schema).\n"
         "Use British English food terms and UK-style quantities when ambiguous (e.g., litres/grams).\n\n" + text
     )
+
+
+def parse_items_from_text(text: str) -> Dict[str, Any]:
+    try:
+        res = call_json(build_parse_items_prompt(text), PARSE_ITEMS_SCHEMA, deadline=deadline_for("parse_items"))
+    except Exception:
+        res = {}
+    if not isinstance(res, dict) or "items" not in res:
+        res = {"items": _fallback_parse_items(text)}
+    return res
+
+
+async def aparse_items_from_text(text: str) -> Dict[str, Any]:
     try:
-        res = call_json(prompt, PARSE_ITEMS_SCHEMA)
+        res = await acall_json(build_parse_items_prompt(text), PARSE_ITEMS_SCHEMA, deadline=deadline_for("parse_items"))
     except Exception:
         res = {}
     if not isinstance(res, dict) or "items" not in res:
@@ -279,8 +694,8 @@ def parse_items_from_text(text: str) -> Dict[str, Any]:
     return res
 
 
-def build_shopping_prompt(inventory: list[dict], days: int = 3, language: str = "en") -> str:
-    inv_lines = "\n".join(_fmt_item_line(it) for it in inventory)
+def build_shopping_prompt(inventory: "list[dict] | InventoryContext", days: int = 3, language: str = "en") -> str:
+    inv_lines = _inventory_text(inventory)
     lang_hint = "British English (en-GB)" if language == "en" else language
     return (
         f"Based on current inventory, suggest a shopping list for the next {days} day(s). "
@@ -312,16 +727,22 @@ SUGGEST_SHOPPING_SCHEMA: Dict[str, Any] = {
 }
 
 
-def suggest_shopping(inventory: list[dict], days: int = 3, language: str = "zh") -> Dict[str, Any]:
+def suggest_shopping(inventory: "list[dict] | InventoryContext", days: int = 3, language: str = "zh", cache: bool = True) -> Dict[str, Any]:
     prompt = build_shopping_prompt(inventory, days=days, language=language)
-    return call_json(prompt, SUGGEST_SHOPPING_SCHEMA)
+    return call_json(prompt, SUGGEST_SHOPPING_SCHEMA, cache=cache, deadline=deadline_for("suggest_shopping"))
 
 
-# Assistant decision: decide action + structured payload based on user message.
+async def asuggest_shopping(inventory: "list[dict] | InventoryContext", days: int = 3, language: str = "zh", cache: bool = True) -> Dict[str, Any]:
+    prompt = build_shopping_prompt(inventory, days=days, language=language)
+    return await acall_json(prompt, SUGGEST_SHOPPING_SCHEMA, cache=cache, deadline=deadline_for("suggest_shopping"))
+
+
+# Assistant decision: decide action + structured payload based on user message. For
+# suggest_shopping the items are the suggested list itself, so one call does both.
 DECISION_SCHEMA: Dict[str, Any] = {
     "properties": {
         "action": {"type": "string", "enum": [
-            "suggest_shopping",  # suggest shopping list (may include items)
+            "suggest_shopping",  # items: the suggested shopping list
             "add_shopping",      # parse text, add to shopping list
             "import_inventory",  # parse text, import into inventory
             "help"
@@ -336,6 +757,7 @@ DECISION_SCHEMA: Dict[str, Any] = {
                     "quantity": {"type": "number"},
                     "unit": {"type": "string"},
                     "expiry_date": {"type": "string"},
+                    "reason": {"type": "string"},
                 },
                 "required": ["name"],
             },
@@ -346,12 +768,14 @@ DECISION_SCHEMA: Dict[str, Any] = {
 }
 
 
-def build_assistant_prompt(message: str, inventory: list[dict], language: str = "en") -> str:
-    inv_lines = "\n".join(_fmt_item_line(it) for it in inventory)
+def build_assistant_prompt(message: str, inventory: "list[dict] | InventoryContext", language: str = "en") -> str:
+    inv_lines = _inventory_text(inventory)
     lang_hint = "British English (en-GB)" if language == "en" else language
     return (
         "You are a pantry shopping assistant. You can only perform three actions and must output structured JSON:\n"
-        "1) suggest_shopping: suggest items for the next few days (may include items).\n"
+        "1) suggest_shopping: suggest a shopping list for the next `days` days (default 3) and return it as items, "
+        "each with name, quantity, unit and a one-line reason. Avoid what the inventory already covers; prioritise "
+        "staples/dairy/produce/seasonings.\n"
         "2) add_shopping: parse user text into shopping list items.\n"
         "3) import_inventory: parse user text into inventory import items.\n"
         "Always output fields: action, items, days, reason. Do not add any extra natural language.\n\n"
@@ -360,6 +784,11 @@ def build_assistant_prompt(message: str, inventory: list[dict], language: str =
     )
 
 
-def decide_action(message: str, inventory: list[dict], language: str = "en") -> Dict[str, Any]:
+def decide_action(message: str, inventory: "list[dict] | InventoryContext", language: str = "en", cache: bool = True) -> Dict[str, Any]:
+    prompt = build_assistant_prompt(message, inventory, language)
+    return call_json(prompt, DECISION_SCHEMA, cache=cache, deadline=deadline_for("assistant"))
+
+
+async def adecide_action(message: str, inventory: "list[dict] | InventoryContext", language: str = "en", cache: bool = True) -> Dict[str, Any]:
     prompt = build_assistant_prompt(message, inventory, language)
-    return call_json(prompt, DECISION_SCHEMA)
+    return await acall_json(prompt, DECISION_SCHEMA, cache=cache, deadline=deadline_for("assistant"))
@@ -0,0 +1,136 @@
+"""Inventory context for prompts, bounded by a token budget.
+
+Large inventories used to be pasted into every prompt line by line. ``build_context`` dedupes
+rows by canonical name, ranks them (near expiry first, then items in stock that are being used,
+then by quantity) and keeps lines until ``AI_CONTEXT_TOKEN_BUDGET`` tokens are spent; the rest
+are summarised in one trailing line. Token counts are a local estimate, not a tokenizer.
+"""
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Any, Iterable, Mapping
+
+from .shelf_life import normalize_name
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count: ~4 ASCII characters per token, one token per other character.
+
+    Counted from the UTF-8 length so it stays in C: every non-ASCII character in food names is
+    CJK (3 bytes) or accented Latin (2 bytes), so the extra bytes over the character count
+    approximate twice the number of non-ASCII characters.
+    """
+    chars = len(text)
+    other = (len(text.encode("utf-8")) - chars + 1) // 2
+    return -(-(chars - other) // 4) + other
+
+
+def token_budget() -> int:
+    return int(os.getenv("AI_CONTEXT_TOKEN_BUDGET", "1500"))
+
+
+def _fmt_item_line(it: Mapping[str, Any]) -> str:
+    name = it.get("name") or ""
+    qty = it.get("quantity")
+    unit = it.get("unit") or ""
+    exp = it.get("expiry_date")
+    if exp is not None:
+        try:
+            exp = exp.isoformat()  # datetime/date -> string
+        except Exception:
+            exp = str(exp)
+        exp_str = f" exp {exp}"
+    else:
+        exp_str = ""
+    return f"- {name} {qty}{unit}{exp_str}"
+
+
+@dataclass(frozen=True)
+class InventoryContext:
+    text: str
+    included: int  # distinct items listed
+    total: int  # distinct items in the inventory
+    tokens: int  # estimated tokens of ``text``
+
+
+def _as_date(value) -> date | None:
+    if value is None or isinstance(value, date):
+        return value
+    try:
+        return date.fromisoformat(str(value)[:10])
+    except ValueError:
+        return None
+
+
+def _merge(rows: Iterable[Mapping[str, Any]]) -> list[dict]:
+    """One row per canonical name: earliest expiry, summed quantity/rate when units agree."""
+    merged: dict[str, dict] = {}
+    for row in rows:
+        key = normalize_name(row.get("name") or "")
+        if not key:
+            continue
+        row = dict(row)
+        row["expiry_date"] = _as_date(row.get("expiry_date"))
+        seen = merged.get(key)
+        if seen is None:
+            merged[key] = row
+            continue
+        if row["expiry_date"] is not None and (seen["expiry_date"] is None or row["expiry_date"] < seen["expiry_date"]):
+            seen["expiry_date"] = row["expiry_date"]
+        if (row.get("unit") or "") == (seen.get("unit") or ""):
+            seen["quantity"] = float(seen.get("quantity") or 0) + float(row.get("quantity") or 0)
+            seen["daily_rate"] = float(seen.get("daily_rate") or 0) + float(row.get("daily_rate") or 0)
+    return list(merged.values())
+
+
+def rank(rows: Iterable[Mapping[str, Any]], today: date | None = None, near_days: int = 5) -> list[dict]:
+    """Deduped rows, most relevant first."""
+    horizon = (today or date.today()) + timedelta(days=near_days)
+
+    def key(row):
+        expiry = row["expiry_date"]
+        near = expiry is not None and expiry <= horizon
+        qty = float(row.get("quantity") or 0)
+        return (
+            not near,
+            expiry if near else date.max,
+            qty <= 0,
+            -float(row.get("daily_rate") or 0),
+            -qty,
+            row.get("name") or "",
+        )
+
+    return sorted(_merge(rows), key=key)
+
+
+def build_context(rows: Iterable[Mapping[str, Any]], budget: int | None = None, today: date | None = None) -> InventoryContext:
+    """Ranked item lines within ``budget`` estimated tokens (``AI_CONTEXT_TOKEN_BUDGET`` by default).
+
+    Rows need name/quantity/unit/expiry_date; an optional ``daily_rate`` (recent consumption
+    per day) orders the in-stock items that are not about to expire.
+    """
+    budget = token_budget() if budget is None else budget
+    ranked = rank(rows, today)
+    lines: list[str] = []
+    used = 0
+    for row in ranked:
+        line = _fmt_item_line(row)
+        cost = estimate_tokens(line) + 1  # newline
+        if used + cost > budget:
+            break
+        lines.append(line)
+        used += cost
+    rest = len(ranked) - len(lines)
+    if rest:
+        # keep the tail note inside the budget, dropping listed lines if needed
+        note = f"- ... and {rest} more item(s) not listed"
+        while lines and used + estimate_tokens(note) > budget:
+            used -= estimate_tokens(lines.pop()) + 1
+            rest += 1
+            note = f"- ... and {rest} more item(s) not listed"
+        lines.append(note)
+        used += estimate_tokens(note)
+    text = "\n".join(lines)
+    return InventoryContext(text=text, included=len(ranked) - rest, total=len(ranked), tokens=estimate_tokens(text))
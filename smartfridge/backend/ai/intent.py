@@ -0,0 +1,170 @@
+"""Local intent rules for the assistant.
+
+Plain commands such as "add milk 2L to shopping" or "刚买了牛奶2盒" do not need the model: a
+handful of anchored English and Chinese patterns recognise them, and the offline item parser
+extracts the items. ``classify`` answers only when the message is unambiguous (one command,
+no question, no negation, every item name found verbatim in the text with nothing but one
+quantity beside it and no numeral or date inside it, Latin-script names measured in g/kg/ml/l
+or naming a known food, and either an explicit target such as a shopping list or the fridge,
+or a quantity on every item) and returns None otherwise, so anything doubtful still goes to
+the model.
+
+Counters (per process) show how often the fast path fires; see ``stats``.
+"""
+from __future__ import annotations
+
+import re
+import threading
+from typing import Any, Dict, Optional
+
+from .client import _CN_DIGITS, _SEGMENT_SEP, _UNITS, _fallback_parse_items
+from .shelf_life import _rules as _shelf_life_rules
+
+ADD_SHOPPING, IMPORT_INVENTORY = "add_shopping", "import_inventory"
+
+_SHOPPING_LIST = r"(?:my\s+|the\s+)?shopping(?:\s+list)?"
+_CN_SHOPPING_LIST = r"(?:购物清单|购物车|购物列表|采购清单)"
+_CN_STORE = r"(?:冰箱|冷藏室|冷冻室|库存|储物柜)"
+
+# (action, names a target, pattern); the ``items`` group is the text handed to the item parser.
+# Patterns without an explicit target ("buy ...", "买了...") only fire when every item carries a
+# quantity or unit, so "buy time" or "import my bank statement" still go to the model.
+_PATTERNS = [(action, targeted, re.compile(pattern, re.IGNORECASE)) for action, targeted, pattern in (
+    (ADD_SHOPPING, True, rf"(?:please\s+)?(?:add|put)\s+(?P<items>.+?)\s+(?:to|on|onto)\s+{_SHOPPING_LIST}"),
+    (ADD_SHOPPING, True, rf"(?:please\s+)?(?:add\s+)?(?:to\s+)?{_SHOPPING_LIST}\s*[:：]\s*(?P<items>.+)"),
+    (ADD_SHOPPING, False, r"(?:please\s+)?(?:i\s+)?(?:need\s+to\s+|have\s+to\s+)?buy\s+(?P<items>.+)"),
+    (IMPORT_INVENTORY, True, r"(?:please\s+)?(?:add|put)\s+(?P<items>.+?)\s+(?:to|in|into)\s+(?:my\s+|the\s+)?(?:fridge|freezer|pantry|inventory)"),
+    (IMPORT_INVENTORY, False, r"(?:i\s+)?(?:just\s+|have\s+)?(?:bought|purchased)\s+(?P<items>.+?)(?:\s+today)?"),
+    (IMPORT_INVENTORY, False, r"import\s*[:：]?\s*(?P<items>.+)"),
+    (ADD_SHOPPING, True, rf"(?:请|帮我)?把?(?P<items>.+?)(?:加|添加|加入|放)(?:到|进)?{_CN_SHOPPING_LIST}[里中]?"),
+    (ADD_SHOPPING, True, rf"(?:请|帮我)?(?:在|往)?{_CN_SHOPPING_LIST}[里中]?(?:加|添加|加上)(?:一下)?[:：]?(?P<items>.+)"),
+    (ADD_SHOPPING, False, r"(?:请|帮我)?(?:我)?(?:要|需要|得|记得)?(?:去)?买(?!了)(?:一?点|一?些)?(?P<items>.+)"),
+    (IMPORT_INVENTORY, True, rf"(?:请|帮我)?把?(?P<items>.+?)(?:放进|放入|放到|加到|加入|存入|存进){_CN_STORE}里?"),
+    (IMPORT_INVENTORY, False, r"(?:我)?(?:刚刚|刚|今天)?买了(?P<items>.+)"),
+    (IMPORT_INVENTORY, False, r"(?:入库|录入|导入)\s*[:：]?\s*(?P<items>.+)"),
+)]
+
+# anything that reads as a question, a request for advice, an undo or a non-item is the model's call
+_DECLINE = re.compile(
+    r"[?？]|\b(?:what|which|how|should|suggest|recommend|don'?t|not|no|remove|delete|cancel"
+    r"|nothing|anything|something|everything|none|stuff)\b"
+    r"|吗|呢|什么|啥|怎么|哪些|推荐|建议|不要|不用|没|别|删|去掉|取消|东西",
+    re.IGNORECASE,
+)
+_TRAILING = re.compile(r"[\s。.!！~]+$|\s+please$", re.IGNORECASE)
+# "和" is not a separator (和牛 is a name); a name with 和 inside is left to the model
+_ITEM_SEP = re.compile(r"\s+and\s+|\s*&\s*|还有|以及", re.IGNORECASE)
+
+# the offline parser is tuned for Chinese and folds Latin names ("milk" -> "mik"), so for
+# Latin-script items the name is the segment minus its quantity and filler words
+_EN_QUANTITY = re.compile(r"\b(?:x\s*)?\d+(?:\.\d+)?\s*(?:kg|g|ml|l|pcs|x)?\b", re.IGNORECASE)
+_EN_FILLER = frozenset({
+    "a", "an", "the", "some", "more", "of", "please",
+    "bottle", "bottles", "pack", "packs", "carton", "cartons", "can", "cans",
+    "bag", "bags", "box", "boxes", "jar", "jars", "tin", "tins",
+})
+# a Latin-script item needs a weight/volume or a name that is food ("2 tickets to Paris" is not)
+_EN_MEASURE = re.compile(r"\d(?:\.\d+)?\s*(?:kg|g|ml|l)\b", re.IGNORECASE)
+_EN_FOODS = frozenset(k for rule in _shelf_life_rules for k in rule.keywords if k.isascii()) | frozenset({
+    "butter", "cheddar", "yoghurt", "cream", "ham", "bacon", "sausage", "mince", "lamb", "salmon",
+    "tuna", "prawn", "carrot", "cucumber", "courgette", "aubergine", "broccoli", "mushroom", "garlic",
+    "ginger", "lemon", "lime", "grape", "berry", "strawberry", "avocado", "pepper", "bean", "pea",
+    "lentil", "oat", "cereal", "noodle", "biscuit", "chocolate", "honey", "jam", "salt", "sugar",
+    "coffee", "tea", "juice", "water", "wine", "beer", "rocket", "corn", "yogurt",
+})
+# a name must be the segment minus one quantity: numerals, dates and other leftovers (3天前的牛奶)
+# mean the parser guessed, so the model decides
+_NUMERAL = re.compile(
+    rf"[\d{_CN_DIGITS}]|\b(?:one|two|three|four|five|six|seven|eight|nine|ten|eleven|twelve|dozen|half)\b",
+    re.IGNORECASE,
+)
+_DATE = re.compile(
+    r"天|周|星期|礼拜|昨|今|明|号|\b(?:today|tonight|tomorrow|yesterday|days?|weeks?|months?|years?|ago"
+    r"|date|expir\w*|monday|tuesday|wednesday|thursday|friday|saturday|sunday)\b",
+    re.IGNORECASE,
+)
+_CN_QUANTITY = re.compile(
+    rf"(?:\d+(?:\.\d+)?|[{_CN_DIGITS}]+)\s*(?:{'|'.join(map(re.escape, _UNITS))})?", re.IGNORECASE
+)
+
+_lock = threading.Lock()
+_counters = {"messages": 0, "fast_path": 0, ADD_SHOPPING: 0, IMPORT_INVENTORY: 0}
+
+
+def _food(name: str) -> bool:
+    for word in name.lower().split():
+        # naive singulars: eggs, tomatoes, berries
+        if {word, word.removesuffix("s"), word.removesuffix("es"), word.removesuffix("ies") + "y"} & _EN_FOODS:
+            return True
+    return False
+
+
+def _plain(item: dict, segment: str) -> bool:
+    """The segment is the item's name plus at most one quantity, and nothing else."""
+    name = item["name"]
+    if "expiry_date" in item or _NUMERAL.search(name) or _DATE.search(name):
+        return False
+    if segment.isascii():
+        return len(_EN_QUANTITY.findall(segment)) <= 1 and (bool(_EN_MEASURE.search(segment)) or _food(name))
+    prefix, _, suffix = segment.partition(name)
+    rest = [part.strip() for part in (prefix, suffix) if part.strip()]
+    return len(rest) <= 1 and all(_CN_QUANTITY.fullmatch(part) for part in rest)
+
+
+def _items(text: str, quantified: bool) -> Optional[list[dict]]:
+    """Items of the command, or None when the parser cannot isolate a plain name in every segment
+    (or, with ``quantified``, a segment has neither a number nor a unit)."""
+    items = []
+    for segment in _SEGMENT_SEP.split(_ITEM_SEP.sub(",", text)):
+        segment = segment.strip()
+        if not segment:
+            continue
+        parsed = _fallback_parse_items(segment)
+        if len(parsed) != 1:
+            return None
+        item = parsed[0]
+        if segment.isascii():
+            words = _EN_QUANTITY.sub(" ", segment).split()
+            item["name"] = " ".join(w for w in words if w.lower() not in _EN_FILLER)
+        name = item["name"]
+        if not name or name not in segment or "和" in name[1:] or not _plain(item, segment):
+            # the parser could not isolate the name, or a numeral may belong to it (三文鱼)
+            return None
+        if quantified and item["unit"] == "pcs" and not any(ch.isdigit() for ch in segment):
+            return None
+        items.append(item)
+    return items or None
+
+
+def _match(message: str) -> Optional[Dict[str, Any]]:
+    text = _TRAILING.sub("", message.strip())
+    if not text or len(text) > 200 or "\n" in text or _DECLINE.search(text):
+        return None
+    found = [(action, targeted, m["items"]) for action, targeted, pattern in _PATTERNS if (m := pattern.fullmatch(text))]
+    if not found or len({action for action, _, _ in found}) > 1:
+        return None
+    action = found[0][0]
+    # a message several patterns match is as targeted as the most specific of them
+    targeted, raw = max(((targeted, raw) for _, targeted, raw in found), key=lambda match: match[0])
+    items = _items(raw, quantified=not targeted)
+    if items is None:
+        return None
+    return {"action": action, "items": items, "reason": "matched a local command rule", "source": "rules"}
+
+
+def classify(message: str) -> Optional[Dict[str, Any]]:
+    """An assistant decision for an unambiguous add/import command, else None (ask the model)."""
+    decision = _match(message)
+    with _lock:
+        _counters["messages"] += 1
+        if decision is not None:
+            _counters["fast_path"] += 1
+            _counters[decision["action"]] += 1
+    return decision
+
+
+def stats() -> Dict[str, Any]:
+    with _lock:
+        data = dict(_counters)
+    data["fast_path_rate"] = round(data["fast_path"] / data["messages"], 3) if data["messages"] else None
+    return data
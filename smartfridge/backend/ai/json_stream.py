@@ -0,0 +1,73 @@
+"""Pull complete elements out of a JSON document while it is still being generated.
+
+The model streams one top-level object such as ``{"days": 3, "plan": [{...}, {...}`` and we
+want each element of ``plan`` as soon as its closing brace arrives. ``ArrayItemStream`` scans
+the text once, tracking only string/escape state, nesting depth and the current top-level key,
+so feeding it chunk by chunk costs O(total length). Anything before the first ``{`` (e.g. a
+```json fence) is ignored, and a truncated tail simply yields nothing more.
+"""
+from __future__ import annotations
+
+import json
+from typing import Any, List
+
+
+class ArrayItemStream:
+    def __init__(self, key: str):
+        self.key = key
+        self.text = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = -1
+        self._last_string: str | None = None  # candidate top-level key
+        self._current_key: str | None = None
+        self._in_array = False
+        self._item_start = -1
+
+    def feed(self, chunk: str) -> List[Any]:
+        """Append a chunk; return the elements of ``key`` that completed within it."""
+        self.text += chunk
+        text = self.text
+        items = []
+        for i in range(self._pos, len(text)):
+            ch = text[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._depth == 1 and not self._in_array:
+                        try:
+                            self._last_string = json.loads(text[self._string_start:i + 1])
+                        except ValueError:
+                            self._last_string = None
+                continue
+            if ch == '"':
+                self._in_string = True
+                self._string_start = i
+            elif ch == ":" and self._depth == 1:
+                self._current_key = self._last_string
+            elif ch == "," and self._depth == 1:
+                self._current_key = self._last_string = None
+            elif ch in "{[":
+                self._depth += 1
+                if ch == "[" and self._depth == 2 and self._current_key == self.key:
+                    self._in_array = True
+                elif self._in_array and self._depth == 3:
+                    self._item_start = i
+            elif ch in "}]":
+                if self._in_array and self._depth == 3 and self._item_start >= 0:
+                    try:
+                        items.append(json.loads(text[self._item_start:i + 1]))
+                    except ValueError:
+                        pass
+                    self._item_start = -1
+                elif self._in_array and self._depth == 2:
+                    self._in_array = False
+                self._depth = max(self._depth - 1, 0)
+        self._pos = len(text)
+        return items
@@ -0,0 +1,107 @@
+"""Keyword rules compiled into one Aho-Corasick automaton.
+
+Every keyword and exclusion of every rule is a pattern of a single automaton, so classifying a
+name is one pass over its characters regardless of how many rules exist. The winning rule is
+the highest-priority one with a matched keyword and no matched exclusion, which is exactly what
+checking the rules one by one in priority order would return.
+"""
+from __future__ import annotations
+
+import json
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Iterable, Optional
+
+
+@dataclass(frozen=True)
+class Rule:
+    priority: int
+    days: int
+    category: str = ""
+    keywords: tuple[str, ...] = ()
+    exclude: tuple[str, ...] = field(default=(), compare=False)
+
+
+class RuleMatcher:
+    def __init__(self, rules: Iterable[Rule]):
+        self.rules = sorted(rules, key=lambda r: r.priority)
+        # trie over all patterns; each pattern maps to the rule indexes it triggers / vetoes
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._out: list[tuple[tuple[int, ...], tuple[int, ...]]] = [((), ())]
+        hits: dict[int, set[int]] = {}
+        vetoes: dict[int, set[int]] = {}
+        for index, rule in enumerate(self.rules):
+            for word in rule.keywords:
+                hits.setdefault(self._insert(word), set()).add(index)
+            for word in rule.exclude:
+                vetoes.setdefault(self._insert(word), set()).add(index)
+        for state in range(len(self._goto)):
+            self._out[state] = (tuple(sorted(hits.get(state, ()))), tuple(sorted(vetoes.get(state, ()))))
+        self._link()
+
+    def _insert(self, word: str) -> int:
+        state = 0
+        for ch in word.lower():
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(((), ()))
+            state = nxt
+        return state
+
+    def _link(self) -> None:
+        """Breadth-first failure links; outputs of a state include those of its suffix states."""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(ch, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                own_hits, own_vetoes = self._out[nxt]
+                sub_hits, sub_vetoes = self._out[self._fail[nxt]]
+                if sub_hits or sub_vetoes:
+                    self._out[nxt] = (own_hits + sub_hits, own_vetoes + sub_vetoes)
+
+    def match(self, text: str) -> Optional[Rule]:
+        if not text:
+            return None
+        goto, fail, out = self._goto, self._fail, self._out
+        hit: set[int] = set()
+        vetoed: set[int] = set()
+        state = 0
+        for ch in text.lower():
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            hits, vetoes = out[state]
+            if hits:
+                hit.update(hits)
+            if vetoes:
+                vetoed.update(vetoes)
+        candidates = hit - vetoed
+        return self.rules[min(candidates)] if candidates else None
+
+
+def load_rules(path: str) -> tuple[list[Rule], int]:
+    """(rules, default_days) from a JSON rule file; rules without "priority" keep file order."""
+    with open(path, encoding="utf-8") as fh:
+        data = json.load(fh)
+    rules = [
+        Rule(
+            priority=int(row.get("priority", position)),
+            days=int(row["days"]),
+            category=str(row.get("category", "")),
+            keywords=tuple(k.lower() for k in row.get("keywords", ())),
+            exclude=tuple(k.lower() for k in row.get("exclude", ())),
+        )
+        for position, row in enumerate(data.get("rules", []))
+    ]
+    return rules, int(data.get("default_days", 7))
@@ -1,82 +1,56 @@
 from __future__ import annotations
 
 import os
+import unicodedata
 from datetime import date, timedelta
-from typing import Tuple
+from typing import Dict, Optional, Protocol, Tuple
 
+from .rules import Rule, RuleMatcher, load_rules
 
-def _contains(name: str, *keywords: str) -> bool:
-    n = (name or "").lower()
-    return any(k in n for k in keywords)
+
+_RULES_PATH = os.getenv(
+    "SHELF_LIFE_RULES_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "shelf_life_rules.json")
+)
+_rules, _DEFAULT_DAYS = load_rules(_RULES_PATH)
+_matcher = RuleMatcher(_rules)
+
+
+def rule_for(name: str) -> Optional[Rule]:
+    """The first rule (by priority) matching the name, or None."""
+    return _matcher.match(name or "")
 
 
 def _rule_days(name: str) -> Tuple[int, bool]:
     """Return (days, matched_by_rule)."""
-    if not name:
-        return 7, False
-    n = name.lower()
-
-    # Dairy
-    if _contains(n, "牛奶", "milk"):
-        return 7, True
-    if _contains(n, "酸奶", "yogurt"):
-        return 14, True
-    if _contains(n, "奶酪", "芝士", "cheese"):
-        return 14, True
-
-    # Meat / seafood (fresh, refrigerated)
-    if _contains(n, "鸡胸", "鸡腿", "chicken") or ("鸡" in n and not _contains(n, "蛋")):
-        return 3, True
-    if _contains(n, "牛肉", "beef", "steak"):
-        return 3, True
-    if _contains(n, "猪肉", "pork"):
-        return 3, True
-    if _contains(n, "鱼", "fish", "虾", "shrimp"):
-        return 2, True
-    if _contains(n, "豆腐", "tofu"):
-        return 3, True
-
-    # Eggs
-    if _contains(n, "鸡蛋", "egg"):
-        return 21, True
-
-    # Bakery
-    if _contains(n, "面包", "bread", "吐司", "bun"):
-        return 3, True
-
-    # Produce
-    if _contains(n, "生菜", "菠菜", "leaf", "lettuce", "spinach"):
-        return 3, True
-    if _contains(n, "香蕉", "banana"):
-        return 3, True
-    if _contains(n, "苹果", "apple"):
-        return 14, True
-    if _contains(n, "橙", "橘", "柑", "橘子", "橙子", "orange", "citrus"):
-        return 14, True
-    if _contains(n, "番茄", "西红柿", "tomato"):
-        return 5, True
-    if _contains(n, "土豆", "马铃薯", "potato"):
-        return 21, True
-    if _contains(n, "洋葱", "onion"):
-        return 21, True
-
-    # Pantry staples (long)
-    if _contains(n, "大米", "米", "rice"):
-        return 180, True
-    if _contains(n, "面粉", "flour", "pasta", "意面"):
-        return 180, True
-    if _contains(n, "油", "oil"):
-        return 180, True
-    if _contains(n, "罐头", "canned"):
-        return 365, True
-
-    return 7, False
+    rule = rule_for(name)
+    if rule is None:
+        return _DEFAULT_DAYS, False
+    return rule.days, True
 
 
-def estimate_shelf_life_ai_days(name: str) -> int | None:
-    """Ask the model to estimate shelf-life days; return None on failure."""
+class KnowledgeStore(Protocol):
+    def lookup(self, name: str) -> Optional[Tuple[int, str]]: ...
+    def store(self, name: str, days: int, reason: str = "") -> None: ...
+    def forget(self, name: str) -> None: ...
+
+
+_knowledge: Optional[KnowledgeStore] = None
+
+
+def set_knowledge_store(store: Optional[KnowledgeStore]) -> None:
+    """Plug in persistent shelf-life knowledge (the Django app registers a DB-backed store)."""
+    global _knowledge
+    _knowledge = store
+
+
+def forget_known(name: str) -> None:
+    if _knowledge is not None:
+        _knowledge.forget(name)
+
+
+def _ask_model(name: str) -> Tuple[int, str] | None:
     try:
-        from .client import call_json
+        from .client import call_json, deadline_for
     except Exception:
         return None
 
@@ -93,24 +67,138 @@ def estimate_shelf_life_ai_days(name: str) -> int | None:
         "Output JSON only (include days and a short reason). Item: " + str(name)
     )
     try:
-        data = call_json(prompt, schema)
+        data = call_json(prompt, schema, deadline=deadline_for("shelf_life"))
         days = int(data.get("days"))
         max_days = int(os.getenv("SHELF_LIFE_AI_MAX_DAYS", "365"))
         if 1 <= days <= max_days:
-            return days
+            return days, str(data.get("reason") or "")
     except Exception:
         return None
     return None
 
 
-def estimate_days(name: str) -> int:
+def estimate_shelf_life_ai_days(name: str) -> int | None:
+    """Ask the model to estimate shelf-life days; return None on failure."""
+    answer = _ask_model(name)
+    return answer[0] if answer else None
+
+
+def _known_days(name: str) -> int | None:
+    """Manual override > rule > stored AI answer; None when only the model could say."""
+    known = _knowledge.lookup(name) if _knowledge is not None else None
+    if known is not None and known[1] == "manual":
+        return known[0]
     days, matched = _rule_days(name)
     if matched:
         return days
-    ai_days = estimate_shelf_life_ai_days(name)
-    return ai_days or days  # fallback to rule default (7)
+    if known is not None:
+        return known[0]
+    return None
+
+
+def estimate_days(name: str) -> int:
+    """Manual override > rule > stored AI answer > fresh AI answer (stored) > 7."""
+    days = _known_days(name)
+    if days is not None:
+        return days
+    answer = _ask_model(name)
+    if answer is None:
+        return _rule_days(name)[0]  # fallback to rule default (7)
+    if _knowledge is not None:
+        _knowledge.store(name, *answer)
+    return answer[0]
 
 
 def estimate_expiry_date(name: str, today: date | None = None) -> str:
     base = today or date.today()
     return (base + timedelta(days=estimate_days(name))).isoformat()
+
+
+def normalize_name(name: str) -> str:
+    """Canonical merge key: NFKC (full-width -> half-width), collapsed whitespace, case-folded.
+
+    The one definition: inventory.models uses it for InventoryItem.normalized_name, so shelf-life
+    knowledge and inventory rows are keyed alike.
+    """
+    return " ".join(unicodedata.normalize("NFKC", name or "").split()).casefold()
+
+
+def _ask_model_batch(names: list[str]) -> Dict[str, Tuple[int, str]] | None:
+    """One structured call for many names; returns key -> (days, reason), or None on failure."""
+    try:
+        from .client import call_json, deadline_for
+    except Exception:
+        return None
+
+    schema = {
+        "properties": {
+            "items": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "name": {"type": "string"},
+                        "days": {"type": "integer"},
+                        "reason": {"type": "string"},
+                    },
+                    "required": ["name", "days"],
+                },
+            },
+        },
+        "required": ["items"],
+    }
+    prompt = (
+        "Estimate edible shelf-life days (integer) for each ingredient below under common home storage. "
+        "If likely refrigerated, assume fridge; if pantry-stable (rice/oil/canned, etc.), return longer days. "
+        "Return one entry per item, echoing the item name exactly as given. Output JSON only.\nItems:\n"
+        + "\n".join(f"- {n}" for n in names)
+    )
+    try:
+        data = call_json(prompt, schema, deadline=deadline_for("shelf_life"))
+        rows = data["items"]
+    except Exception:
+        return None
+    max_days = int(os.getenv("SHELF_LIFE_AI_MAX_DAYS", "365"))
+    answers = {}
+    for row in rows if isinstance(rows, list) else []:
+        try:
+            days = int(row.get("days"))
+        except Exception:
+            continue
+        if 1 <= days <= max_days:
+            answers[normalize_name(str(row.get("name") or ""))] = (days, str(row.get("reason") or ""))
+    return answers
+
+
+def estimate_expiry_dates(names: list[str], today: date | None = None) -> Dict[str, str]:
+    """Batch form of estimate_expiry_date: name -> ISO date for every given name.
+
+    Names are deduped by canonical form and resolved locally where possible; all remaining
+    unknowns go to the model in a single call. If that call fails (or skips a name) the
+    affected names get the rule default.
+    """
+    base = today or date.today()
+    days_by_key: Dict[str, int] = {}
+    unknown: Dict[str, str] = {}  # key -> first spelling seen
+    for name in names:
+        key = normalize_name(name)
+        if key in days_by_key or key in unknown:
+            continue
+        days = _known_days(name)
+        if days is None:
+            unknown[key] = name.strip()
+        else:
+            days_by_key[key] = days
+
+    if unknown:
+        answers = _ask_model_batch(list(unknown.values())) or {}
+        for key, name in unknown.items():
+            answer = answers.get(key)
+            if answer is None:
+                days_by_key[key] = _rule_days(name)[0]
+                continue
+            days_by_key[key] = answer[0]
+            if _knowledge is not None:
+                _knowledge.store(name, *answer)
+
+    return {name: (base + timedelta(days=days_by_key[normalize_name(name)])).isoformat() for name in names}
@@ -0,0 +1,51 @@
+from django.contrib import admin
+from django.utils import timezone
+
+from ai import shelf_life
+from inventory.models import normalize_name
+
+from .models import AiJob, ShelfLifeEntry
+
+
+@admin.register(ShelfLifeEntry)
+class ShelfLifeEntryAdmin(admin.ModelAdmin):
+    list_display = ("name", "days", "source", "reason", "updated_at")
+    list_filter = ("source",)
+    list_editable = ("days",)
+    search_fields = ("name", "normalized_name", "reason")
+    readonly_fields = ("normalized_name", "created_at", "updated_at")
+    actions = ("mark_manual", "forget")
+
+    def save_model(self, request, obj, form, change):
+        # anything curated by hand becomes an override that the AI never replaces
+        obj.normalized_name = normalize_name(obj.name)
+        obj.source = "manual"
+        super().save_model(request, obj, form, change)
+        shelf_life.forget_known(obj.name)
+
+    @admin.action(description="Keep as manual override")
+    def mark_manual(self, request, queryset):
+        queryset.update(source="manual")
+        for name in queryset.values_list("name", flat=True):
+            shelf_life.forget_known(name)
+
+    @admin.action(description="Forget (re-estimate on next use)")
+    def forget(self, request, queryset):
+        names = list(queryset.values_list("name", flat=True))
+        queryset.delete()
+        for name in names:
+            shelf_life.forget_known(name)
+
+
+@admin.register(AiJob)
+class AiJobAdmin(admin.ModelAdmin):
+    list_display = ("id", "owner", "kind", "status", "attempts", "created_at", "finished_at")
+    list_filter = ("status", "kind")
+    readonly_fields = [f.name for f in AiJob._meta.fields]
+    actions = ("retry",)
+
+    @admin.action(description="Retry now")
+    def retry(self, request, queryset):
+        queryset.filter(status="failed").update(
+            status="queued", attempts=0, error="", run_after=timezone.now(), finished_at=None, expires_at=None,
+        )
@@ -0,0 +1,13 @@
+from django.apps import AppConfig
+
+
+class AiapiConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "aiapi"
+
+    def ready(self):
+        from ai import shelf_life
+
+        from .shelf_life_store import ShelfLifeStore
+
+        shelf_life.set_knowledge_store(ShelfLifeStore())
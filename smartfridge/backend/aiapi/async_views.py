@@ -0,0 +1,188 @@
+"""Async versions of the AI endpoints, for ASGI deployments (``AI_ASYNC_VIEWS=1``).
+
+DRF views are synchronous, so under an ASGI server each in-flight model call would still hold
+a thread. These are plain Django async views with the same URLs, request bodies and responses:
+JWT authentication and the DRF serializers are reused, model calls go through AsyncOpenAI and
+reads through the async ORM, so one worker process can wait on hundreds of calls at once.
+Request bodies must be JSON (the DRF views also accept form data).
+"""
+import asyncio
+import json
+import time
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
+from rest_framework.exceptions import APIException, NotAuthenticated
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from ai.breaker import CircuitOpen
+from ai.client import aparse_items_from_text, astream_menu
+from . import jobs, services, singleflight
+from .context import ainventory_context
+from .models import AiJob
+from .renderers import sse_event
+from .serializers import (
+    MenuRequestSerializer, ParseItemsRequestSerializer, ParseItemsImportRequestSerializer,
+    SuggestShoppingRequestSerializer, AssistantRequestSerializer, AiJobSerializer,
+)
+from .views import (
+    JOB_POLL_INTERVAL, accepted_body, job_params, poll_headers, stream_done, unavailable_body, visible, wait_seconds,
+)
+
+_jwt = JWTAuthentication()
+
+
+def _json(data, status: int = 200) -> JsonResponse:
+    return JsonResponse(data, status=status, safe=False, json_dumps_params={"ensure_ascii": False})
+
+
+def _authenticated(view):
+    """JWT authentication, answered like DRF's exception handler when it fails."""
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        try:
+            auth = await sync_to_async(_jwt.authenticate)(request)
+            if auth is None:
+                raise NotAuthenticated()
+        except APIException as e:
+            detail = e.detail if isinstance(e.detail, (list, dict)) else {"detail": e.detail}
+            response = _json(detail, status=401)
+            response["WWW-Authenticate"] = _jwt.authenticate_header(request)
+            return response
+        request.user, request.auth = auth
+        return await view(request, *args, **kwargs)
+    return csrf_exempt(wrapper)
+
+
+def _validate(serializer_class, request):
+    """(validated data, None) or (None, 400 response)."""
+    try:
+        payload = json.loads(request.body or b"{}")
+    except ValueError as e:
+        return None, _json({"detail": f"JSON parse error - {e}"}, status=400)
+    ser = serializer_class(data=payload)
+    if not ser.is_valid():
+        return None, _json(ser.errors, status=400)
+    return ser.validated_data, None
+
+
+async def _enqueue(request, kind: str, data: dict) -> JsonResponse:
+    try:
+        job = await jobs.aenqueue(request.user, kind, job_params(data))
+    except jobs.QueueFull as e:
+        return _json({"detail": str(e)}, status=429)
+    return _json(accepted_body(job), status=202)
+
+
+@_authenticated
+@require_POST
+async def menu(request):
+    data, error = _validate(MenuRequestSerializer, request)
+    if error:
+        return error
+    if data["background"]:
+        return await _enqueue(request, "menu", data)
+    try:
+        result = await singleflight.ado(request.user, "menu", data, lambda: services.amenu(request.user, data))
+    except CircuitOpen as e:
+        body, headers = unavailable_body(e)
+        response = _json(body, status=503)
+        response["Retry-After"] = headers["Retry-After"]
+        return response
+    except Exception as e:
+        return _json({"detail": str(e)}, status=400)
+    return _json(result)
+
+
+@_authenticated
+@require_POST
+async def menu_stream(request):
+    data, error = _validate(MenuRequestSerializer, request)
+    if error:
+        return error
+    days = data["days"]
+    meals_per_day = data["meals_per_day"]
+    inv = await ainventory_context(request.user)
+
+    async def events():
+        try:
+            async for kind, payload in astream_menu(inv, days=days, meals_per_day=meals_per_day,
+                                                    language=data["language"], cache=not data["refresh"]):
+                if kind == "day":
+                    yield sse_event("day", payload)
+                else:
+                    yield sse_event("done", stream_done(payload, days, meals_per_day))
+        except Exception as e:
+            yield sse_event("error", {"detail": str(e)})
+
+    response = StreamingHttpResponse(events(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"  # nginx: do not buffer the stream
+    return response
+
+
+@_authenticated
+@require_POST
+async def parse_items(request):
+    data, error = _validate(ParseItemsRequestSerializer, request)
+    if error:
+        return error
+    try:
+        result = await aparse_items_from_text(data["text"])
+    except Exception as e:
+        return _json({"detail": str(e)}, status=400)
+    return _json(result)
+
+
+@_authenticated
+@require_POST
+async def parse_items_import(request):
+    data, error = _validate(ParseItemsImportRequestSerializer, request)
+    if error:
+        return error
+    if data["background"]:
+        return await _enqueue(request, "parse_items_import", data)
+    return _json(await services.aparse_items_import(request.user, data), status=201)
+
+
+@_authenticated
+@require_POST
+async def suggest_shopping_view(request):
+    data, error = _validate(SuggestShoppingRequestSerializer, request)
+    if error:
+        return error
+    if data["background"]:
+        return await _enqueue(request, "suggest_shopping", data)
+    return _json(await singleflight.ado(request.user, "suggest_shopping", data,
+                                        lambda: services.asuggest_shopping(request.user, data)))
+
+
+@_authenticated
+@require_POST
+async def assistant(request):
+    data, error = _validate(AssistantRequestSerializer, request)
+    if error:
+        return error
+    if data["background"]:
+        return await _enqueue(request, "assistant", data)
+    return _json(await services.aassistant(request.user, data))
+
+
+@_authenticated
+@require_GET
+async def job_detail(request, pk):
+    # a long poll only holds a coroutine here, not a worker thread
+    deadline = time.monotonic() + wait_seconds(request)
+    while True:
+        job = await AiJob.objects.filter(pk=pk, owner=request.user).afirst()
+        if not visible(job):
+            return _json({"detail": "Not found."}, status=404)
+        if job.done or time.monotonic() >= deadline:
+            response = _json(AiJobSerializer(job).data)
+            for header, value in poll_headers(job).items():
+                response[header] = value
+            return response
+        await asyncio.sleep(JOB_POLL_INTERVAL)
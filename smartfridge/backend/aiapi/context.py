@@ -0,0 +1,66 @@
+"""Per-user inventory context shared by the menu, shopping and assistant endpoints.
+
+The built context is cached (Django cache) under the user's inventory version: the dashboard
+snapshot's ``updated_at``, which every inventory write path bumps through
+``inventory.dashboard.items_changed`` and which also moves when the snapshot is rebuilt for a
+new day. A changed inventory therefore never reads a stale context, whichever worker built it.
+"""
+from datetime import date
+
+from django.conf import settings
+from django.core.cache import cache
+
+from ai.context import InventoryContext, build_context, token_budget
+from inventory.dashboard import aget_snapshot, get_snapshot
+from inventory.models import InventoryItem
+
+CONTEXT_CACHE_TTL = int(getattr(settings, "AI_CONTEXT_CACHE_TTL", 600))
+
+
+def _row(item: InventoryItem, today: date) -> dict:
+    return {
+        "name": item.name,
+        "quantity": item.quantity,
+        "unit": item.unit,
+        "expiry_date": item.expiry_date,
+        "daily_rate": item.daily_rate(today),
+    }
+
+
+def _items(user):
+    return InventoryItem.objects.filter(owner=user).only(
+        "name", "quantity", "unit", "expiry_date", "consumption_rate", "consumption_rate_on"
+    )
+
+
+def _key(user, snapshot, budget: int) -> str:
+    return f"aiapi:inventory-context:{user.id}:{snapshot.updated_at.timestamp()}:{budget}"
+
+
+def inventory_rows(user, today: date) -> list[dict]:
+    return [_row(it, today) for it in _items(user)]
+
+
+def inventory_context(user) -> InventoryContext:
+    snapshot = get_snapshot(user.id)
+    budget = token_budget()
+    key = _key(user, snapshot, budget)
+    context = cache.get(key)
+    if context is None:
+        today = date.today()
+        context = build_context(inventory_rows(user, today), budget, today)
+        cache.set(key, context, CONTEXT_CACHE_TTL)
+    return context
+
+
+async def ainventory_context(user) -> InventoryContext:
+    """inventory_context for async views, on the async ORM and cache API."""
+    snapshot = await aget_snapshot(user.id)
+    budget = token_budget()
+    key = _key(user, snapshot, budget)
+    context = await cache.aget(key)
+    if context is None:
+        today = date.today()
+        context = build_context([_row(it, today) async for it in _items(user)], budget, today)
+        await cache.aset(key, context, CONTEXT_CACHE_TTL)
+    return context
@@ -0,0 +1,65 @@
+"""Background execution of AI requests without a broker.
+
+Endpoints that accept ``"background": true`` store an AiJob row and return its id at once;
+``manage.py run_ai_jobs`` claims due jobs from the table and runs the same aiapi.services
+function the synchronous endpoint would. Handlers run outside any transaction, so none is held
+open while the model answers; each writes its results in one transaction of its own after the
+model calls, so a failed attempt leaves nothing behind. Failed attempts are retried with
+exponential backoff up to AI_JOB_MAX_ATTEMPTS; finished jobs are kept for AI_JOB_RESULT_TTL
+seconds for polling, then purged by the worker.
+"""
+from django.conf import settings
+
+from . import services
+from .models import AiJob
+
+HANDLERS = {
+    "menu": services.menu,
+    "suggest_shopping": services.suggest_shopping,
+    "parse_items_import": services.parse_items_import,
+    "assistant": services.assistant,
+}
+
+MAX_QUEUED_PER_USER = int(getattr(settings, "AI_JOB_MAX_QUEUED_PER_USER", 10))
+
+
+class QueueFull(Exception):
+    pass
+
+
+def _pending(user, kind: str):
+    if kind not in HANDLERS:
+        raise ValueError(f"unknown job kind: {kind}")
+    return AiJob.objects.filter(owner=user, status__in=("queued", "running"))
+
+
+def _check_room(pending: int) -> None:
+    if pending >= MAX_QUEUED_PER_USER:
+        raise QueueFull(f"{pending} AI jobs already pending; wait for them to finish")
+
+
+def enqueue(user, kind: str, params: dict) -> AiJob:
+    _check_room(_pending(user, kind).count())
+    return AiJob.objects.create(
+        owner=user, kind=kind, params=params,
+        max_attempts=int(getattr(settings, "AI_JOB_MAX_ATTEMPTS", 3)),
+    )
+
+
+async def aenqueue(user, kind: str, params: dict) -> AiJob:
+    _check_room(await _pending(user, kind).acount())
+    return await AiJob.objects.acreate(
+        owner=user, kind=kind, params=params,
+        max_attempts=int(getattr(settings, "AI_JOB_MAX_ATTEMPTS", 3)),
+    )
+
+
+def run(job: AiJob) -> bool:
+    """Run a claimed job to success or a recorded failure; True when it succeeded."""
+    try:
+        result = HANDLERS[job.kind](job.owner, job.params)
+    except Exception as e:
+        job.fail(f"{type(e).__name__}: {e}")
+        return False
+    job.succeed(result)
+    return True
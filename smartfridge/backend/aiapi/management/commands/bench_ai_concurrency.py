@@ -0,0 +1,117 @@
+import asyncio
+import json
+import os
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from types import ModuleType
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.test import AsyncClient, Client
+from django.test.utils import override_settings
+from django.urls import path
+from rest_framework_simplejwt.tokens import AccessToken
+
+from ai import client as ai_client
+from aiapi import async_views, views
+from .bench_menu_stream import _plan
+from .bench_openai_client import _StubHandler, stub_openai
+
+
+@contextmanager
+def stub_backend(latency_ms: float):
+    """Serve model calls from the in-process stub backend (LLM_BACKEND=stub) for the block."""
+    names = ("LLM_BACKEND", "LLM_STUB_LATENCY_MS")
+    saved = {k: os.environ.get(k) for k in names}
+    os.environ.update(LLM_BACKEND="stub", LLM_STUB_LATENCY_MS=str(latency_ms))
+    ai_client._backends.pop("stub", None)
+    try:
+        yield
+    finally:
+        ai_client._backends.pop("stub", None)
+        for key, value in saved.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+
+def _summary(label: str, results: list, elapsed: float, peak) -> str:
+    latencies = sorted(t for _, t in results)
+    ok = sum(1 for code, _ in results if code == 200)
+    p50 = latencies[len(latencies) // 2] * 1000
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000
+    return (
+        f"{label:>6} {len(results):>8} {ok:>5} {elapsed:>8.2f} {len(results) / elapsed:>8.1f} "
+        f"{p50:>8.0f} {p95:>8.0f} {peak:>9}"
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        "Concurrent menu requests through the sync DRF view on a thread pool (WSGI deployment) and the "
+        "async view on one event loop (ASGI), against a stub model with fixed latency: a local HTTP "
+        "server behind the OpenAI SDK, or the in-process stub backend."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=200, help="Requests sent at once")
+        parser.add_argument("--delay-ms", type=float, default=500.0, help="Stub model latency per call")
+        parser.add_argument("--threads", type=int, default=16, help="WSGI request threads (gunicorn workers x threads)")
+        parser.add_argument("--backend", choices=["http", "stub"], default="http",
+                            help="http: local Responses API stub through the OpenAI SDK; stub: LLM_BACKEND=stub, no sockets")
+
+    def handle(self, *args, **options):
+        n = options["requests"]
+        user = get_user_model().objects.create_user(username=f"bench-ai-{uuid.uuid4().hex[:8]}")
+        headers = {"Authorization": f"Bearer {AccessToken.for_user(user)}"}
+        body = {"days": 1, "meals_per_day": 2, "language": "en", "refresh": True}
+        # both stacks side by side in one URLconf
+        urlconf = ModuleType("bench_ai_urls")
+        urlconf.urlpatterns = [
+            path("wsgi/menu/", views.menu),
+            path("asgi/menu/", async_views.menu),
+        ]
+        _StubHandler.reply = json.dumps(_plan(1, 2))
+        try:
+            http = options["backend"] == "http"
+            model = stub_openai() if http else stub_backend(options["delay_ms"])
+            # the burst is identical requests; single flight would answer them with one model call
+            with model, override_settings(ROOT_URLCONF=urlconf, ALLOWED_HOSTS=["testserver"], AI_SINGLE_FLIGHT=False):
+                # warm up: builds the user's snapshot and both clients' connection pools
+                Client().post("/wsgi/menu/", body, content_type="application/json", headers=headers)
+                asyncio.run(AsyncClient().post("/asgi/menu/", body, content_type="application/json", headers=headers))
+                _StubHandler.delay = options["delay_ms"] / 1000
+
+                self.stdout.write(f"{'stack':>6} {'requests':>8} {'ok':>5} {'wall s':>8} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'peak LLM':>9}")
+
+                # latency counts from the burst, so time queued for a free thread is included
+                def one(_):
+                    response = Client().post("/wsgi/menu/", body, content_type="application/json", headers=headers)
+                    return response.status_code, time.perf_counter() - start
+
+                _StubHandler.peak = 0
+                start = time.perf_counter()
+                with ThreadPoolExecutor(options["threads"]) as pool:
+                    results = list(pool.map(one, range(n)))
+                self.stdout.write(_summary("wsgi", results, time.perf_counter() - start, _StubHandler.peak if http else "-"))
+
+                async def burst():
+                    client = AsyncClient()
+
+                    async def one_async():
+                        response = await client.post("/asgi/menu/", body, content_type="application/json", headers=headers)
+                        return response.status_code, time.perf_counter() - start
+
+                    return await asyncio.gather(*(one_async() for _ in range(n)))
+
+                _StubHandler.peak = 0
+                start = time.perf_counter()
+                results = asyncio.run(burst())
+                self.stdout.write(_summary("asgi", results, time.perf_counter() - start, _StubHandler.peak if http else "-"))
+        finally:
+            _StubHandler.delay = 0.0
+            _StubHandler.reply = "{\"ok\": true}"
+            user.delete()
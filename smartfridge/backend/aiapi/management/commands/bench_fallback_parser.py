@@ -0,0 +1,44 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from ai.client import _fallback_parse_items
+
+_NAMES = ["牛奶", "鸡蛋", "鸡胸肉", "大米", "酸奶", "豆腐", "番茄", "土豆", "面包", "苹果", "milk", "butter", "chicken breast", "orange juice"]
+_QUANTITIES = ["2", "1.5", "12", "500", "三", "两", "半", "十二", ""]
+_UNITS = ["kg", "g", "斤", "盒", "个", "瓶", "袋", "ml", "L", "pcs", ""]
+_EXPIRY = ["", "", "", "3天内", "明天", "后天", "两天后", "一周内", "2周"]
+
+
+def receipt(lines: int, seed: int = 0) -> str:
+    """A pasted shopping receipt: one item per line, occasionally several per line."""
+    rng = random.Random(seed)
+    out = []
+    for _ in range(lines):
+        entry = f"{rng.choice(_NAMES)} {rng.choice(_QUANTITIES)}{rng.choice(_UNITS)} {rng.choice(_EXPIRY)}".strip()
+        if rng.random() < 0.1:
+            entry += "，" + rng.choice(_NAMES)
+        out.append(entry)
+    return "\n".join(out)
+
+
+class Command(BaseCommand):
+    help = "Time the offline item parser (used when the model is unavailable) on a synthetic pasted receipt."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--lines", type=int, default=10_000)
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        text = receipt(options["lines"])
+        best = None
+        for _ in range(options["repeat"]):
+            start = time.perf_counter()
+            items = _fallback_parse_items(text)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        self.stdout.write(
+            f"{options['lines']} lines -> {len(items)} items: {best * 1000:.1f} ms "
+            f"({options['lines'] / best:,.0f} lines/s)"
+        )
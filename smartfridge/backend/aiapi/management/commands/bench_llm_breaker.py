@@ -0,0 +1,65 @@
+import json
+import os
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+
+from ai import client as ai_client
+from ai.breaker import CircuitBreaker
+from .bench_openai_client import _StubHandler, stub_openai
+
+
+class Command(BaseCommand):
+    help = (
+        "Item parsing against a failing or hanging stub model: per-call latency while the circuit "
+        "breaker opens, then the half-open probe once the stub recovers."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--calls", type=int, default=10)
+        parser.add_argument("--mode", choices=["slow", "error"], default="slow",
+                            help="slow: the stub answers after --delay-ms; error: it answers 503")
+        parser.add_argument("--delay-ms", type=float, default=3000.0)
+        parser.add_argument("--deadline", type=float, default=1.0, help="LLM_DEADLINE_PARSE_ITEMS for the run (seconds)")
+        parser.add_argument("--failures", type=int, default=3, help="LLM_BREAKER_FAILURES for the run")
+        parser.add_argument("--cooldown", type=float, default=2.0, help="LLM_BREAKER_COOLDOWN for the run (seconds)")
+
+    def handle(self, *args, **options):
+        saved_breaker = ai_client.breaker
+        saved_deadline = os.environ.get("LLM_DEADLINE_PARSE_ITEMS")
+        ai_client.breaker = breaker = CircuitBreaker(options["failures"], options["cooldown"], ai_client._upstream_failure)
+        os.environ["LLM_DEADLINE_PARSE_ITEMS"] = str(options["deadline"])
+        # unique per run so no call is answered from the LLM cache
+        text = f"2 eggs, 1l milk, 500g rice ({uuid.uuid4().hex[:8]})"
+        try:
+            with stub_openai():
+                if options["mode"] == "slow":
+                    _StubHandler.delay = options["delay_ms"] / 1000
+                else:
+                    _StubHandler.fail_status = 503
+                self.stdout.write(f"{'call':>4} {'ms':>8} {'items':>6}  breaker after")
+                for i in range(1, options["calls"] + 1):
+                    start = time.perf_counter()
+                    parsed = ai_client.parse_items_from_text(f"{text} #{i}")
+                    ms = (time.perf_counter() - start) * 1000
+                    self.stdout.write(f"{i:>4} {ms:>8.1f} {len(parsed['items']):>6}  {breaker.stats()['state']}")
+
+                _StubHandler.delay = 0.0
+                _StubHandler.fail_status = 0
+                _StubHandler.reply = json.dumps({"items": [{"name": "eggs", "quantity": 2, "unit": "pcs"}]})
+                time.sleep(breaker.retry_after())
+                start = time.perf_counter()
+                parsed = ai_client.parse_items_from_text(f"{text} probe")
+                ms = (time.perf_counter() - start) * 1000
+                self.stdout.write(f"probe after recovery: {ms:.1f} ms, {len(parsed['items'])} item(s) from the model, breaker {breaker.stats()['state']}")
+                self.stdout.write(json.dumps(breaker.stats()))
+        finally:
+            ai_client.breaker = saved_breaker
+            _StubHandler.delay = 0.0
+            _StubHandler.fail_status = 0
+            _StubHandler.reply = "{\"ok\": true}"
+            if saved_deadline is None:
+                os.environ.pop("LLM_DEADLINE_PARSE_ITEMS", None)
+            else:
+                os.environ["LLM_DEADLINE_PARSE_ITEMS"] = saved_deadline
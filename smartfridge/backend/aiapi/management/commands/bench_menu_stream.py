@@ -0,0 +1,65 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand
+
+from ai import client as ai_client
+from .bench_openai_client import _StubHandler, stub_openai
+
+
+def _plan(days: int, meals: int) -> dict:
+    return {
+        "days": days,
+        "meals_per_day": meals,
+        "plan": [
+            {
+                "day": d,
+                "meals": [
+                    {
+                        "name": f"Dish {d}-{m}",
+                        "ingredients": [{"name": f"ingredient {i}", "quantity": 100, "unit": "g"} for i in range(4)],
+                        "steps": [f"Step {s} of dish {d}-{m}, described in a sentence or two." for s in range(4)],
+                    }
+                    for m in range(1, meals + 1)
+                ],
+            }
+            for d in range(1, days + 1)
+        ],
+        "shopping_diff": [{"name": "milk", "quantity": 1, "unit": "l"}],
+    }
+
+
+class Command(BaseCommand):
+    help = "Time to first day vs full plan for streamed menu generation, against a local stub that emits tokens at a fixed rate."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=7)
+        parser.add_argument("--meals", type=int, default=5)
+        parser.add_argument("--chunk-chars", type=int, default=4, help="Characters per streamed delta (~1 token)")
+        parser.add_argument("--chunk-ms", type=float, default=1.0, help="Delay between deltas")
+
+    def handle(self, *args, **options):
+        reply = json.dumps(_plan(options["days"], options["meals"]))
+        _StubHandler.reply = reply
+        _StubHandler.chunk_size = options["chunk_chars"]
+        _StubHandler.chunk_delay = options["chunk_ms"] / 1000
+        inventory = [{"name": "milk", "quantity": 1, "unit": "l", "expiry_date": None}]
+        try:
+            with stub_openai():
+                start = time.perf_counter()
+                first = None
+                days = 0
+                for kind, payload in ai_client.stream_menu(inventory, options["days"], options["meals"], "en", cache=False):
+                    if kind == "day":
+                        days += 1
+                        first = first or time.perf_counter() - start
+                    else:
+                        diff = payload.get("shopping_diff")
+                total = time.perf_counter() - start
+        finally:
+            _StubHandler.reply = "{\"ok\": true}"
+            _StubHandler.chunk_delay = 0.0
+        self.stdout.write(
+            f"{len(reply)} chars, {days} days streamed: first day after {first * 1000:.0f} ms, "
+            f"full plan after {total * 1000:.0f} ms ({first / total:.0%}); shopping_diff {'ok' if diff else 'missing'}"
+        )
@@ -0,0 +1,160 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.core.management.base import BaseCommand
+
+from ai import client as ai_client
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    """Minimal Responses API endpoint: always answers with ``reply`` (a tiny JSON object by default).
+
+    Streaming requests get the reply as ``response.output_text.delta`` events of ``chunk_size``
+    characters, ``chunk_delay`` seconds apart, roughly like tokens arriving from the model.
+    A non-zero ``fail_status`` answers every request with that HTTP error instead.
+    """
+
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+    disable_nagle_algorithm = True
+    delay = 0.0
+    reply = "{\"ok\": true}"
+    chunk_size = 4
+    chunk_delay = 0.0
+    fail_status = 0
+    peers: set = set()
+    in_flight = 0
+    peak = 0  # most requests handled at the same time
+    _lock = threading.Lock()
+
+    def do_POST(self):
+        cls = type(self)
+        with cls._lock:
+            cls.in_flight += 1
+            cls.peak = max(cls.peak, cls.in_flight)
+        try:
+            self._answer()
+        finally:
+            with cls._lock:
+                cls.in_flight -= 1
+
+    def _answer(self):
+        request = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+        type(self).peers.add(self.client_address)
+        if self.delay:
+            time.sleep(self.delay)
+        if self.fail_status:
+            body = json.dumps({"error": {"message": "stub failure", "type": "server_error"}}).encode()
+            self.send_response(self.fail_status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        if request.get("stream"):
+            self._stream()
+            return
+        body = json.dumps({
+            "id": "resp_stub",
+            "object": "response",
+            "created_at": 0,
+            "model": "stub",
+            "status": "completed",
+            "output": [{
+                "id": "msg_stub",
+                "type": "message",
+                "role": "assistant",
+                "status": "completed",
+                "content": [{"type": "output_text", "text": self.reply, "annotations": []}],
+            }],
+        }).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _stream(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        for seq, start in enumerate(range(0, len(self.reply), self.chunk_size)):
+            if self.chunk_delay:
+                time.sleep(self.chunk_delay)
+            event = {
+                "type": "response.output_text.delta",
+                "item_id": "msg_stub",
+                "output_index": 0,
+                "content_index": 0,
+                "sequence_number": seq,
+                "delta": self.reply[start:start + self.chunk_size],
+                "logprobs": [],
+            }
+            self.wfile.write(f"event: {event['type']}\ndata: {json.dumps(event)}\n\n".encode())
+            self.wfile.flush()
+
+    def log_message(self, *args):
+        pass
+
+
+class _StubServer(ThreadingHTTPServer):
+    request_queue_size = 1024  # accept bursts of concurrent connections
+
+    def handle_error(self, request, client_address):
+        pass  # clients that gave up (deadlines) leave broken pipes behind
+
+
+@contextmanager
+def stub_openai():
+    """Run the stub server and point the OpenAI settings at it for the duration of the block."""
+    server = _StubServer(("127.0.0.1", 0), _StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    saved = {k: os.environ.get(k) for k in ("OPENAI_API_KEY", "OPENAI_BASE_URL")}
+    os.environ["OPENAI_API_KEY"] = "stub"
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{server.server_address[1]}/v1"
+    try:
+        yield server
+    finally:
+        ai_client._forget_client()
+        for key, value in saved.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+        server.shutdown()
+
+
+class Command(BaseCommand):
+    help = "Compare per-call client construction with the shared pooled OpenAI client against a local stub server."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--calls", type=int, default=200)
+        parser.add_argument("--delay-ms", type=float, default=0.0, help="Stub server think time per request")
+
+    def handle(self, *args, **options):
+        _StubHandler.delay = options["delay_ms"] / 1000
+        pooled = ai_client._client
+        with stub_openai():
+            try:
+                self.stdout.write(f"{'client':>10} {'calls':>6} {'total ms':>9} {'per call':>9} {'connections':>12}")
+                for label, factory in (
+                    ("per-call", lambda: ai_client._build_client(os.environ["OPENAI_API_KEY"], os.environ["OPENAI_BASE_URL"])),
+                    ("pooled", pooled),
+                ):
+                    ai_client._client = factory
+                    ai_client.call_json("warm up", {}, cache=False)
+                    _StubHandler.peers = set()
+                    start = time.perf_counter()
+                    for i in range(options["calls"]):
+                        ai_client.call_json(f"bench {i}", {}, cache=False)
+                    total = (time.perf_counter() - start) * 1000
+                    self.stdout.write(
+                        f"{label:>10} {options['calls']:>6} {total:>9.1f} {total / options['calls']:>9.2f} {len(_StubHandler.peers):>12}"
+                    )
+            finally:
+                ai_client._client = pooled
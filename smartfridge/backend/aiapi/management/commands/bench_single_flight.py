@@ -0,0 +1,101 @@
+import multiprocessing
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.test.utils import override_settings
+
+from ai import client as ai_client
+from aiapi import services, singleflight
+from aiapi.serializers import MenuRequestSerializer
+from .bench_ai_concurrency import stub_backend
+
+
+def _burst(user, data: dict, threads: int, barrier) -> tuple[list[float], dict]:
+    """``threads`` identical menu requests at once; per-request latency and this process's counters."""
+    def one(_):
+        barrier.wait()
+        start = time.perf_counter()
+        singleflight.do(user, "menu", data, lambda: services.menu(user, data))
+        return time.perf_counter() - start
+
+    try:
+        with ThreadPoolExecutor(threads) as pool:
+            return list(pool.map(one, range(threads))), singleflight.stats()
+    finally:
+        connections.close_all()
+
+
+def _child(user, data, threads, barrier, out):
+    out.put(_burst(user, data, threads, barrier))
+
+
+class Command(BaseCommand):
+    help = (
+        "Identical menu requests sent at the same moment from threads of one or several worker "
+        "processes, against the stub model backend: model calls made and latency, with single "
+        "flight off and on."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--duplicates", type=int, default=4, help="Identical requests per process")
+        parser.add_argument("--processes", type=int, default=1, help="Worker processes (forked)")
+        parser.add_argument("--delay-ms", type=float, default=1000.0, help="Stub model latency")
+
+    def handle(self, *args, **options):
+        user = get_user_model().objects.create_user(username=f"bench-sf-{uuid.uuid4().hex[:8]}")
+        ser = MenuRequestSerializer(data={"days": 1, "meals_per_day": 2, "language": "en", "refresh": True})
+        ser.is_valid(raise_exception=True)
+        data = dict(ser.validated_data)
+        procs, threads = max(1, options["processes"]), max(1, options["duplicates"])
+        try:
+            with stub_backend(options["delay_ms"]):
+                backend = ai_client._backend()
+                calls = multiprocessing.get_context("fork").Value("i", 0)
+                complete = backend.complete
+
+                def counted(request, timeout):
+                    with calls.get_lock():
+                        calls.value += 1
+                    return complete(request, timeout)
+
+                backend.complete = counted
+                services.menu(user, data)  # warm up: the user's dashboard snapshot
+
+                self.stdout.write(f"{'single flight':>13} {'requests':>8} {'LLM calls':>9} {'p50 ms':>8} {'max ms':>8}  shared (local/db)")
+                for enabled in (False, True):
+                    calls.value = 0
+                    with override_settings(AI_SINGLE_FLIGHT=enabled):
+                        latencies, shared = self._run(user, data, procs, threads)
+                    latencies.sort()
+                    self.stdout.write(
+                        f"{'on' if enabled else 'off':>13} {len(latencies):>8} {calls.value:>9} "
+                        f"{latencies[len(latencies) // 2] * 1000:>8.0f} {latencies[-1] * 1000:>8.0f}  "
+                        + (f"{shared[0]}/{shared[1]}" if enabled else "-")
+                    )
+        finally:
+            user.delete()
+
+    def _run(self, user, data, procs: int, threads: int) -> tuple[list[float], tuple[int, int]]:
+        ctx = multiprocessing.get_context("fork")
+        before = singleflight.stats()
+        if procs == 1:
+            latencies, after = _burst(user, data, threads, ctx.Barrier(threads))
+            return latencies, (after["shared_local"] - before["shared_local"], after["shared_db"] - before["shared_db"])
+
+        barrier, out = ctx.Barrier(procs * threads), ctx.Queue()
+        connections.close_all()  # children open their own
+        children = [ctx.Process(target=_child, args=(user, data, threads, barrier, out)) for _ in range(procs)]
+        for child in children:
+            child.start()
+        results = [out.get() for _ in children]
+        for child in children:
+            child.join()
+        latencies = [t for times, _ in results for t in times]
+        # forked children start from this process's counters
+        return latencies, tuple(
+            sum(stats[name] - before[name] for _, stats in results) for name in ("shared_local", "shared_db")
+        )
@@ -0,0 +1,36 @@
+import json
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+import ai
+from ai import intent
+
+GOLDEN_PATH = os.path.join(os.path.dirname(ai.__file__), "assistant_intent_golden.json")
+
+
+class Command(BaseCommand):
+    help = "Run the assistant's local intent rules over the golden messages and fail on any difference."
+
+    def handle(self, *args, **options):
+        with open(GOLDEN_PATH, encoding="utf-8") as fh:
+            golden = json.load(fh)
+
+        failures = 0
+        for case in golden["cases"]:
+            decision = intent.classify(case["text"])
+            got = decision["action"] if decision else None
+            if got != case["action"]:
+                failures += 1
+                self.stdout.write(f"[FAIL] {case['text']!r}\n    expected {case['action']}\n    got      {decision}")
+            elif options["verbosity"] > 1:
+                self.stdout.write(f"[ok] {case['text']!r} -> {decision['items'] if decision else 'model'}")
+
+        stats = intent.stats()
+        self.stdout.write(
+            f"fast path fired for {stats['fast_path']} of {stats['messages']} messages ({stats['fast_path_rate']:.0%}): "
+            f"{stats['add_shopping']} add_shopping, {stats['import_inventory']} import_inventory"
+        )
+        if failures:
+            raise CommandError(f"{failures} of {len(golden['cases'])} golden cases differ")
+        self.stdout.write(self.style.SUCCESS(f"All {len(golden['cases'])} golden cases match."))
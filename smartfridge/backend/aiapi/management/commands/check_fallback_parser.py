@@ -0,0 +1,53 @@
+import json
+import os
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+import ai
+from ai.client import _fallback_parse_items
+
+GOLDEN_PATH = os.path.join(os.path.dirname(ai.__file__), "fallback_parse_golden.json")
+
+
+def _relative(items: list[dict], today: date) -> list[dict]:
+    """Golden cases store expiry as days from today so the corpus does not go stale."""
+    out = []
+    for item in items:
+        item = dict(item)
+        if "expiry_date" in item:
+            item["expiry_in_days"] = (date.fromisoformat(item.pop("expiry_date")) - today).days
+        out.append(item)
+    return out
+
+
+class Command(BaseCommand):
+    help = "Run the offline item parser over the golden corpus and fail on any output difference."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--update", action="store_true", help="Rewrite the expected output from the current parser")
+
+    def handle(self, *args, **options):
+        with open(GOLDEN_PATH, encoding="utf-8") as fh:
+            golden = json.load(fh)
+        today = date.today()
+
+        if options["update"]:
+            for case in golden["cases"]:
+                case["items"] = _relative(_fallback_parse_items(case["text"]), today)
+            with open(GOLDEN_PATH, "w", encoding="utf-8") as fh:
+                fh.write('{\n  "_comment": %s,\n  "cases": [\n' % json.dumps(golden["_comment"], ensure_ascii=False))
+                fh.write(",\n".join("    " + json.dumps(case, ensure_ascii=False) for case in golden["cases"]))
+                fh.write("\n  ]\n}\n")
+            self.stdout.write(self.style.SUCCESS(f"Rewrote {len(golden['cases'])} golden cases."))
+            return
+
+        failures = 0
+        for case in golden["cases"]:
+            got = _relative(_fallback_parse_items(case["text"]), today)
+            if got != case["items"]:
+                failures += 1
+                self.stdout.write(f"[FAIL] {case['text']!r}\n    expected {case['items']}\n    got      {got}")
+        if failures:
+            raise CommandError(f"{failures} of {len(golden['cases'])} golden cases differ")
+        self.stdout.write(self.style.SUCCESS(f"All {len(golden['cases'])} golden cases match."))
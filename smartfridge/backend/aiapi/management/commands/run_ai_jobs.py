@@ -0,0 +1,74 @@
+import os
+import signal
+import socket
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+
+from aiapi import jobs
+from aiapi.models import AiJob
+
+
+class Command(BaseCommand):
+    help = "Run queued AI jobs (menu, shopping suggestions, imports, assistant) until stopped."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--concurrency", type=int, default=int(getattr(settings, "AI_JOB_WORKER_CONCURRENCY", 2)),
+            help="Jobs run at the same time by this process (one thread each)",
+        )
+        parser.add_argument("--poll-interval", type=float, default=1.0, help="Seconds between looks at an empty queue")
+        parser.add_argument("--once", action="store_true", help="Exit once no job is due instead of waiting")
+
+    def handle(self, *args, **options):
+        self.stop = threading.Event()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            # finish the jobs in hand, then exit
+            signal.signal(sig, lambda *_: self.stop.set())
+
+        name = f"{socket.gethostname()}:{os.getpid()}"
+        self._housekeeping()
+        threads = [
+            threading.Thread(target=self._work, args=(f"{name}/{i}", options), daemon=True)
+            for i in range(max(1, options["concurrency"]))
+        ]
+        for t in threads:
+            t.start()
+        self.stdout.write(f"run_ai_jobs {name}: {len(threads)} worker thread(s)")
+        last = time.monotonic()
+        while any(t.is_alive() for t in threads) and not self.stop.wait(1):
+            if time.monotonic() - last >= 30:
+                self._housekeeping()
+                last = time.monotonic()
+        for t in threads:
+            t.join()
+
+    def _housekeeping(self):
+        lease = timedelta(seconds=int(getattr(settings, "AI_JOB_LEASE_SECONDS", 300)))
+        recovered = AiJob.objects.recover_stale(lease)
+        purged = AiJob.objects.purge_expired()
+        if recovered or purged:
+            self.stdout.write(f"recovered {recovered} stale job(s), purged {purged} expired job(s)")
+
+    def _work(self, worker: str, options):
+        per_user = int(getattr(settings, "AI_JOB_MAX_RUNNING_PER_USER", 1))
+        try:
+            while not self.stop.is_set():
+                close_old_connections()
+                job = AiJob.objects.claim(worker, per_user)
+                if job is None:
+                    if options["once"]:
+                        return
+                    self.stop.wait(options["poll_interval"])
+                    continue
+                ok = jobs.run(job)
+                self.stdout.write(
+                    f"[{worker}] {job.kind} #{job.pk} attempt {job.attempts}: "
+                    + ("ok" if ok else f"{job.status} ({job.error})")
+                )
+        finally:
+            connection.close()
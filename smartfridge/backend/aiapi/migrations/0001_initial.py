@@ -0,0 +1,31 @@
+# Generated by Django 5.2.7 on 2026-02-18 00:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ShelfLifeEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=200)),
+                ('normalized_name', models.CharField(max_length=200, unique=True)),
+                ('days', models.PositiveIntegerField()),
+                ('source', models.CharField(choices=[('ai', 'AI estimate'), ('manual', 'Manual override')], default='ai', max_length=10)),
+                ('reason', models.CharField(blank=True, default='', max_length=255)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'shelf-life entries',
+                'ordering': ['normalized_name'],
+            },
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('aiapi', '0002_aijob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AiFlight',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=64, unique=True)),
+                ('done', models.BooleanField(default=False)),
+                ('result', models.JSONField(blank=True, null=True)),
+                ('expires_at', models.DateTimeField()),
+            ],
+            options={
+                'indexes': [models.Index(fields=['expires_at'], name='ai_flight_expires_idx')],
+            },
+        ),
+    ]
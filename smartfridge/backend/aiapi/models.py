@@ -0,0 +1,163 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+
+class ShelfLifeEntry(models.Model):
+    """Shelf-life knowledge keyed by canonical item name (see inventory.models.normalize_name).
+
+    AI answers are cached here and re-asked after SHELF_LIFE_TTL_DAYS; manual entries (created
+    or edited in the admin) never expire and take precedence over the built-in rules.
+    """
+
+    SOURCES = (
+        ("ai", "AI estimate"),
+        ("manual", "Manual override"),
+    )
+
+    name = models.CharField(max_length=200)
+    normalized_name = models.CharField(max_length=200, unique=True)
+    days = models.PositiveIntegerField()
+    source = models.CharField(max_length=10, choices=SOURCES, default="ai")
+    reason = models.CharField(max_length=255, blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["normalized_name"]
+        verbose_name_plural = "shelf-life entries"
+
+    def is_fresh(self, now=None) -> bool:
+        if self.source == "manual":
+            return True
+        ttl = timedelta(days=int(getattr(settings, "SHELF_LIFE_TTL_DAYS", 90)))
+        return self.updated_at >= (now or timezone.now()) - ttl
+
+    def __str__(self) -> str:  # pragma: no cover
+        return f"{self.name}: {self.days}d ({self.source})"
+
+
+class AiJobQuerySet(models.QuerySet):
+    def claim(self, worker: str, per_user_limit: int):
+        """Move one due queued job to running for ``worker`` and return it (None if none is due).
+
+        The claim is a conditional UPDATE, so concurrent workers never run the same job on
+        either SQLite or PostgreSQL. Owners already running ``per_user_limit`` jobs are skipped.
+        """
+        now = timezone.now()
+        busy = (
+            self.filter(status="running").values("owner")
+            .annotate(running=models.Count("id")).filter(running__gte=per_user_limit).values("owner")
+        )
+        due = self.filter(status="queued", run_after__lte=now).exclude(owner__in=busy).order_by("run_after", "id")
+        for pk in due.values_list("id", flat=True)[:20]:
+            claimed = self.filter(pk=pk, status="queued").update(
+                status="running", worker=worker, started_at=now, attempts=models.F("attempts") + 1,
+            )
+            if claimed:
+                return self.select_related("owner").get(pk=pk)
+        return None
+
+    def recover_stale(self, lease: timedelta) -> int:
+        """Requeue (or fail, when out of attempts) jobs whose worker stopped before finishing."""
+        now = timezone.now()
+        stale = self.filter(status="running", started_at__lt=now - lease)
+        ttl = timedelta(seconds=int(getattr(settings, "AI_JOB_RESULT_TTL", 3600)))
+        failed = stale.filter(attempts__gte=models.F("max_attempts")).update(
+            status="failed", error="worker lost", finished_at=now, expires_at=now + ttl,
+        )
+        return failed + stale.update(status="queued", worker="", run_after=now)
+
+    def purge_expired(self) -> int:
+        return self.filter(expires_at__lt=timezone.now()).delete()[0]
+
+
+class AiJob(models.Model):
+    """An AI request run off the request path by ``manage.py run_ai_jobs`` (see aiapi.jobs)."""
+
+    KINDS = (
+        ("menu", "Menu"),
+        ("suggest_shopping", "Shopping suggestions"),
+        ("parse_items_import", "Import from text"),
+        ("assistant", "Assistant"),
+    )
+    STATUSES = (
+        ("queued", "Queued"),
+        ("running", "Running"),
+        ("succeeded", "Succeeded"),
+        ("failed", "Failed"),
+    )
+
+    owner = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="ai_jobs")
+    kind = models.CharField(max_length=30, choices=KINDS)
+    params = models.JSONField(default=dict)
+    status = models.CharField(max_length=10, choices=STATUSES, default="queued")
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True, default="")
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=3)
+    run_after = models.DateTimeField(default=timezone.now)
+    worker = models.CharField(max_length=100, blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    expires_at = models.DateTimeField(null=True, blank=True)  # finished jobs are purged after AI_JOB_RESULT_TTL
+
+    objects = AiJobQuerySet.as_manager()
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["status", "run_after"], name="ai_job_status_due_idx"),
+            models.Index(fields=["owner", "status"], name="ai_job_owner_status_idx"),
+            models.Index(fields=["expires_at"], name="ai_job_expires_idx"),
+        ]
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("succeeded", "failed")
+
+    def _update(self, **fields) -> bool:
+        """Write the outcome only while this worker still holds the job (its lease may have been
+        recovered by another worker in the meantime)."""
+        held = type(self).objects.filter(pk=self.pk, status="running", worker=self.worker).update(**fields)
+        for name, value in fields.items():
+            setattr(self, name, value)
+        return bool(held)
+
+    def _finished(self, status: str, now) -> dict:
+        ttl = timedelta(seconds=int(getattr(settings, "AI_JOB_RESULT_TTL", 3600)))
+        return {"status": status, "finished_at": now, "expires_at": now + ttl}
+
+    def succeed(self, result) -> bool:
+        return self._update(result=result, error="", **self._finished("succeeded", timezone.now()))
+
+    def fail(self, error: str) -> bool:
+        """Record a failed attempt: retry with exponential backoff, or give up after max_attempts."""
+        now = timezone.now()
+        if self.attempts < self.max_attempts:
+            backoff = float(getattr(settings, "AI_JOB_RETRY_BACKOFF", 10)) * 2 ** (self.attempts - 1)
+            return self._update(status="queued", error=error, worker="", run_after=now + timedelta(seconds=backoff))
+        return self._update(error=error, **self._finished("failed", now))
+
+    def __str__(self) -> str:  # pragma: no cover
+        return f"{self.kind} #{self.pk} ({self.status})"
+
+
+class AiFlight(models.Model):
+    """An AI request in flight (or just answered), shared by identical concurrent requests in
+    every worker process; see aiapi.singleflight."""
+
+    key = models.CharField(max_length=64, unique=True)  # hash of user, endpoint and request body
+    done = models.BooleanField(default=False)
+    result = models.JSONField(null=True, blank=True)
+    # in flight: the leader's lease; done: how long late duplicates may still take the result
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [models.Index(fields=["expires_at"], name="ai_flight_expires_idx")]
+
+    def __str__(self) -> str:  # pragma: no cover
+        return f"{self.key[:12]} ({'done' if self.done else 'in flight'})"
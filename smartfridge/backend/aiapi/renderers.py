@@ -0,0 +1,24 @@
+import json
+
+from rest_framework.renderers import BaseRenderer
+
+
+def sse_event(event: str, data) -> bytes:
+    """One Server-Sent Events frame with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n".encode("utf-8")
+
+
+class EventStreamRenderer(BaseRenderer):
+    """Lets views negotiate ``Accept: text/event-stream``.
+
+    Streaming views return a StreamingHttpResponse of their own; this only renders the ordinary
+    Response objects DRF produces on the way (validation and auth errors) as a single
+    ``error`` event, so an SSE client sees a well-formed stream either way.
+    """
+
+    media_type = "text/event-stream"
+    format = "sse"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return sse_event("error", data)
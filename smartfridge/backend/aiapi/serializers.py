@@ -1,10 +1,14 @@
 from rest_framework import serializers
 
+from .models import AiJob
+
 
 class MenuRequestSerializer(serializers.Serializer):
     days = serializers.IntegerField(default=1, min_value=1, max_value=7)
     meals_per_day = serializers.IntegerField(default=2, min_value=1, max_value=5)
     language = serializers.ChoiceField(choices=["zh", "en"], default="en")
+    refresh = serializers.BooleanField(default=False, help_text="Skip the LLM response cache")
+    background = serializers.BooleanField(default=False, help_text="Queue as a background job; poll ai/jobs/<id>/")
 
 
 class ParseItemsRequestSerializer(serializers.Serializer):
@@ -15,9 +19,24 @@ class SuggestShoppingRequestSerializer(serializers.Serializer):
     days = serializers.IntegerField(default=3, min_value=1, max_value=14)
     language = serializers.ChoiceField(choices=["zh", "en"], default="en")
     create = serializers.BooleanField(default=False)
+    refresh = serializers.BooleanField(default=False, help_text="Skip the LLM response cache")
+    background = serializers.BooleanField(default=False, help_text="Queue as a background job; poll ai/jobs/<id>/")
 
 
 class AssistantRequestSerializer(serializers.Serializer):
     message = serializers.CharField()
     language = serializers.ChoiceField(choices=["zh", "en"], default="en")
     execute = serializers.BooleanField(default=True)
+    refresh = serializers.BooleanField(default=False, help_text="Skip the LLM response cache")
+    background = serializers.BooleanField(default=False, help_text="Queue as a background job; poll ai/jobs/<id>/")
+
+
+class ParseItemsImportRequestSerializer(ParseItemsRequestSerializer):
+    background = serializers.BooleanField(default=False, help_text="Queue as a background job; poll ai/jobs/<id>/")
+
+
+class AiJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = AiJob
+        fields = ["id", "kind", "status", "attempts", "result", "error", "created_at", "finished_at"]
+        read_only_fields = fields
@@ -0,0 +1,238 @@
+"""The AI operations behind the aiapi endpoints.
+
+Each takes the user and the endpoint's validated request data and returns the JSON response
+body, so it can run inside the request or later in the job worker (see aiapi.jobs). They raise
+when the model fails and the operation has no offline fallback.
+
+The ``a``-prefixed coroutines do the same for the async views: model calls go through the
+AsyncOpenAI client and reads through the async ORM, while the write steps (and the shelf-life
+estimates an import may ask the model for) run in the request's sync thread via sync_to_async.
+"""
+from datetime import date
+from decimal import Decimal
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+
+from ai import intent
+from ai.client import (
+    generate_menu, agenerate_menu, parse_items_from_text, aparse_items_from_text,
+    suggest_shopping as ai_suggest_shopping, asuggest_shopping as ai_asuggest_shopping,
+    decide_action, adecide_action,
+)
+from ai.shelf_life import estimate_expiry_dates
+from inventory.dashboard import items_changed
+from inventory.models import InventoryItem, ConsumptionEvent, ShoppingTask, normalize_name
+
+from .context import ainventory_context, inventory_context
+
+
+def menu(user, data: dict) -> dict:
+    return generate_menu(
+        inventory_context(user), days=data["days"], meals_per_day=data["meals_per_day"],
+        language=data["language"], cache=not data["refresh"],
+    )
+
+
+async def amenu(user, data: dict) -> dict:
+    return await agenerate_menu(
+        await ainventory_context(user), days=data["days"], meals_per_day=data["meals_per_day"],
+        language=data["language"], cache=not data["refresh"],
+    )
+
+
+def parse_items_import(user, data: dict) -> dict:
+    parsed = parse_items_from_text(data["text"]) or {}
+    return _import_parsed(user, parsed.get("items", []))
+
+
+async def aparse_items_import(user, data: dict) -> dict:
+    parsed = await aparse_items_from_text(data["text"]) or {}
+    return await sync_to_async(_import_parsed)(user, parsed.get("items", []))
+
+
+def _import_parsed(user, items: list) -> dict:
+    # one batched shelf-life call for every item the parser gave no expiry
+    estimates = estimate_expiry_dates(
+        [(it.get("name") or "").strip() for it in items if (it.get("name") or "").strip() and not it.get("expiry_date")]
+    )
+    results = []
+    # one transaction for the whole import, so a failed job attempt leaves nothing for its retry to repeat
+    with transaction.atomic():
+        for it in items:
+            name = (it.get("name") or "").strip()
+            if not name:
+                continue
+            qty = it.get("quantity")
+            try:
+                qty = float(qty) if qty is not None else 1.0
+            except Exception:
+                qty = 1.0
+            unit = it.get("unit") or "pcs"
+            expiry = it.get("expiry_date") or None
+            if not expiry:
+                expiry = estimates[name]
+
+            try:
+                expiry = date.fromisoformat(str(expiry))
+            except Exception:
+                expiry = None
+
+            # create or increase quantity, overwriting expiry when known
+            obj = InventoryItem.objects.upsert_add(
+                user, name, qty, unit=unit, expiry_date=expiry, overwrite_expiry=True
+            )
+            ConsumptionEvent.objects.create(owner=user, item=obj, action="add", delta=qty, note="ai import")
+            items_changed(user.id, [obj.id])
+
+            results.append({"id": obj.id, "name": obj.name, "quantity": float(obj.quantity), "unit": obj.unit})
+
+    return {"created": results}
+
+
+def _low_stock(user):
+    return InventoryItem.objects.filter(owner=user, quantity__lte=F("min_stock")).values("name", "unit")
+
+
+def _restock(row: dict) -> dict:
+    return {"name": row["name"], "quantity": 1, "unit": row.get("unit") or "pcs", "reason": "restock due to low stock"}
+
+
+def suggest_shopping(user, data: dict) -> dict:
+    inv = inventory_context(user)
+    try:
+        suggested = ai_suggest_shopping(inv, days=data["days"], language=data["language"], cache=not data["refresh"])
+    except Exception:
+        # Fallback to a simple heuristic when AI is not available
+        suggested = {"suggestions": [_restock(it) for it in _low_stock(user)]}
+
+    suggestions = suggested.get("suggestions", [])
+    created = _create_suggested(user, suggestions) if data["create"] else []
+    return {"suggestions": suggestions, "created": created}
+
+
+async def asuggest_shopping(user, data: dict) -> dict:
+    inv = await ainventory_context(user)
+    try:
+        suggested = await ai_asuggest_shopping(inv, days=data["days"], language=data["language"], cache=not data["refresh"])
+    except Exception:
+        suggested = {"suggestions": [_restock(it) async for it in _low_stock(user)]}
+
+    suggestions = suggested.get("suggestions", [])
+    created = await sync_to_async(_create_suggested)(user, suggestions) if data["create"] else []
+    return {"suggestions": suggestions, "created": created}
+
+
+def _create_suggested(user, suggestions: list) -> list[int]:
+    return [task.id for task in ShoppingTask.objects.add_pending(user, suggestions, source="ai")]
+
+
+def _local_decision(data: dict) -> dict | None:
+    """Decision of the local intent rules (no model call), or None when the model must decide."""
+    if not getattr(settings, "AI_ASSISTANT_FAST_PATH", True):
+        return None
+    return intent.classify(data["message"])
+
+
+def _model_decision(decision: dict) -> dict:
+    decision["source"] = "model"
+    return decision
+
+
+def assistant(user, data: dict) -> dict:
+    decision = _local_decision(data)
+    if decision is None:
+        try:
+            decision = _model_decision(decide_action(
+                data["message"], inventory_context(user), language=data["language"], cache=not data["refresh"],
+            ))
+        except Exception as e:
+            decision = {"action": "help", "reason": str(e), "source": "fallback"}
+    return {"decision": decision, "result": _execute(user, decision) if data["execute"] else _result()}
+
+
+async def aassistant(user, data: dict) -> dict:
+    decision = _local_decision(data)
+    if decision is None:
+        try:
+            decision = _model_decision(await adecide_action(
+                data["message"], await ainventory_context(user), language=data["language"], cache=not data["refresh"],
+            ))
+        except Exception as e:
+            decision = {"action": "help", "reason": str(e), "source": "fallback"}
+    result = await sync_to_async(_execute)(user, decision) if data["execute"] else _result()
+    return {"decision": decision, "result": result}
+
+
+def _result() -> dict:
+    return {"created_shopping": 0, "imported": 0, "details": []}
+
+
+def _execute(user, decision: dict) -> dict:
+    result = _result()
+    action = (decision.get("action") or "").strip()
+    items = decision.get("items", []) or []
+    # suggest_shopping decisions carry the suggested list as items (one fused model call)
+    if action in ("suggest_shopping", "add_shopping"):
+        result["created_shopping"] += _add_shopping(user, items)
+    elif action == "import_inventory":
+        result["imported"] += _import_inventory(user, items)
+    return result
+
+
+def _add_shopping(user, entries: list) -> int:
+    """Pending shopping tasks for the assistant; names already pending are skipped."""
+    return len(ShoppingTask.objects.add_pending(user, entries, source="ai"))
+
+
+def _import_inventory(user, items: list) -> int:
+    """Add the assistant's items to the inventory in one transaction, merging them by name."""
+    rows = []
+    for it in items:
+        name = (it.get("name") or "").strip()
+        if not name:
+            continue
+        try:
+            qty = Decimal(str(float(it.get("quantity") or 1)))
+        except (TypeError, ValueError):
+            qty = Decimal(1)
+        rows.append((normalize_name(name), name, qty, it.get("unit") or "pcs", it.get("expiry_date")))
+    if not rows:
+        return 0
+
+    estimates = estimate_expiry_dates([name for _, name, _, _, expiry in rows if not expiry])
+    with transaction.atomic():
+        entries = {}
+        for key, name, _, unit, _ in rows:
+            entries.setdefault(key, {"name": name, "unit": unit})
+        by_key = InventoryItem.objects.lock_or_create_named(user, entries)
+        blank = [it for it in by_key.values() if not it.unit]
+        for it in blank:
+            it.unit = entries[it.normalized_name]["unit"]
+        if blank:
+            InventoryItem.objects.bulk_update(blank, ["unit"])
+
+        totals, given, estimated = {}, {}, {}
+        for key, name, qty, _, expiry in rows:
+            pk = by_key[key].pk
+            totals[pk] = totals.get(pk, 0) + qty
+            if expiry:
+                given[pk] = expiry
+            else:
+                estimated.setdefault(pk, estimates[name])
+        # a known expiry replaces the stored one; a given date beats an estimate
+        expiry_dates = {}
+        for pk, expiry in {**estimated, **given}.items():
+            try:
+                expiry_dates[pk] = date.fromisoformat(str(expiry))
+            except Exception:
+                pass
+        InventoryItem.objects.add_quantities(totals, expiry_dates=expiry_dates)
+        ConsumptionEvent.objects.record([
+            ConsumptionEvent(owner=user, item_id=by_key[key].pk, action="add", delta=qty, note="assistant import")
+            for key, _, qty, _, _ in rows
+        ])
+        items_changed(user.id, totals)
+    return len(rows)
@@ -0,0 +1,82 @@
+"""Django-backed knowledge store plugged into ai.shelf_life (registered in AiapiConfig.ready)."""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db import DatabaseError
+
+from inventory.models import normalize_name
+
+from .models import ShelfLifeEntry
+
+_MISSING = object()
+
+
+class ShelfLifeStore:
+    """ShelfLifeEntry lookups behind a per-process LRU.
+
+    The LRU also remembers misses; entries live for SHELF_LIFE_LRU_TTL seconds so admin edits
+    made in another worker are picked up without a restart.
+    """
+
+    def __init__(self):
+        self.size = int(getattr(settings, "SHELF_LIFE_LRU_SIZE", 1024))
+        self.ttl = float(getattr(settings, "SHELF_LIFE_LRU_TTL", 300))
+        self._lru: "OrderedDict[str, tuple[float, object]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _cached(self, key: str):
+        with self._lock:
+            hit = self._lru.get(key)
+            if hit is None:
+                return _MISSING
+            if hit[0] <= time.monotonic():
+                del self._lru[key]
+                return _MISSING
+            self._lru.move_to_end(key)
+            return hit[1]
+
+    def _remember(self, key: str, value) -> None:
+        with self._lock:
+            self._lru[key] = (time.monotonic() + self.ttl, value)
+            self._lru.move_to_end(key)
+            while len(self._lru) > self.size:
+                self._lru.popitem(last=False)
+
+    def forget(self, name: str) -> None:
+        with self._lock:
+            self._lru.pop(normalize_name(name), None)
+
+    def lookup(self, name: str) -> tuple[int, str] | None:
+        """(days, source) for a fresh entry, else None."""
+        key = normalize_name(name)
+        if not key:
+            return None
+        cached = self._cached(key)
+        if cached is not _MISSING:
+            return cached
+        try:
+            entry = ShelfLifeEntry.objects.filter(normalized_name=key).first()
+        except DatabaseError:
+            return None  # knowledge is an optimisation; never fail the caller
+        found = (entry.days, entry.source) if entry is not None and entry.is_fresh() else None
+        self._remember(key, found)
+        return found
+
+    def store(self, name: str, days: int, reason: str = "") -> None:
+        """Record an AI answer; manual overrides are never replaced."""
+        key = normalize_name(name)
+        if not key:
+            return
+        try:
+            entry, created = ShelfLifeEntry.objects.get_or_create(
+                normalized_name=key,
+                defaults={"name": name.strip(), "days": days, "source": "ai", "reason": reason[:255]},
+            )
+            if not created and entry.source != "manual":
+                entry.days, entry.reason = days, reason[:255]
+                entry.save(update_fields=["days", "reason", "updated_at"])
+        except DatabaseError:
+            return
+        self._remember(key, (entry.days, entry.source))
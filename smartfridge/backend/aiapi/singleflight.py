@@ -0,0 +1,233 @@
+"""Coalesce identical concurrent AI requests (single flight).
+
+Double-clicks and client retries send the same request twice within a second. The first one
+(the leader) runs the model call; duplicates that arrive while it is in flight wait for it and
+return its result instead of calling the model again. Requests are identical when user,
+endpoint and validated body match.
+
+Two layers: within a process, sync waiters block on the leader's threading.Event and async
+waiters await a future on their own event loop (no executor thread per waiter); across worker
+processes (and hosts sharing the database), the leader holds an AiFlight row and publishes the
+result there, and waiters poll it. A waiter that has no answer after ``AI_SINGLE_FLIGHT_WAIT``
+seconds, or whose leader failed, makes its own call, so errors are never shared. A published
+result stays takeable for ``AI_SINGLE_FLIGHT_GRACE`` seconds, for duplicates that arrive just
+after the leader finished.
+"""
+import asyncio
+import copy
+import hashlib
+import json
+import threading
+import time
+from datetime import timedelta
+from typing import Any, Awaitable, Callable
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .models import AiFlight
+
+POLL_INTERVAL = 0.1
+
+_MISSING = object()
+
+
+class _Flight:
+    def __init__(self):
+        self.event = threading.Event()
+        self.result: Any = _MISSING
+        # async waiters: (their loop, a future the leader resolves from its thread)
+        self.futures: list[tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+
+
+_lock = threading.Lock()
+_flights: dict[str, _Flight] = {}
+_counters = {"leaders": 0, "shared_local": 0, "shared_db": 0, "timeouts": 0, "leader_failed": 0}
+
+
+def _wait() -> float:
+    return float(getattr(settings, "AI_SINGLE_FLIGHT_WAIT", 60))
+
+
+def _count(name: str) -> None:
+    with _lock:
+        _counters[name] += 1
+
+
+def flight_key(user, endpoint: str, data: dict) -> str:
+    body = {k: v for k, v in data.items() if k != "background"}
+    raw = json.dumps({"user": user.pk, "endpoint": endpoint, "body": body}, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _join(key: str) -> tuple[_Flight, bool]:
+    """This process's flight for ``key`` and whether the caller leads it."""
+    with _lock:
+        flight = _flights.get(key)
+        if flight is not None:
+            return flight, False
+        flight = _flights[key] = _Flight()
+        return flight, True
+
+
+def _land(key: str, flight: _Flight, result: Any) -> None:
+    flight.result = result
+    with _lock:
+        _flights.pop(key, None)
+        flight.event.set()
+        futures, flight.futures = flight.futures, []
+    for loop, future in futures:
+        try:
+            loop.call_soon_threadsafe(_resolve, future)
+        except RuntimeError:  # the waiter's loop is closed
+            pass
+
+
+def _resolve(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+async def _landed(flight: _Flight) -> bool:
+    """Await the leader for up to the single-flight wait; True once it has landed."""
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+    with _lock:
+        if flight.event.is_set():
+            return True
+        flight.futures.append((loop, future))
+    try:
+        await asyncio.wait_for(future, _wait())
+        return True
+    except asyncio.TimeoutError:
+        return False
+    finally:
+        with _lock:
+            if (loop, future) in flight.futures:
+                flight.futures.remove((loop, future))
+
+
+def _claim(key: str) -> Any:
+    """Take the AiFlight row for ``key``: _MISSING when claimed, else another process's flight
+    (its published result, or None while it is still in flight)."""
+    now = timezone.now()
+    AiFlight.objects.filter(expires_at__lt=now).delete()
+    try:
+        with transaction.atomic():
+            AiFlight.objects.create(key=key, expires_at=now + timedelta(seconds=_wait()))
+        return _MISSING
+    except IntegrityError:
+        row = AiFlight.objects.filter(key=key, done=True).values_list("result", flat=True).first()
+        return None if row is None else {"result": row}
+
+
+def _publish(key: str, result: Any) -> None:
+    grace = timedelta(seconds=float(getattr(settings, "AI_SINGLE_FLIGHT_GRACE", 2)))
+    AiFlight.objects.filter(key=key).update(done=True, result=result, expires_at=timezone.now() + grace)
+
+
+def _abandon(key: str) -> None:
+    AiFlight.objects.filter(key=key, done=False).delete()
+
+
+def _peek(key: str) -> Any:
+    """A published result ({"result": ...}), None while in flight, _MISSING once the row is gone."""
+    row = AiFlight.objects.filter(key=key).values("done", "result").first()
+    if row is None:
+        return _MISSING
+    return {"result": row["result"]} if row["done"] else None
+
+
+def do(user, endpoint: str, data: dict, call: Callable[[], Any]) -> Any:
+    """``call()``, or the result of an identical request already in flight."""
+    if not getattr(settings, "AI_SINGLE_FLIGHT", True):
+        return call()
+    key = flight_key(user, endpoint, data)
+    flight, leader = _join(key)
+    if not leader:
+        if flight.event.wait(_wait()) and flight.result is not _MISSING:
+            _count("shared_local")
+            return copy.deepcopy(flight.result)
+        _count("timeouts" if not flight.event.is_set() else "leader_failed")
+        return call()
+
+    result = _MISSING
+    try:
+        result = _lead_or_follow(key, call)
+        return result
+    finally:
+        _land(key, flight, result)
+
+
+def _lead_or_follow(key: str, call: Callable[[], Any]) -> Any:
+    other = _claim(key)
+    if other is _MISSING:
+        _count("leaders")
+        try:
+            result = call()
+        except BaseException:
+            _abandon(key)
+            raise
+        _publish(key, result)
+        return result
+
+    deadline = time.monotonic() + _wait()
+    while other is None and time.monotonic() < deadline:
+        time.sleep(POLL_INTERVAL)
+        other = _peek(key)
+    if isinstance(other, dict):
+        _count("shared_db")
+        return other["result"]
+    _count("timeouts" if other is None else "leader_failed")
+    return call()
+
+
+async def ado(user, endpoint: str, data: dict, call: Callable[[], Awaitable[Any]]) -> Any:
+    """Async form of ``do``; ``call`` returns the coroutine to await."""
+    if not getattr(settings, "AI_SINGLE_FLIGHT", True):
+        return await call()
+    key = flight_key(user, endpoint, data)
+    flight, leader = _join(key)
+    if not leader:
+        if await _landed(flight) and flight.result is not _MISSING:
+            _count("shared_local")
+            return copy.deepcopy(flight.result)
+        _count("timeouts" if not flight.event.is_set() else "leader_failed")
+        return await call()
+
+    result = _MISSING
+    try:
+        result = await _alead_or_follow(key, call)
+        return result
+    finally:
+        _land(key, flight, result)
+
+
+async def _alead_or_follow(key: str, call: Callable[[], Awaitable[Any]]) -> Any:
+    other = await sync_to_async(_claim)(key)
+    if other is _MISSING:
+        _count("leaders")
+        try:
+            result = await call()
+        except BaseException:
+            await sync_to_async(_abandon)(key)
+            raise
+        await sync_to_async(_publish)(key, result)
+        return result
+
+    deadline = time.monotonic() + _wait()
+    while other is None and time.monotonic() < deadline:
+        await asyncio.sleep(POLL_INTERVAL)
+        other = await sync_to_async(_peek)(key)
+    if isinstance(other, dict):
+        _count("shared_db")
+        return other["result"]
+    _count("timeouts" if other is None else "leader_failed")
+    return await call()
+
+
+def stats() -> dict:
+    with _lock:
+        return dict(_counters, in_flight=len(_flights))
@@ -1,10 +1,20 @@
+from django.conf import settings
 from django.urls import path
-from .views import menu, parse_items, parse_items_import, suggest_shopping_view, assistant
+
+from . import async_views, views
+
+# async views for ASGI deployments; the staff-only stats views stay on DRF
+ai = async_views if getattr(settings, "AI_ASYNC_VIEWS", False) else views
 
 urlpatterns = [
-    path("menu/", menu, name="ai-menu"),
-    path("parse-items/", parse_items, name="ai-parse-items"),
-    path("parse-items-import/", parse_items_import, name="ai-parse-items-import"),
-    path("suggest-shopping/", suggest_shopping_view, name="ai-suggest-shopping"),
-    path("assistant/", assistant, name="ai-assistant"),
+    path("menu/", ai.menu, name="ai-menu"),
+    path("menu/stream/", ai.menu_stream, name="ai-menu-stream"),
+    path("parse-items/", ai.parse_items, name="ai-parse-items"),
+    path("parse-items-import/", ai.parse_items_import, name="ai-parse-items-import"),
+    path("suggest-shopping/", ai.suggest_shopping_view, name="ai-suggest-shopping"),
+    path("assistant/", ai.assistant, name="ai-assistant"),
+    path("cache-stats/", views.cache_stats, name="ai-cache-stats"),
+    path("breaker/", views.breaker_stats, name="ai-breaker"),
+    path("assistant-stats/", views.assistant_stats, name="ai-assistant-stats"),
+    path("jobs/<int:pk>/", ai.job_detail, name="ai-job"),
 ]
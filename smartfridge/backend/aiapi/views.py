@@ -1,18 +1,82 @@
-from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import IsAuthenticated
+import math
+
+from rest_framework.decorators import api_view, permission_classes, renderer_classes
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 from rest_framework import status
 
-from ai.client import generate_menu, parse_items_from_text, suggest_shopping, decide_action
-from ai.shelf_life import estimate_expiry_date
-from inventory.models import InventoryItem, ConsumptionEvent, ShoppingTask
-from .serializers import MenuRequestSerializer, ParseItemsRequestSerializer, SuggestShoppingRequestSerializer, AssistantRequestSerializer
-from django.db import transaction
-from django.db.models import F
-from datetime import date
-from drf_spectacular.utils import extend_schema
+from ai import cache as llm_cache, intent
+from ai.breaker import CircuitOpen
+from ai.client import breaker, stream_menu, parse_items_from_text
+from . import jobs, services, singleflight
+from .context import inventory_context
+from .models import AiJob
+from .renderers import EventStreamRenderer, sse_event
+from .serializers import (
+    MenuRequestSerializer, ParseItemsRequestSerializer, ParseItemsImportRequestSerializer,
+    SuggestShoppingRequestSerializer, AssistantRequestSerializer, AiJobSerializer,
+)
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from django.urls import reverse
+from django.utils import timezone
+from drf_spectacular.utils import OpenApiParameter, extend_schema
 from drf_spectacular.types import OpenApiTypes
 
+JOB_MAX_WAIT = float(getattr(settings, "AI_JOB_MAX_WAIT", 25))
+JOB_POLL_INTERVAL = 0.5
+JOB_RETRY_AFTER = 2  # seconds; the poll hint sent with an unfinished job
+
+
+def job_params(data: dict) -> dict:
+    return {k: v for k, v in data.items() if k != "background"}
+
+
+def accepted_body(job: AiJob) -> dict:
+    return {"job": AiJobSerializer(job).data, "poll": reverse("ai-job", args=[job.id])}
+
+
+def wait_seconds(request) -> float:
+    """The ``?wait=`` long-poll time, clamped to JOB_MAX_WAIT."""
+    try:
+        return min(max(float(request.GET.get("wait", 0)), 0.0), JOB_MAX_WAIT)
+    except ValueError:
+        return 0.0
+
+
+def poll_headers(job: AiJob) -> dict:
+    return {} if job.done else {"Retry-After": str(JOB_RETRY_AFTER)}
+
+
+def visible(job: AiJob | None) -> bool:
+    return job is not None and (job.expires_at is None or job.expires_at >= timezone.now())
+
+
+def stream_done(plan: dict, days: int, meals_per_day: int) -> dict:
+    """Payload of the final ``done`` event of menu/stream/."""
+    return {
+        "days": plan.get("days", days),
+        "meals_per_day": plan.get("meals_per_day", meals_per_day),
+        "shopping_diff": plan.get("shopping_diff") or [],
+        # False when the reply could not be parsed as a whole (e.g. truncated)
+        "complete": "raw" not in plan,
+    }
+
+
+def unavailable_body(e: CircuitOpen) -> tuple[dict, dict]:
+    """503 body and headers while the model circuit is open (menu has no offline fallback)."""
+    return {"detail": str(e)}, {"Retry-After": str(math.ceil(e.retry_after))}
+
+
+def _enqueue(request, kind: str, data: dict) -> Response:
+    """202 with the queued job, for requests made with ``"background": true``."""
+    try:
+        job = jobs.enqueue(request.user, kind, job_params(data))
+    except jobs.QueueFull as e:
+        return Response({"detail": str(e)}, status=status.HTTP_429_TOO_MANY_REQUESTS)
+    return Response(accepted_body(job), status=status.HTTP_202_ACCEPTED)
+
 
 @extend_schema(request=MenuRequestSerializer, responses=OpenApiTypes.OBJECT)
 @api_view(["POST"])
@@ -20,22 +84,56 @@ from drf_spectacular.types import OpenApiTypes
 def menu(request):
     ser = MenuRequestSerializer(data=request.data)
     ser.is_valid(raise_exception=True)
-    days = ser.validated_data["days"]
-    meals_per_day = ser.validated_data["meals_per_day"]
-    language = ser.validated_data["language"]
-
-    inv = list(
-        InventoryItem.objects.filter(owner=request.user).values(
-            "name", "quantity", "unit", "expiry_date"
-        )
-    )
+    if ser.validated_data["background"]:
+        return _enqueue(request, "menu", ser.validated_data)
     try:
-        data = generate_menu(inv, days=days, meals_per_day=meals_per_day, language=language)
+        data = singleflight.do(request.user, "menu", ser.validated_data,
+                               lambda: services.menu(request.user, ser.validated_data))
+    except CircuitOpen as e:
+        body, headers = unavailable_body(e)
+        return Response(body, status=status.HTTP_503_SERVICE_UNAVAILABLE, headers=headers)
     except Exception as e:
         return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
     return Response(data)
 
 
+@extend_schema(
+    request=MenuRequestSerializer,
+    responses={(200, "text/event-stream"): OpenApiTypes.STR},
+    description=(
+        "Same as menu/, streamed as Server-Sent Events: one `day` event per plan day as soon as the "
+        "model has finished it, then a `done` event carrying `shopping_diff`. Failures arrive as an `error` event."
+    ),
+)
+@api_view(["POST"])
+@renderer_classes([EventStreamRenderer, JSONRenderer])
+@permission_classes([IsAuthenticated])
+def menu_stream(request):
+    ser = MenuRequestSerializer(data=request.data)
+    ser.is_valid(raise_exception=True)
+    days = ser.validated_data["days"]
+    meals_per_day = ser.validated_data["meals_per_day"]
+    language = ser.validated_data["language"]
+
+    inv = inventory_context(request.user)
+
+    def events():
+        try:
+            for kind, payload in stream_menu(inv, days=days, meals_per_day=meals_per_day, language=language,
+                                             cache=not ser.validated_data["refresh"]):
+                if kind == "day":
+                    yield sse_event("day", payload)
+                else:
+                    yield sse_event("done", stream_done(payload, days, meals_per_day))
+        except Exception as e:
+            yield sse_event("error", {"detail": str(e)})
+
+    response = StreamingHttpResponse(events(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"  # nginx: do not buffer the stream
+    return response
+
+
 @extend_schema(request=ParseItemsRequestSerializer, responses=OpenApiTypes.OBJECT)
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
@@ -49,53 +147,15 @@ def parse_items(request):
     return Response(data)
 
 
-@extend_schema(request=ParseItemsRequestSerializer, responses=OpenApiTypes.OBJECT)
+@extend_schema(request=ParseItemsImportRequestSerializer, responses=OpenApiTypes.OBJECT)
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
 def parse_items_import(request):
-    ser = ParseItemsRequestSerializer(data=request.data)
+    ser = ParseItemsImportRequestSerializer(data=request.data)
     ser.is_valid(raise_exception=True)
-    parsed = parse_items_from_text(ser.validated_data["text"]) or {}
-    items = parsed.get("items", [])
-    results = []
-    for it in items:
-        name = (it.get("name") or "").strip()
-        if not name:
-            continue
-        qty = it.get("quantity")
-        try:
-            qty = float(qty) if qty is not None else 1.0
-        except Exception:
-            qty = 1.0
-        unit = it.get("unit") or "pcs"
-        expiry = it.get("expiry_date") or None
-        if not expiry:
-            expiry = estimate_expiry_date(name)
-
-        with transaction.atomic():
-            obj = InventoryItem.objects.filter(owner=request.user, name__iexact=name).first()
-            if obj is None:
-                obj = InventoryItem.objects.create(
-                    owner=request.user,
-                    name=name,
-                    quantity=0,
-                    unit=unit,
-                )
-            # increase quantity and optional expiry overwrite if provided
-            obj.quantity = F("quantity") + qty
-            update_fields = ["quantity"]
-            try:
-                obj.expiry_date = date.fromisoformat(str(expiry))
-                update_fields.append("expiry_date")
-            except Exception:
-                pass
-            obj.save(update_fields=update_fields)
-            obj.refresh_from_db()
-            ConsumptionEvent.objects.create(owner=request.user, item=obj, action="add", delta=qty, note="ai import")
-
-        results.append({"id": obj.id, "name": obj.name, "quantity": float(obj.quantity), "unit": obj.unit})
-
-    return Response({"created": results}, status=status.HTTP_201_CREATED)
+    if ser.validated_data["background"]:
+        return _enqueue(request, "parse_items_import", ser.validated_data)
+    return Response(services.parse_items_import(request.user, ser.validated_data), status=status.HTTP_201_CREATED)
 
 
 @extend_schema(request=SuggestShoppingRequestSerializer, responses=OpenApiTypes.OBJECT)
@@ -104,54 +164,10 @@ def parse_items_import(request):
 def suggest_shopping_view(request):
     ser = SuggestShoppingRequestSerializer(data=request.data)
     ser.is_valid(raise_exception=True)
-    days = ser.validated_data["days"]
-    language = ser.validated_data["language"]
-    create = ser.validated_data["create"]
-
-    inv = list(
-        InventoryItem.objects.filter(owner=request.user).values(
-            "name", "quantity", "unit", "expiry_date"
-        )
-    )
-    try:
-        data = suggest_shopping(inv, days=days, language=language)
-    except Exception as e:
-        # Fallback to a simple heuristic when AI is not available
-        low = InventoryItem.objects.filter(owner=request.user, quantity__lte=F("min_stock")).values("name", "unit")
-        data = {"suggestions": [{"name": it["name"], "quantity": 1, "unit": it.get("unit") or "pcs", "reason": "restock due to low stock"} for it in low]}
-
-    suggestions = data.get("suggestions", [])
-    created = []
-    if create:
-        for s in suggestions:
-            name = (s.get("name") or "").strip()
-            if not name:
-                continue
-            qty = s.get("quantity") or 1
-            try:
-                qty = float(qty)
-            except Exception:
-                qty = 1
-            unit = s.get("unit") or "pcs"
-
-            # avoid duplicates pending entries
-            exists = ShoppingTask.objects.filter(owner=request.user, status="pending", name__iexact=name).exists()
-            if exists:
-                continue
-
-            # link to item if exists by name
-            item = InventoryItem.objects.filter(owner=request.user, name__iexact=name).first()
-            task = ShoppingTask.objects.create(
-                owner=request.user,
-                item=item,
-                name=name,
-                quantity=qty,
-                unit=unit,
-                source="ai",
-            )
-            created.append(task.id)
-
-    return Response({"suggestions": suggestions, "created": created})
+    if ser.validated_data["background"]:
+        return _enqueue(request, "suggest_shopping", ser.validated_data)
+    return Response(singleflight.do(request.user, "suggest_shopping", ser.validated_data,
+                                    lambda: services.suggest_shopping(request.user, ser.validated_data)))
 
 
 @extend_schema(request=AssistantRequestSerializer, responses=OpenApiTypes.OBJECT)
@@ -160,77 +176,41 @@ def suggest_shopping_view(request):
 def assistant(request):
     ser = AssistantRequestSerializer(data=request.data)
     ser.is_valid(raise_exception=True)
-    message = ser.validated_data["message"]
-    language = ser.validated_data["language"]
-    execute = ser.validated_data["execute"]
+    if ser.validated_data["background"]:
+        return _enqueue(request, "assistant", ser.validated_data)
+    return Response(services.assistant(request.user, ser.validated_data))
 
-    inv = list(
-        InventoryItem.objects.filter(owner=request.user).values(
-            "name", "quantity", "unit", "expiry_date"
-        )
-    )
 
-    decision = {}
-    try:
-        decision = decide_action(message, inv, language=language)
-    except Exception as e:
-        decision = {"action": "help", "reason": str(e)}
-
-    result = {"created_shopping": 0, "imported": 0, "details": []}
-    if execute:
-        action = (decision.get("action") or "").strip()
-        items = decision.get("items", []) or []
-
-        if action == "suggest_shopping":
-            days = decision.get("days", 3)
-            data = suggest_shopping(inv, days=days, language=language)
-            suggestions = data.get("suggestions", [])
-            for s in suggestions:
-                name = (s.get("name") or "").strip()
-                if not name:
-                    continue
-                qty = s.get("quantity") or 1
-                unit = s.get("unit") or "pcs"
-                exists = ShoppingTask.objects.filter(owner=request.user, status="pending", name__iexact=name).exists()
-                if exists:
-                    continue
-                item = InventoryItem.objects.filter(owner=request.user, name__iexact=name).first()
-                ShoppingTask.objects.create(owner=request.user, item=item, name=name, quantity=qty, unit=unit, source="ai")
-                result["created_shopping"] += 1
-        elif action == "add_shopping":
-            for it in items:
-                name = (it.get("name") or "").strip()
-                if not name:
-                    continue
-                qty = it.get("quantity") or 1
-                unit = it.get("unit") or "pcs"
-                exists = ShoppingTask.objects.filter(owner=request.user, status="pending", name__iexact=name).exists()
-                if exists:
-                    continue
-                item = InventoryItem.objects.filter(owner=request.user, name__iexact=name).first()
-                ShoppingTask.objects.create(owner=request.user, item=item, name=name, quantity=qty, unit=unit, source="ai")
-                result["created_shopping"] += 1
-        elif action == "import_inventory":
-            for it in items:
-                name = (it.get("name") or "").strip()
-                if not name:
-                    continue
-                qty = it.get("quantity") or 1
-                unit = it.get("unit") or "pcs"
-                expiry = it.get("expiry_date") or estimate_expiry_date(name)
-                obj = InventoryItem.objects.filter(owner=request.user, name__iexact=name).first()
-                if obj is None:
-                    obj = InventoryItem.objects.create(owner=request.user, name=name, unit=unit, quantity=0)
-                obj.quantity = F("quantity") + qty
-                update_fields = ["quantity"]
-                try:
-                    obj.expiry_date = date.fromisoformat(str(expiry))
-                    update_fields.append("expiry_date")
-                except Exception:
-                    pass
-                obj.save(update_fields=update_fields)
-                obj.refresh_from_db()
-                ConsumptionEvent.objects.create(owner=request.user, item=obj, action="add", delta=qty, note="assistant import")
-                result["imported"] += 1
-
-    return Response({"decision": decision, "result": result})
+@extend_schema(
+    responses=AiJobSerializer,
+    parameters=[OpenApiParameter("wait", OpenApiTypes.FLOAT, description="Long-poll: hold the request up to this many seconds (max AI_JOB_MAX_WAIT) until the job finishes. Only honoured by the async views (AI_ASYNC_VIEWS); otherwise the job is returned at once, with Retry-After while unfinished")],
+)
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def job_detail(request, pk):
+    # no long poll here: a sleeping request would hold one of the few WSGI workers (see async_views)
+    job = AiJob.objects.filter(pk=pk, owner=request.user).first()
+    if not visible(job):
+        return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
+    return Response(AiJobSerializer(job).data, headers=poll_headers(job))
+
+
+@extend_schema(responses=OpenApiTypes.OBJECT, description="LLM response cache counters for the serving worker")
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+def cache_stats(request):
+    return Response(llm_cache.stats())
+
+
+@extend_schema(responses=OpenApiTypes.OBJECT, description="State and counters of the model circuit breaker in the serving worker")
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+def breaker_stats(request):
+    return Response(breaker.stats())
+
+
+@extend_schema(responses=OpenApiTypes.OBJECT, description="How often the serving worker answered the assistant with local intent rules instead of a model call")
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+def assistant_stats(request):
+    return Response(intent.stats())
@@ -1,20 +1,68 @@
 from django.contrib import admin
 
-from .models import InventoryItem, ConsumptionEvent, ShoppingTask, CookHistory
+from .dashboard import items_changed
+from .models import InventoryItem, ConsumptionEvent, ConsumptionRollup, ShoppingTask, CookHistory
+
+
+class SnapshotRefreshAdmin(admin.ModelAdmin):
+    """Admin writes refresh the owners' dashboard snapshots, as the API's write paths do."""
+
+    item_field = "id"
+
+    def _touched(self, queryset) -> set:
+        return set(queryset.values_list("owner_id", self.item_field))
+
+    def _changed(self, touched: set, edited: bool) -> None:
+        by_owner = {}
+        for owner_id, item_id in touched:
+            by_owner.setdefault(owner_id, set()).add(item_id)
+        for owner_id, ids in by_owner.items():
+            items_changed(owner_id, ids)
+
+    def save_model(self, request, obj, form, change):
+        # the old (owner, item) too: the edit may have moved the row
+        before = self._touched(self.model.objects.filter(pk=obj.pk)) if change else set()
+        super().save_model(request, obj, form, change)
+        self._changed(before | self._touched(self.model.objects.filter(pk=obj.pk)), change)
+
+    def delete_model(self, request, obj):
+        touched = self._touched(self.model.objects.filter(pk=obj.pk))
+        super().delete_model(request, obj)
+        self._changed(touched, True)
+
+    def delete_queryset(self, request, queryset):
+        touched = self._touched(queryset)
+        super().delete_queryset(request, queryset)
+        self._changed(touched, True)
 
 
 @admin.register(InventoryItem)
-class InventoryItemAdmin(admin.ModelAdmin):
+class InventoryItemAdmin(SnapshotRefreshAdmin):
     list_display = ("name", "owner", "quantity", "unit", "location", "expiry_date", "updated_at")
     list_filter = ("category", "location", "unit")
     search_fields = ("name", "category", "location", "container")
 
 
 @admin.register(ConsumptionEvent)
-class ConsumptionEventAdmin(admin.ModelAdmin):
+class ConsumptionEventAdmin(SnapshotRefreshAdmin):
     list_display = ("item", "owner", "action", "delta", "created_at")
     list_filter = ("action",)
     search_fields = ("item__name", "note")
+    item_field = "item_id"
+
+    def _changed(self, touched: set, edited: bool) -> None:
+        # new events are folded in by ConsumptionEvent.save(); edits and deletes are not
+        if edited:
+            ConsumptionRollup.objects.rebuild({owner_id for owner_id, _ in touched})
+        super()._changed(touched, edited)
+
+
+@admin.register(ConsumptionRollup)
+class ConsumptionRollupAdmin(SnapshotRefreshAdmin):
+    list_display = ("item", "owner", "day", "consumed", "added")
+    list_filter = ("day",)
+    search_fields = ("item__name",)
+    item_field = "item_id"
 
 
 @admin.register(ShoppingTask)
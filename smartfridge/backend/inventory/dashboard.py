@@ -0,0 +1,321 @@
+"""Per-user dashboard snapshot behind /inventory/summary.
+
+The snapshot stores which items are low on stock or near expiry plus the current top of the
+priority list, so reading the dashboard is one row lookup. Write paths call ``items_changed``
+with the ids they touched; after commit only those items are re-evaluated and merged in. The
+snapshot is rebuilt from scratch when it is missing or was computed on an earlier day (days to
+expiry and the consumption window move with the calendar).
+
+Priority scoring (min of days to expiry and days to empty) runs as one annotated query with
+ORDER BY/LIMIT on SQLite and PostgreSQL; other backends fall back to a batch path (NumPy when
+installed) over the raw columns. Consumption is read from the daily ConsumptionRollup rows, not
+the raw event history.
+"""
+import heapq
+from datetime import date, timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import IntegrityError, NotSupportedError, connections, transaction
+from django.db.models import DecimalField, F, FilteredRelation, FloatField, Func, IntegerField, Q, Sum, Value
+from django.db.models.functions import Cast, Coalesce, Least, NullIf, Round
+from django.utils import timezone
+
+from .models import InventoryItem, ConsumptionRollup, InventorySummary
+
+try:  # optional: vectorized fallback scoring
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+
+USE_BY_DAYS = 2
+BEST_BEFORE_DAYS = 5
+DEFAULT_WINDOW_DAYS = 14
+PRIORITY_LIMIT = int(getattr(settings, "INVENTORY_PRIORITY_LIMIT", 10))
+# bounds of the live summary query: rows scored per request, days of rollups per item
+MAX_PRIORITY_LIMIT = int(getattr(settings, "INVENTORY_MAX_PAGE_SIZE", 500))
+MAX_WINDOW_DAYS = 365
+
+
+class DaysUntil(Func):
+    """Whole days from ``today`` to a date column (NULL stays NULL)."""
+
+    output_field = IntegerField()
+
+    def __init__(self, expression, today: date, **extra):
+        super().__init__(expression, Value(today), **extra)
+
+    def as_sql(self, compiler, connection, **extra_context):
+        raise NotSupportedError(f"DaysUntil is not implemented for {connection.vendor}")
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        return super().as_sql(
+            compiler, connection,
+            template="CAST(julianday(%(expressions)s) AS INTEGER)", arg_joiner=") - julianday(",
+            **extra_context,
+        )
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        # date - date is an integer number of days
+        return super().as_sql(
+            compiler, connection,
+            template="(%(expressions)s::date)", arg_joiner=" - ",
+            **extra_context,
+        )
+
+
+def near_expiry_q(today: date) -> Q:
+    return Q(expiry_date__isnull=False) & (
+        Q(expiry_type="use_by", expiry_date__lte=today + timedelta(days=USE_BY_DAYS))
+        | Q(expiry_type="best_before", expiry_date__lte=today + timedelta(days=BEST_BEFORE_DAYS))
+    )
+
+
+def is_near_expiry(item: InventoryItem, today: date) -> bool:
+    if not item.expiry_date:
+        return False
+    days = USE_BY_DAYS if item.expiry_type == "use_by" else BEST_BEFORE_DAYS
+    return item.expiry_date <= today + timedelta(days=days)
+
+
+def _window_start(window_days: int, today: date) -> date:
+    """First rollup day inside the window: the last ``window_days`` calendar days, today included."""
+    return today - timedelta(days=max(window_days, 1) - 1)
+
+
+def _row(pk, name, quantity, unit, dte, days_to_empty) -> dict:
+    """Same shape the dashboard has always returned; smaller score is more urgent."""
+    if dte is not None and (days_to_empty is None or dte <= days_to_empty):
+        reason, score = "expiry", dte
+    else:
+        reason, score = "empty", round(days_to_empty, 2)
+    return {
+        "id": pk,
+        "name": name,
+        "quantity": float(quantity),
+        "unit": unit,
+        "days_to_expiry": dte,
+        "days_to_empty": round(days_to_empty, 2) if days_to_empty is not None else None,
+        "reason": reason,
+        "score": score,
+    }
+
+
+def scored_items(owner_id: int, window_days: int, today: date):
+    # one grouped LEFT JOIN over the item's daily rollups in the window (a range seek on the
+    # (item, day) unique index, at most window_days rows per item however long the history is)
+    recent = FilteredRelation("rollups", condition=Q(rollups__day__gte=_window_start(window_days, today)))
+    consumed = Sum("recent__consumed", output_field=FloatField())
+    days_to_empty = (
+        Cast("quantity", FloatField()) * Value(float(max(window_days, 1)))
+        / NullIf(Cast(consumed, FloatField()), Value(0.0))
+    )
+    # rounded here, not in _row(): the score stored in the snapshot and the ORDER BY key are then
+    # the same number, so snapshot merges (top_priority) and live reads rank ties alike
+    # (PostgreSQL has no two-argument ROUND for double precision, hence the numeric round trip)
+    days_to_empty = Cast(Round(Cast(days_to_empty, DecimalField(max_digits=30, decimal_places=10)), 2), FloatField())
+    dte = DaysUntil("expiry_date", today)
+    return (
+        InventoryItem.objects.filter(owner_id=owner_id)
+        .annotate(recent=recent)
+        .values("id", "name", "quantity", "unit", "expiry_date")  # GROUP BY just these columns
+        .annotate(dte=dte, days_to_empty=days_to_empty)
+        # SQLite's MIN() is NULL if any argument is; Coalesce keeps whichever side exists
+        .annotate(score=Coalesce(
+            Least(Cast(F("dte"), FloatField()), F("days_to_empty"), output_field=FloatField()),
+            Cast(F("dte"), FloatField()),
+            F("days_to_empty"),
+        ))
+        .filter(score__isnull=False)
+    )
+
+
+def _priority_sql(owner_id, window_days, limit, today, item_ids):
+    qs = scored_items(owner_id, window_days, today)
+    if item_ids is not None:
+        qs = qs.filter(id__in=list(item_ids))
+    qs = qs.order_by("score", "name", "id").values_list("id", "name", "quantity", "unit", "dte", "days_to_empty")
+    if limit is not None:
+        qs = qs[:limit]
+    return [_row(*r) for r in qs]
+
+
+def _priority_batch(owner_id, window_days, limit, today, item_ids):
+    """Backend-independent scoring: pull raw columns once, score in bulk, select the top-k."""
+    items = InventoryItem.objects.filter(owner_id=owner_id)
+    rollups = ConsumptionRollup.objects.filter(owner_id=owner_id, day__gte=_window_start(window_days, today), consumed__gt=0)
+    if item_ids is not None:
+        items = items.filter(id__in=list(item_ids))
+        rollups = rollups.filter(item_id__in=list(item_ids))
+    consumed = {
+        r["item_id"]: float(r["total"])
+        for r in rollups.order_by().values("item_id").annotate(total=Sum("consumed"))
+    }
+    rows = list(items.values_list("id", "name", "quantity", "unit", "expiry_date"))
+    if not rows:
+        return []
+    window = float(max(window_days, 1))
+
+    if np is not None:
+        qty = np.array([float(r[2]) for r in rows])
+        used = np.array([consumed.get(r[0], 0.0) for r in rows])
+        has_exp = np.array([r[4] is not None for r in rows])
+        dte = np.array([(r[4] - today).days if r[4] else 0 for r in rows], dtype=float)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            empty = np.where(used > 0, qty * window / used, np.nan)
+        # rounded like _row() so ties resolve by name/id the same way as the SQL path
+        score = np.fmin(np.where(has_exp, dte, np.nan), np.round(empty, 2))  # fmin ignores NaN
+        valid = np.flatnonzero(~np.isnan(score))
+        if limit is not None and 0 < limit < valid.size:
+            # keep everything up to the k-th smallest score (ties included); nsmallest orders them below
+            kth = np.partition(score[valid], limit - 1)[limit - 1]
+            valid = valid[score[valid] <= kth]
+        picked = [
+            _row(rows[i][0], rows[i][1], rows[i][2], rows[i][3],
+                 int(dte[i]) if has_exp[i] else None, None if np.isnan(empty[i]) else float(empty[i]))
+            for i in valid
+        ]
+    else:
+        picked = []
+        for pk, name, quantity, unit, expiry in rows:
+            used = consumed.get(pk, 0.0)
+            days_to_empty = float(quantity) * window / used if used > 0 else None
+            dte = (expiry - today).days if expiry else None
+            if dte is None and days_to_empty is None:
+                continue
+            picked.append(_row(pk, name, quantity, unit, dte, days_to_empty))
+
+    key = lambda r: (r["score"], r["name"], r["id"])  # noqa: E731
+    return heapq.nsmallest(limit, picked, key=key) if limit is not None else sorted(picked, key=key)
+
+
+def priority(owner_id: int, window_days: int = DEFAULT_WINDOW_DAYS, limit: int | None = PRIORITY_LIMIT,
+             today: date | None = None, item_ids=None) -> list[dict]:
+    """Top ``limit`` items by urgency (all when ``limit`` is None), optionally restricted to ``item_ids``."""
+    today = today or date.today()
+    if connections[InventoryItem.objects.db].vendor in {"sqlite", "postgresql"}:
+        return _priority_sql(owner_id, window_days, limit, today, item_ids)
+    return _priority_batch(owner_id, window_days, limit, today, item_ids)
+
+
+def top_priority(rows, limit: int = PRIORITY_LIMIT) -> list[dict]:
+    return sorted(rows, key=lambda r: (r["score"], r["name"], r["id"]))[:limit]
+
+
+def flags(owner_id: int, item_ids=None, today: date | None = None) -> tuple[set, set]:
+    """(low-stock ids, near-expiry ids), for all items or just ``item_ids``."""
+    today = today or date.today()
+    qs = InventoryItem.objects.filter(owner_id=owner_id)
+    if item_ids is not None:
+        qs = qs.filter(id__in=list(item_ids))
+    low = set(qs.filter(quantity__lte=F("min_stock")).values_list("id", flat=True))
+    near = set(qs.filter(near_expiry_q(today)).values_list("id", flat=True))
+    return low, near
+
+
+def rebuild(owner_id: int) -> InventorySummary:
+    """Full recompute of a user's snapshot."""
+    today = date.today()
+    low, near = flags(owner_id, today=today)
+    values = {
+        "computed_on": today,
+        "window_days": DEFAULT_WINDOW_DAYS,
+        "low_stock_ids": sorted(low),
+        "near_expiry_ids": sorted(near),
+        "priority": priority(owner_id, DEFAULT_WINDOW_DAYS, PRIORITY_LIMIT, today),
+    }
+    try:
+        with transaction.atomic():
+            snapshot, _ = InventorySummary.objects.update_or_create(owner_id=owner_id, defaults=values)
+    except IntegrityError:
+        # a concurrent first write created the row between our lookup and our insert
+        InventorySummary.objects.filter(owner_id=owner_id).update(**values, updated_at=timezone.now())
+        snapshot = InventorySummary.objects.get(owner_id=owner_id)
+    return snapshot
+
+
+def refresh(owner_id: int, item_ids) -> InventorySummary:
+    """Re-evaluate only ``item_ids`` and merge them into the snapshot (rebuilding if stale)."""
+    with transaction.atomic():
+        snapshot = InventorySummary.objects.select_for_update().filter(owner_id=owner_id).first()
+        today = date.today()
+        if snapshot is None or snapshot.computed_on != today:
+            return rebuild(owner_id)
+
+        ids = set(item_ids)
+        low, near = flags(owner_id, ids, today)
+        snapshot.low_stock_ids = sorted((set(snapshot.low_stock_ids) - ids) | low)
+        snapshot.near_expiry_ids = sorted((set(snapshot.near_expiry_ids) - ids) | near)
+
+        if any(r["id"] in ids for r in snapshot.priority):
+            # a listed item changed and may now rank below rows we do not keep: re-run the top-k query
+            snapshot.priority = priority(owner_id, snapshot.window_days, PRIORITY_LIMIT, today)
+        else:
+            # untouched rows keep their rank, so the new top-k is within old top-k + touched rows
+            touched = priority(owner_id, snapshot.window_days, None, today, item_ids=ids)
+            snapshot.priority = top_priority(snapshot.priority + touched)
+        snapshot.save(update_fields=["low_stock_ids", "near_expiry_ids", "priority", "updated_at"])
+        return snapshot
+
+
+def _refresh_after_commit(owner_id: int, ids: set) -> None:
+    try:
+        refresh(owner_id, ids)
+    except Exception:
+        # the write itself has committed: leave the snapshot stale so the next read rebuilds it
+        InventorySummary.objects.filter(owner_id=owner_id).update(computed_on=date.today() - timedelta(days=1))
+        raise
+
+
+def items_changed(owner_id: int, item_ids) -> None:
+    """Schedule an incremental refresh for the touched items once the current transaction commits.
+
+    A failing refresh is logged by Django (robust callback) rather than failing the committed write.
+    """
+    ids = {pk for pk in item_ids if pk is not None}
+    if ids:
+        transaction.on_commit(lambda: _refresh_after_commit(owner_id, ids), robust=True)
+
+
+def get_snapshot(owner_id: int) -> InventorySummary:
+    snapshot = InventorySummary.objects.filter(owner_id=owner_id).first()
+    if snapshot is None or snapshot.computed_on != date.today():
+        snapshot = rebuild(owner_id)
+    return snapshot
+
+
+async def aget_snapshot(owner_id: int) -> InventorySummary:
+    snapshot = await InventorySummary.objects.filter(owner_id=owner_id).afirst()
+    if snapshot is None or snapshot.computed_on != date.today():
+        snapshot = await sync_to_async(rebuild)(owner_id)
+    return snapshot
+
+
+def live(owner_id: int, window_days: int, limit: int = PRIORITY_LIMIT) -> dict:
+    """Uncached computation for a non-snapshot window/limit; same shape as the snapshot fields."""
+    low, near = flags(owner_id)
+    return {
+        "low_stock_ids": sorted(low),
+        "near_expiry_ids": sorted(near),
+        "priority": priority(owner_id, window_days, limit),
+    }
+
+
+def diff(owner_id: int) -> list[str]:
+    """Compare the stored snapshot with a fresh evaluation; returns human-readable mismatches.
+
+    Missing or previous-day snapshots are not drift: the next read rebuilds them anyway.
+    """
+    snapshot = InventorySummary.objects.filter(owner_id=owner_id).first()
+    if snapshot is None or snapshot.computed_on != date.today():
+        return []
+    fresh = live(owner_id, snapshot.window_days)
+    problems = []
+    for field in ("low_stock_ids", "near_expiry_ids"):
+        stored, actual = set(getattr(snapshot, field)), set(fresh[field])
+        if stored != actual:
+            problems.append(f"{field}: missing {sorted(actual - stored)}, extra {sorted(stored - actual)}")
+    if snapshot.priority != fresh["priority"]:
+        problems.append("priority differs")
+    return problems
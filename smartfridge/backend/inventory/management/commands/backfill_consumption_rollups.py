@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from inventory.models import ConsumptionRollup, InventorySummary
+
+
+class Command(BaseCommand):
+    help = "Rebuild the daily consumption rollups and per-item EWMA rates from the raw event history."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", type=int, action="append", help="Only this owner id (repeatable)")
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            count = ConsumptionRollup.objects.rebuild(options["user"])
+            # dashboard priority reads the rollups; drop snapshots so the next read rebuilds them
+            snapshots = InventorySummary.objects.all()
+            if options["user"]:
+                snapshots = snapshots.filter(owner_id__in=options["user"])
+            snapshots.delete()
+        scope = f"user(s) {', '.join(map(str, options['user']))}" if options["user"] else "all users"
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {count} rollup rows for {scope}."))
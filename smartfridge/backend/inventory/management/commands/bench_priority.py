@@ -0,0 +1,93 @@
+import random
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from inventory import dashboard
+from inventory.models import ConsumptionEvent, ConsumptionRollup, InventoryItem, normalize_name
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = "Time dashboard priority scoring (SQL top-k vs batch paths) on synthetic data (runs in a rolled-back transaction)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--items", type=int, default=10_000)
+        parser.add_argument("--events", type=int, default=1_000_000)
+        parser.add_argument("--limit", type=int, default=dashboard.PRIORITY_LIMIT)
+        parser.add_argument("--window-days", type=int, default=dashboard.DEFAULT_WINDOW_DAYS)
+        parser.add_argument("--repeat", type=int, default=3)
+
+    def handle(self, *args, **options):
+        rng = random.Random(0)
+        today = date.today()
+        limit, window = options["limit"], options["window_days"]
+        try:
+            with transaction.atomic():
+                user = get_user_model().objects.create_user(username="__bench_priority")
+                items = InventoryItem.objects.bulk_create(
+                    [
+                        InventoryItem(
+                            owner=user,
+                            name=f"Bench item {i}",
+                            normalized_name=normalize_name(f"Bench item {i}"),
+                            quantity=Decimal(rng.randint(0, 20)),
+                            expiry_date=today + timedelta(days=rng.randint(-5, 60)) if rng.random() < 0.6 else None,
+                        )
+                        for i in range(options["items"])
+                    ],
+                    batch_size=2000,
+                )
+                ids = [it.pk for it in items]
+                start = time.perf_counter()
+                for offset in range(0, options["events"], 10_000):
+                    ConsumptionEvent.objects.bulk_create(
+                        [
+                            ConsumptionEvent(owner=user, item_id=rng.choice(ids), action="consume", delta=Decimal(-rng.randint(1, 3)))
+                            for _ in range(min(10_000, options["events"] - offset))
+                        ],
+                        batch_size=2000,
+                    )
+                # push roughly half of the history outside the scoring window, then roll it up
+                cutoff = ConsumptionEvent.objects.filter(owner=user).order_by("id").values_list("id", flat=True)[options["events"] // 2]
+                ConsumptionEvent.objects.filter(owner=user, id__lt=cutoff).update(
+                    created_at=timezone.now() - timedelta(days=window + 30)
+                )
+                ConsumptionRollup.objects.rebuild([user.pk])
+                self.stdout.write(f"seeded {len(ids)} items / {options['events']} events in {time.perf_counter() - start:.1f}s")
+
+                paths = [("sql top-k", dashboard._priority_sql), ("batch", dashboard._priority_batch)]
+                if dashboard.np is not None:
+                    paths.append(("batch (no numpy)", self._without_numpy(dashboard._priority_batch)))
+                reference = None
+                for label, fn in paths:
+                    best = None
+                    for _ in range(options["repeat"]):
+                        start = time.perf_counter()
+                        rows = fn(user.pk, window, limit, today, None)
+                        elapsed = (time.perf_counter() - start) * 1000
+                        best = elapsed if best is None else min(best, elapsed)
+                    reference = rows if reference is None else reference
+                    same = "ok" if rows == reference else "MISMATCH"
+                    self.stdout.write(f"{label:>18}: {best:9.1f} ms  ({len(rows)} rows, {same})")
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    @staticmethod
+    def _without_numpy(fn):
+        def run(*args):
+            saved, dashboard.np = dashboard.np, None
+            try:
+                return fn(*args)
+            finally:
+                dashboard.np = saved
+        return run
@@ -0,0 +1,48 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from inventory.views import InventoryItemViewSet
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = "Count queries and time quick-add for growing batch sizes (runs in a rolled-back transaction)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", default="1,10,50,200", help="Comma separated batch sizes")
+
+    def handle(self, *args, **options):
+        sizes = [int(s) for s in options["sizes"].split(",") if s.strip()]
+        view = InventoryItemViewSet.as_view({"post": "quick_add"})
+        factory = APIRequestFactory()
+
+        self.stdout.write(f"{'batch':>6} {'new q':>6} {'merge q':>8} {'new ms':>8} {'merge ms':>9}")
+        for size in sizes:
+            try:
+                with transaction.atomic():
+                    user = get_user_model().objects.create_user(username=f"__bench_quick_add_{size}")
+                    payload = {"items": [{"name": f"Bench item {i}", "quantity": 1, "unit": "pcs"} for i in range(size)]}
+                    row = [size]
+                    timings = []
+                    # first pass creates every item, second pass merges into them
+                    for _ in range(2):
+                        request = factory.post("/api/v1/inventory/items/quick-add/", payload, format="json")
+                        force_authenticate(request, user=user)
+                        with CaptureQueriesContext(connection) as ctx:
+                            start = time.perf_counter()
+                            response = view(request)
+                            timings.append((time.perf_counter() - start) * 1000)
+                        assert response.status_code == 200, response.data
+                        row.append(len(ctx.captured_queries))
+                    self.stdout.write(f"{row[0]:>6} {row[1]:>6} {row[2]:>8} {timings[0]:>8.1f} {timings[1]:>9.1f}")
+                    raise _Rollback
+            except _Rollback:
+                pass
@@ -0,0 +1,32 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from inventory.dashboard import diff, rebuild
+
+
+class Command(BaseCommand):
+    help = "Compare each user's dashboard snapshot with a full recompute; --fix rebuilds the ones that drifted."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", type=int, default=None, help="Only check this user id")
+        parser.add_argument("--fix", action="store_true", help="Rebuild mismatching snapshots")
+
+    def handle(self, *args, **options):
+        users = get_user_model().objects.order_by("id").values_list("id", flat=True)
+        if options["user"] is not None:
+            users = users.filter(id=options["user"])
+
+        drifted = 0
+        for owner_id in users.iterator():
+            problems = diff(owner_id)
+            if not problems:
+                continue
+            drifted += 1
+            self.stdout.write(f"user {owner_id}: " + "; ".join(problems))
+            if options["fix"]:
+                rebuild(owner_id)
+                self.stdout.write(f"user {owner_id}: rebuilt")
+
+        if drifted and not options["fix"]:
+            raise CommandError(f"{drifted} snapshot(s) out of date; rerun with --fix to rebuild")
+        self.stdout.write(self.style.SUCCESS(f"Checked snapshots, {drifted} rebuilt." if drifted else "All snapshots consistent."))
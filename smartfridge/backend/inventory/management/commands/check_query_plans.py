@@ -0,0 +1,76 @@
+from datetime import date, timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from inventory.dashboard import scored_items
+from inventory.models import InventoryItem, ConsumptionEvent, ShoppingTask, CookHistory
+
+
+class Command(BaseCommand):
+    help = "EXPLAIN the owner-scoped hot queries and fail if any of them stops using its index."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", type=int, default=None, help="Owner id to plan against (default: any user)")
+        parser.add_argument("--verbose-plans", action="store_true", help="Print the full plan for every query")
+
+    def hot_queries(self, owner_id: int):
+        today = date.today()
+        since = timezone.now() - timedelta(days=14)
+        items = InventoryItem.objects.filter(owner_id=owner_id)
+        return [
+            ("items list (keyset)", items.filter(Q(name__gt="m") | Q(name="m", id__gt=0)).order_by("name", "id")[:100], "inv_item_owner_name_idx"),
+            # SQLite backs the inline UNIQUE constraint with an anonymous autoindex
+            ("merge by name", items.named("Milk"), ("inv_item_owner_norm_uniq", "sqlite_autoindex_inventory_inventoryitem")),
+            ("near expiry", items.filter(expiry_date__lte=today + timedelta(days=5)), "inv_item_owner_expiry_idx"),
+            ("low stock", items.filter(quantity__lte=F("min_stock")), "inv_item_low_stock_idx"),
+            (
+                "consumption window",
+                ConsumptionEvent.objects.filter(owner_id=owner_id, created_at__gte=since).order_by(),
+                "inv_event_owner_created_idx",
+            ),
+            (
+                "priority top-k",
+                scored_items(owner_id, 14, today).order_by("score", "name", "id")[:10],
+                ("inv_rollup_item_day_uniq", "sqlite_autoindex_inventory_consumptionrollup"),
+            ),
+            (
+                "pending shopping tasks",
+                ShoppingTask.objects.filter(owner_id=owner_id, status="pending").order_by("status", "-created_at"),
+                "inv_task_owner_status_idx",
+            ),
+            (
+                "cook history",
+                CookHistory.objects.filter(owner_id=owner_id).order_by("-created_at"),
+                "inv_cook_owner_created_idx",
+            ),
+        ]
+
+    def handle(self, *args, **options):
+        owner_id = options["user"]
+        if owner_id is None:
+            owner_id = get_user_model().objects.values_list("id", flat=True).first() or 0
+
+        failures = []
+        with transaction.atomic():
+            if connection.vendor == "postgresql":
+                # Small/dev tables would otherwise be sequentially scanned; we only care that the index is usable.
+                with connection.cursor() as cursor:
+                    cursor.execute("SET LOCAL enable_seqscan = off")
+            for label, qs, index_names in self.hot_queries(owner_id):
+                if isinstance(index_names, str):
+                    index_names = (index_names,)
+                plan = qs.explain()
+                ok = any(name in plan for name in index_names)
+                self.stdout.write(f"[{'ok' if ok else 'FAIL'}] {label}: expects {index_names[0]}")
+                if options["verbose_plans"] or not ok:
+                    self.stdout.write("    " + plan.replace("\n", "\n    "))
+                if not ok:
+                    failures.append(label)
+
+        if failures:
+            raise CommandError(f"{len(failures)} hot quer{'y' if len(failures) == 1 else 'ies'} not using the expected index: {', '.join(failures)}")
+        self.stdout.write(self.style.SUCCESS(f"All hot queries use their indexes ({connection.vendor})."))
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.7 on 2026-02-18 00:00
+
+import django.db.models.functions.text
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0005_inventoryitem_expiry_type'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='consumptionevent',
+            index=models.Index(fields=['owner', 'created_at'], name='inv_event_owner_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='cookhistory',
+            index=models.Index(fields=['owner', 'created_at'], name='inv_cook_owner_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='inventoryitem',
+            index=models.Index(fields=['owner', 'name', 'id'], name='inv_item_owner_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='inventoryitem',
+            index=models.Index(models.F('owner'), django.db.models.functions.text.Lower('name'), name='inv_item_owner_lname_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='inventoryitem',
+            index=models.Index(fields=['owner', 'expiry_date'], name='inv_item_owner_expiry_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='inventoryitem',
+            index=models.Index(condition=models.Q(('quantity__lte', models.F('min_stock'))), fields=['owner', 'name'], name='inv_item_low_stock_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='shoppingtask',
+            index=models.Index(fields=['owner', 'status', 'created_at'], name='inv_task_owner_status_idx'),
+        ),
+    ]
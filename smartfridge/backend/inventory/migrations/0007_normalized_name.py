@@ -0,0 +1,110 @@
+# Generated by Django 5.2.7 on 2026-02-18 00:00
+
+import unicodedata
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def _normalize(name):
+    # frozen copy of inventory.models.normalize_name
+    return " ".join(unicodedata.normalize("NFKC", name or "").split()).casefold()
+
+
+def _unit_key(unit):
+    return (unit or "").strip().casefold()
+
+
+def _merge(keep, dups):
+    for dup in dups:
+        keep.quantity += dup.quantity
+        for f in ("category", "location", "container", "barcode", "brand", "tags", "notes"):
+            if not getattr(keep, f) and getattr(dup, f):
+                setattr(keep, f, getattr(dup, f))
+        if dup.expiry_date and (keep.expiry_date is None or dup.expiry_date < keep.expiry_date):
+            keep.expiry_date = dup.expiry_date
+
+
+def _unit_suffixed(item, taken):
+    """Rename ``item`` to "<name> (<unit>)" (numbered if that is taken too) and claim the new key."""
+    base = f" ({item.unit.strip() or 'no unit'})"
+    n = 1
+    while True:
+        suffix = base if n == 1 else f"{base} {n}"
+        name = item.name[:200 - len(suffix)] + suffix
+        key = (item.owner_id, _normalize(name))
+        if key not in taken:
+            taken.add(key)
+            item.name, item.normalized_name = name, key[1]
+            return
+        n += 1
+
+
+def dedupe_items(apps, schema_editor):
+    """Fill normalized_name and merge rows that collapse onto the same (owner, normalized_name).
+
+    Only rows with the same unit are merged (500 ml and 1 L of milk are not 501 of anything).
+    Within a unit, the most recently updated row survives (same rule quick-add used to pick among
+    duplicates); quantities are summed, empty metadata is filled from the duplicates, the earliest
+    expiry wins, and events/shopping tasks are re-pointed before the duplicates are deleted. The
+    unit of the most recently updated row keeps the name; each other unit keeps a row of its own,
+    renamed "<name> (<unit>)" so the (owner, normalized_name) constraint of 0008 holds.
+    """
+    InventoryItem = apps.get_model("inventory", "InventoryItem")
+    ConsumptionEvent = apps.get_model("inventory", "ConsumptionEvent")
+    ShoppingTask = apps.get_model("inventory", "ShoppingTask")
+
+    groups = {}
+    for item in InventoryItem.objects.order_by("owner_id", "-updated_at", "id").iterator():
+        item.normalized_name = _normalize(item.name)
+        groups.setdefault((item.owner_id, item.normalized_name), []).append(item)
+
+    taken = set(groups)
+    survivors = []
+    doomed = []
+    for rows in groups.values():
+        by_unit = {}
+        for item in rows:
+            by_unit.setdefault(_unit_key(item.unit), []).append(item)
+        for i, (keep, *dups) in enumerate(by_unit.values()):
+            _merge(keep, dups)
+            if i:
+                _unit_suffixed(keep, taken)
+            if dups:
+                ids = [d.id for d in dups]
+                ConsumptionEvent.objects.filter(item_id__in=ids).update(item_id=keep.id)
+                ShoppingTask.objects.filter(item_id__in=ids).update(item_id=keep.id)
+                doomed.extend(ids)
+            survivors.append(keep)
+
+    InventoryItem.objects.bulk_update(
+        survivors,
+        ["name", "normalized_name", "quantity", "category", "location", "container",
+         "barcode", "brand", "tags", "notes", "expiry_date"],
+        batch_size=500,
+    )
+    if doomed:
+        InventoryItem.objects.filter(id__in=doomed).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("inventory", "0006_hot_query_indexes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="inventoryitem",
+            name="inv_item_owner_lname_idx",
+        ),
+        migrations.AddField(
+            model_name="inventoryitem",
+            name="normalized_name",
+            field=models.CharField(default="", editable=False, max_length=200),
+        ),
+        # the unique constraint is added in 0008: PostgreSQL refuses ALTER TABLE on a table
+        # with pending deferred FK trigger events from this data migration
+        migrations.RunPython(dedupe_items, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.7 on 2026-02-18 00:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("inventory", "0007_normalized_name"),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name="inventoryitem",
+            constraint=models.UniqueConstraint(fields=("owner", "normalized_name"), name="inv_item_owner_norm_uniq"),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.7 on 2026-02-18 00:00
+
+from django.db import migrations
+
+
+def detach_duplicate_pending(apps, schema_editor):
+    """Keep the oldest pending task per item linked; unlink the rest (they stay as name-only tasks)."""
+    ShoppingTask = apps.get_model("inventory", "ShoppingTask")
+    seen = set()
+    duplicates = []
+    pending = ShoppingTask.objects.filter(status="pending", item__isnull=False).order_by("item_id", "created_at", "id")
+    for task_id, item_id in pending.values_list("id", "item_id").iterator():
+        if item_id in seen:
+            duplicates.append(task_id)
+        seen.add(item_id)
+    if duplicates:
+        ShoppingTask.objects.filter(id__in=duplicates).update(item=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("inventory", "0008_inventoryitem_owner_norm_uniq"),
+    ]
+
+    operations = [
+        # the partial unique constraint follows in 0010 (separate transaction on PostgreSQL)
+        migrations.RunPython(detach_duplicate_pending, migrations.RunPython.noop),
+    ]
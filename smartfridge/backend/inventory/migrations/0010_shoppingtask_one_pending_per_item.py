@@ -0,0 +1,19 @@
+# Generated by Django 5.2.7 on 2026-02-18 00:00
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0009_dedupe_pending_tasks'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='shoppingtask',
+            constraint=models.UniqueConstraint(condition=models.Q(('item__isnull', False), ('status', 'pending')), fields=('item',), name='inv_task_one_pending_per_item'),
+        ),
+    ]
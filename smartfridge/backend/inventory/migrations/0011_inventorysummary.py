@@ -0,0 +1,29 @@
+# Generated by Django 5.2.7 on 2026-02-18 00:00
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0010_shoppingtask_one_pending_per_item'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InventorySummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('computed_on', models.DateField()),
+                ('window_days', models.PositiveIntegerField(default=14)),
+                ('low_stock_ids', models.JSONField(default=list)),
+                ('near_expiry_ids', models.JSONField(default=list)),
+                ('priority', models.JSONField(default=list)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('owner', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='inventory_summary', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
@@ -0,0 +1,100 @@
+# Generated by Django 5.2.7 on 2026-02-18 00:00
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Q, Sum
+from django.db.models.functions import TruncDate
+
+
+def backfill_rollups(apps, schema_editor):
+    """ConsumptionRollupQuerySet.rebuild() on the historical models: roll the existing event
+    history up by (item, day) and fold it into each item's EWMA rate, so dashboard priority
+    (which reads only rollups) keeps every user's consumption data after the deploy."""
+    db = schema_editor.connection.alias
+    ConsumptionEvent = apps.get_model("inventory", "ConsumptionEvent")
+    ConsumptionRollup = apps.get_model("inventory", "ConsumptionRollup")
+    InventoryItem = apps.get_model("inventory", "InventoryItem")
+    InventorySummary = apps.get_model("inventory", "InventorySummary")
+    decay = 0.5 ** (1 / float(getattr(settings, "INVENTORY_RATE_HALF_LIFE_DAYS", 7)))
+
+    rows = (
+        ConsumptionEvent.objects.using(db).order_by()
+        .annotate(day=TruncDate("created_at"))
+        .values("owner_id", "item_id", "day")
+        .annotate(consumed=Sum("delta", filter=Q(delta__lt=0)), added=Sum("delta", filter=Q(delta__gt=0)))
+        .order_by("item_id", "day")
+    )
+    fresh = [
+        ConsumptionRollup(
+            owner_id=r["owner_id"], item_id=r["item_id"], day=r["day"],
+            consumed=-(r["consumed"] or 0), added=r["added"] or 0,
+        )
+        for r in rows
+    ]
+    ConsumptionRollup.objects.using(db).bulk_create(fresh, batch_size=1000)
+
+    # same fold as InventoryItem.fold_consumption, days in ascending order
+    rates = {}
+    for rollup in fresh:
+        if not rollup.consumed:
+            continue
+        weight = (1 - decay) * float(rollup.consumed)
+        rate, on = rates.get(rollup.item_id, (None, None))
+        rates[rollup.item_id] = (weight, rollup.day) if on is None else (
+            rate * decay ** (rollup.day - on).days + weight, rollup.day
+        )
+    items = list(InventoryItem.objects.using(db).filter(pk__in=list(rates)).only("id"))
+    for item in items:
+        item.consumption_rate, item.consumption_rate_on = rates[item.pk]
+    InventoryItem.objects.using(db).bulk_update(items, ["consumption_rate", "consumption_rate_on"], batch_size=1000)
+    # snapshots were scored from the raw events; the next read rebuilds them from the rollups
+    InventorySummary.objects.using(db).all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0011_inventorysummary'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ConsumptionRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('consumed', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('added', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+            ],
+            options={
+                'ordering': ['item', '-day'],
+            },
+        ),
+        migrations.AddField(
+            model_name='inventoryitem',
+            name='consumption_rate',
+            field=models.FloatField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='inventoryitem',
+            name='consumption_rate_on',
+            field=models.DateField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='consumptionrollup',
+            name='item',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rollups', to='inventory.inventoryitem'),
+        ),
+        migrations.AddField(
+            model_name='consumptionrollup',
+            name='owner',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='consumption_rollups', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddConstraint(
+            model_name='consumptionrollup',
+            constraint=models.UniqueConstraint(fields=('item', 'day'), name='inv_rollup_item_day_uniq'),
+        ),
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
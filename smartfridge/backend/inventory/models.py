@@ -1,5 +1,125 @@
+from decimal import Decimal
+
 from django.conf import settings
-from django.db import models
+from django.contrib.auth import get_user_model
+from django.db import connections, models, transaction
+from django.db.models import Case, F, Q, Sum, Value, When
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from ai.shelf_life import normalize_name  # noqa: F401  (re-exported: the canonical item-name key)
+
+
+# per-day decay of the consumption-rate EWMA
+RATE_DECAY = 0.5 ** (1 / float(getattr(settings, "INVENTORY_RATE_HALF_LIFE_DAYS", 7)))
+
+
+def local_day(moment):
+    return timezone.localdate(moment) if timezone.is_aware(moment) else moment.date()
+
+
+class InventoryItemQuerySet(models.QuerySet):
+    def named(self, name: str):
+        """Match by canonical name, served by the (owner, normalized_name) unique index."""
+        return self.filter(normalized_name=normalize_name(name))
+
+    def lock_or_create_named(self, owner, entries: dict) -> dict:
+        """Lock items by normalized name (in id order) and bulk-create the missing ones.
+
+        ``entries`` maps normalized name -> field values used only when the row has to be created.
+        Two queries at most; returns normalized name -> item.
+        """
+        found = {
+            it.normalized_name: it
+            for it in self.select_for_update().filter(owner=owner, normalized_name__in=list(entries)).order_by("id")
+        }
+        missing = [
+            self.model(owner=owner, normalized_name=key, **{"quantity": 0, **values})
+            for key, values in entries.items()
+            if key not in found
+        ]
+        if missing:
+            # a concurrent request may have inserted the same name meanwhile; reuse its row
+            self.bulk_create(
+                missing,
+                update_conflicts=True,
+                unique_fields=["owner", "normalized_name"],
+                update_fields=["updated_at"],
+            )
+            found.update({it.normalized_name: it for it in missing})
+        return found
+
+    def add_quantities(self, deltas: dict, *, expiry_dates: dict | None = None, touch: bool = True) -> int:
+        """Apply ``{pk: delta}`` (and optionally ``{pk: expiry_date}``) in a single CASE update.
+
+        Rows sharing a delta or a date share one WHEN branch, so a typical "+1 each" batch
+        compiles to a one-branch CASE however many rows it touches.
+        """
+        if not deltas:
+            return 0
+        qty_field = self.model._meta.get_field("quantity")
+        by_delta = {}
+        for pk, delta in deltas.items():
+            by_delta.setdefault(delta, []).append(pk)
+        values = {
+            "quantity": Case(
+                *[When(pk__in=pks, then=F("quantity") + Value(delta, output_field=qty_field)) for delta, pks in by_delta.items()],
+                default=F("quantity"),
+                output_field=qty_field,
+            )
+        }
+        if expiry_dates:
+            by_date = {}
+            for pk, day in expiry_dates.items():
+                by_date.setdefault(day, []).append(pk)
+            values["expiry_date"] = Case(
+                *[When(pk__in=pks, then=Value(day)) for day, pks in by_date.items()],
+                default=F("expiry_date"),
+                output_field=self.model._meta.get_field("expiry_date"),
+            )
+        if touch:
+            values["updated_at"] = timezone.now()
+        return self.filter(pk__in=list(deltas)).update(**values)
+
+    def upsert_add(self, owner, name: str, quantity, *, overwrite_expiry: bool = False, **fields) -> "InventoryItem":
+        """Create-or-increment an item by canonical name in one INSERT ... ON CONFLICT DO UPDATE.
+
+        On conflict the quantity is added, empty unit/category/location/container are filled from
+        ``fields`` and expiry_date is replaced when ``overwrite_expiry`` (otherwise only filled).
+        Returns the resulting row.
+        """
+        connection = connections[self.db]
+        qn = connection.ops.quote_name
+        obj = self.model(owner=owner, name=name, quantity=quantity, **fields)
+        obj.normalized_name = normalize_name(name)
+
+        concrete = [f for f in self.model._meta.concrete_fields if not f.primary_key]
+        columns = ", ".join(qn(f.column) for f in concrete)
+        placeholders = ", ".join(["%s"] * len(concrete))
+        params = [f.get_db_prep_save(f.pre_save(obj, True), connection) for f in concrete]
+
+        table = qn(self.model._meta.db_table)
+
+        def col(field_name: str) -> str:
+            return qn(self.model._meta.get_field(field_name).column)
+
+        updates = [f"{col('quantity')} = {table}.{col('quantity')} + excluded.{col('quantity')}"]
+        for f in ("unit", "category", "location", "container"):
+            c = col(f)
+            updates.append(f"{c} = CASE WHEN {table}.{c} = '' THEN excluded.{c} ELSE {table}.{c} END")
+        exp = col("expiry_date")
+        if overwrite_expiry:
+            updates.append(f"{exp} = COALESCE(excluded.{exp}, {table}.{exp})")
+        else:
+            updates.append(f"{exp} = COALESCE({table}.{exp}, excluded.{exp})")
+        updates.append(f"{col('updated_at')} = excluded.{col('updated_at')}")
+
+        sql = (
+            f"INSERT INTO {table} ({columns}) VALUES ({placeholders}) "
+            f"ON CONFLICT ({col('owner')}, {col('normalized_name')}) DO UPDATE SET {', '.join(updates)} "
+            f"RETURNING *"
+        )
+        return next(iter(self.raw(sql, params)))
 
 
 class InventoryItem(models.Model):
@@ -14,6 +134,7 @@ class InventoryItem(models.Model):
         related_name="inventory_items",
     )
     name = models.CharField(max_length=200)
+    normalized_name = models.CharField(max_length=200, editable=False, default="")  # see normalize_name()
     category = models.CharField(max_length=100, blank=True, default="")
     location = models.CharField(max_length=100, blank=True, default="")  # 位置/层/容器
     container = models.CharField(max_length=100, blank=True, default="")
@@ -31,16 +152,68 @@ class InventoryItem(models.Model):
 
     notes = models.TextField(blank=True, default="")
 
+    # EWMA of daily consumption as of consumption_rate_on; maintained by ConsumptionRollup
+    consumption_rate = models.FloatField(default=0, editable=False)
+    consumption_rate_on = models.DateField(null=True, blank=True, editable=False)
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = InventoryItemQuerySet.as_manager()
+
     class Meta:
         ordering = ["name", "-updated_at"]
+        indexes = [
+            # list ordering + keyset pagination
+            models.Index(fields=["owner", "name", "id"], name="inv_item_owner_name_idx"),
+            # near-expiry / expired filters
+            models.Index(fields=["owner", "expiry_date"], name="inv_item_owner_expiry_idx"),
+            # low stock (quantity <= min_stock), already in list order
+            models.Index(fields=["owner", "name"], condition=Q(quantity__lte=F("min_stock")), name="inv_item_low_stock_idx"),
+        ]
+        constraints = [
+            # one row per canonical name; also the merge-by-name lookup index and upsert conflict target
+            models.UniqueConstraint(fields=["owner", "normalized_name"], name="inv_item_owner_norm_uniq"),
+        ]
+
+    def save(self, *args, **kwargs):
+        self.normalized_name = normalize_name(self.name)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "name" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "normalized_name"}
+        super().save(*args, **kwargs)
+
+    def daily_rate(self, today=None) -> float:
+        """Consumption per day, decayed through the days since the last consumption."""
+        if self.consumption_rate_on is None:
+            return 0.0
+        days = ((today or timezone.localdate()) - self.consumption_rate_on).days
+        return self.consumption_rate * RATE_DECAY ** max(days, 0)
+
+    def fold_consumption(self, day, consumed: float) -> None:
+        """Add one day's consumption to the EWMA (in memory; caller saves)."""
+        weight = (1 - RATE_DECAY) * consumed
+        if self.consumption_rate_on is None:
+            self.consumption_rate, self.consumption_rate_on = weight, day
+        elif day >= self.consumption_rate_on:
+            gap = (day - self.consumption_rate_on).days
+            self.consumption_rate = self.consumption_rate * RATE_DECAY ** gap + weight
+            self.consumption_rate_on = day
+        else:  # an older day arriving late
+            self.consumption_rate += weight * RATE_DECAY ** (self.consumption_rate_on - day).days
 
     def __str__(self) -> str:  # pragma: no cover
         return f"{self.name} ({self.quantity}{self.unit})"
 
 
+class ConsumptionEventQuerySet(models.QuerySet):
+    def record(self, events: list) -> list:
+        """bulk_create ``events`` and fold them into the daily rollups and item rates."""
+        events = self.bulk_create(events)
+        ConsumptionRollup.objects.accumulate(events)
+        return events
+
+
 class ConsumptionEvent(models.Model):
     ACTIONS = (
         ("consume", "Consume"),
@@ -54,8 +227,193 @@ class ConsumptionEvent(models.Model):
     note = models.CharField(max_length=255, blank=True, default="")
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = ConsumptionEventQuerySet.as_manager()
+
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["owner", "created_at"], name="inv_event_owner_created_idx"),
+        ]
+
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        super().save(*args, **kwargs)
+        if adding:
+            ConsumptionRollup.objects.accumulate([self])
+
+
+class ConsumptionRollupQuerySet(models.QuerySet):
+    def accumulate(self, events) -> None:
+        """Add freshly inserted events to their (item, day) rollups and the items' EWMA rates.
+
+        One INSERT ... ON CONFLICT DO UPDATE per batch of buckets, plus a locked read and a bulk
+        update of the touched items when the events include consumption.
+        """
+        buckets = {}
+        for ev in events:
+            key = (ev.item_id, local_day(ev.created_at))
+            owner_id, consumed, added = buckets.get(key, (ev.owner_id, Decimal(0), Decimal(0)))
+            delta = Decimal(str(ev.delta))
+            if delta < 0:
+                consumed -= delta
+            else:
+                added += delta
+            buckets[key] = (owner_id, consumed, added)
+        if not buckets:
+            return
+
+        connection = connections[self.db]
+        qn = connection.ops.quote_name
+        meta = self.model._meta
+        table = qn(meta.db_table)
+        fields = [meta.get_field(n) for n in ("owner", "item", "day", "consumed", "added")]
+        columns = ", ".join(qn(f.column) for f in fields)
+        consumed_col, added_col = qn(fields[3].column), qn(fields[4].column)
+        rows = [
+            (owner_id, item_id, day, consumed, added)
+            for (item_id, day), (owner_id, consumed, added) in buckets.items()
+        ]
+        batch = max(connection.ops.bulk_batch_size(fields, rows), 1)
+        with transaction.atomic(using=self.db), connection.cursor() as cursor:
+            for start in range(0, len(rows), batch):
+                chunk = rows[start:start + batch]
+                params = [
+                    f.get_db_prep_save(value, connection)
+                    for row in chunk
+                    for f, value in zip(fields, row)
+                ]
+                cursor.execute(
+                    f"INSERT INTO {table} ({columns}) VALUES "
+                    + ", ".join(["(" + ", ".join(["%s"] * len(fields)) + ")"] * len(chunk))
+                    + f" ON CONFLICT ({qn(fields[1].column)}, {qn(fields[2].column)}) DO UPDATE SET "
+                    f"{consumed_col} = {table}.{consumed_col} + excluded.{consumed_col}, "
+                    f"{added_col} = {table}.{added_col} + excluded.{added_col}",
+                    params,
+                )
+
+        consumption = {}
+        for (item_id, day), (_, consumed, _) in buckets.items():
+            if consumed:
+                consumption.setdefault(item_id, []).append((day, float(consumed)))
+        if not consumption:
+            return
+        # the fold is read-modify-write: re-read the rates under a row lock (in pk order, so
+        # concurrent writers queue instead of deadlocking) rather than trusting the caller's
+        # instances, which not every path has locked (adjust)
+        with transaction.atomic(using=self.db):
+            items = list(
+                InventoryItem.objects.select_for_update().filter(pk__in=consumption)
+                .only("consumption_rate", "consumption_rate_on").order_by("pk")
+            )
+            for item in items:
+                for day, consumed in sorted(consumption[item.pk]):
+                    item.fold_consumption(day, consumed)
+            InventoryItem.objects.bulk_update(items, ["consumption_rate", "consumption_rate_on"])
+        fresh = {item.pk: item for item in items}
+        for ev in events:
+            if ev.item_id in fresh and ConsumptionEvent.item.is_cached(ev):
+                ev.item.consumption_rate = fresh[ev.item_id].consumption_rate
+                ev.item.consumption_rate_on = fresh[ev.item_id].consumption_rate_on
+
+    def rebuild(self, owner_ids=None) -> int:
+        """Recompute rollups and item rates from the raw events (all owners or ``owner_ids``)."""
+        events = ConsumptionEvent.objects.order_by()
+        rollups = self.all()
+        items = InventoryItem.objects.all()
+        if owner_ids is not None:
+            events = events.filter(owner_id__in=owner_ids)
+            rollups = rollups.filter(owner_id__in=owner_ids)
+            items = items.filter(owner_id__in=owner_ids)
+
+        with transaction.atomic(using=self.db):
+            # lock the items first: concurrent accumulate() calls wait and fold on top of the result
+            items = list(items.select_for_update().only("consumption_rate", "consumption_rate_on").order_by("pk"))
+            rows = (
+                events.annotate(day=TruncDate("created_at"))
+                .values("owner_id", "item_id", "day")
+                .annotate(
+                    consumed=Sum("delta", filter=Q(delta__lt=0)),
+                    added=Sum("delta", filter=Q(delta__gt=0)),
+                )
+                .order_by("item_id", "day")
+            )
+            fresh = [
+                self.model(
+                    owner_id=r["owner_id"], item_id=r["item_id"], day=r["day"],
+                    consumed=-(r["consumed"] or 0), added=r["added"] or 0,
+                )
+                for r in rows
+            ]
+            rollups.delete()
+            self.bulk_create(fresh, batch_size=1000)
+
+            by_item = {}
+            for rollup in fresh:
+                if rollup.consumed:
+                    by_item.setdefault(rollup.item_id, []).append(rollup)
+            for item in items:
+                item.consumption_rate, item.consumption_rate_on = 0.0, None
+                for rollup in by_item.get(item.pk, ()):
+                    item.fold_consumption(rollup.day, float(rollup.consumed))
+            InventoryItem.objects.bulk_update(items, ["consumption_rate", "consumption_rate_on"], batch_size=1000)
+        return len(fresh)
+
+
+class ConsumptionRollup(models.Model):
+    """Per-item daily totals of ConsumptionEvent, kept in step by ConsumptionEvent.objects.record()."""
+
+    owner = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="consumption_rollups")
+    item = models.ForeignKey(InventoryItem, on_delete=models.CASCADE, related_name="rollups")
+    day = models.DateField()
+    consumed = models.DecimalField(max_digits=12, decimal_places=2, default=0)  # sum of -delta for delta < 0
+    added = models.DecimalField(max_digits=12, decimal_places=2, default=0)  # sum of delta for delta > 0
+
+    objects = ConsumptionRollupQuerySet.as_manager()
+
+    class Meta:
+        ordering = ["item", "-day"]
+        constraints = [
+            # upsert conflict target; also serves the per-item window sum
+            models.UniqueConstraint(fields=["item", "day"], name="inv_rollup_item_day_uniq"),
+        ]
+
+
+class ShoppingTaskQuerySet(models.QuerySet):
+    def add_pending(self, owner, entries, *, source: str = "manual") -> list:
+        """Create pending tasks for ``entries`` ({name, quantity?, unit?}) in one transaction.
+
+        Entries are deduped by canonical name (first wins) and skipped when a pending task already
+        has that name or is linked to the same inventory item; new tasks link to the owner's item of
+        that name. Two reads and one bulk insert; returns the created tasks.
+        """
+        rows = {}
+        for entry in entries:
+            name = (entry.get("name") or "").strip()
+            key = normalize_name(name)
+            if not key or key in rows:
+                continue
+            try:
+                qty = float(entry.get("quantity") or 1)
+            except (TypeError, ValueError):
+                qty = 1.0
+            rows[key] = (name, qty, entry.get("unit") or "pcs")
+        if not rows:
+            return []
+
+        with transaction.atomic(using=self.db):
+            # serialize with other creators for this user (see generate_from_low_stock)
+            get_user_model().objects.select_for_update().only("pk").get(pk=owner.pk)
+            pending = list(self.filter(owner=owner, status="pending").values_list("name", "item_id"))
+            taken_names = {normalize_name(name) for name, _ in pending}
+            taken_items = {item_id for _, item_id in pending if item_id is not None}
+            items = dict(
+                InventoryItem.objects.filter(owner=owner, normalized_name__in=list(rows)).values_list("normalized_name", "id")
+            )
+            return self.bulk_create([
+                self.model(owner=owner, item_id=items.get(key), name=name, quantity=qty, unit=unit, source=source)
+                for key, (name, qty, unit) in rows.items()
+                if key not in taken_names and items.get(key) not in taken_items
+            ])
 
 
 class ShoppingTask(models.Model):
@@ -79,8 +437,21 @@ class ShoppingTask(models.Model):
     due_date = models.DateField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = ShoppingTaskQuerySet.as_manager()
+
     class Meta:
         ordering = ["status", "-created_at"]
+        indexes = [
+            models.Index(fields=["owner", "status", "created_at"], name="inv_task_owner_status_idx"),
+        ]
+        constraints = [
+            # at most one pending task per inventory item (backs the low-stock anti-join)
+            models.UniqueConstraint(
+                fields=["item"],
+                condition=Q(status="pending", item__isnull=False),
+                name="inv_task_one_pending_per_item",
+            ),
+        ]
 
 
 class CookHistory(models.Model):
@@ -91,3 +462,18 @@ class CookHistory(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["owner", "created_at"], name="inv_cook_owner_created_idx"),
+        ]
+
+
+class InventorySummary(models.Model):
+    """Per-user dashboard snapshot, maintained incrementally by inventory.dashboard."""
+
+    owner = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="inventory_summary")
+    computed_on = models.DateField()
+    window_days = models.PositiveIntegerField(default=14)
+    low_stock_ids = models.JSONField(default=list)
+    near_expiry_ids = models.JSONField(default=list)
+    priority = models.JSONField(default=list)  # top INVENTORY_PRIORITY_LIMIT rows, most urgent first
+    updated_at = models.DateTimeField(auto_now=True)
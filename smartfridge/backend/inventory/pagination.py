@@ -0,0 +1,100 @@
+import base64
+import json
+
+from django.conf import settings
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class NameKeysetPagination(BasePagination):
+    """Keyset pagination on (name, id) with an opaque cursor.
+
+    Each page is a `WHERE (name, id) > (last_name, last_id) ORDER BY name, id LIMIT n`
+    query, so page N costs the same as page 1 (no OFFSET scan).
+    """
+
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    invalid_cursor_message = "Invalid cursor"
+
+    def __init__(self):
+        self.page_size = int(getattr(settings, "INVENTORY_PAGE_SIZE", 100))
+        self.max_page_size = int(getattr(settings, "INVENTORY_MAX_PAGE_SIZE", 500))
+        self.next_position = None
+        self.base_url = None
+
+    def get_page_size(self, request) -> int:
+        raw = request.query_params.get(self.page_size_query_param)
+        if raw and raw.isdigit() and int(raw) > 0:
+            return min(int(raw), self.max_page_size)
+        return self.page_size
+
+    def encode_cursor(self, position) -> str:
+        raw = json.dumps(list(position), ensure_ascii=False, separators=(",", ":"))
+        return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+    def decode_cursor(self, request):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None
+        try:
+            padded = token + "=" * (-len(token) % 4)
+            name, pk = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8"))
+            return str(name), int(pk)
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.base_url = request.build_absolute_uri()
+        page_size = self.get_page_size(request)
+        position = self.decode_cursor(request)
+
+        qs = queryset.order_by("name", "id")
+        if position is not None:
+            name, pk = position
+            qs = qs.filter(Q(name__gt=name) | Q(name=name, id__gt=pk))
+
+        # fetch one extra row to know whether a next page exists
+        rows = list(qs[: page_size + 1])
+        page = rows[:page_size]
+        self.next_position = (page[-1].name, page[-1].id) if len(rows) > page_size else None
+        return page
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        return replace_query_param(self.base_url, self.cursor_query_param, self.encode_cursor(self.next_position))
+
+    def get_paginated_response(self, data):
+        return Response({"next": self.get_next_link(), "results": data})
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Opaque cursor returned in `next`.",
+                "schema": {"type": "string"},
+            },
+            {
+                "name": self.page_size_query_param,
+                "required": False,
+                "in": "query",
+                "description": f"Items per page (max {self.max_page_size}).",
+                "schema": {"type": "integer"},
+            },
+        ]
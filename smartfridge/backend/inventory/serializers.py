@@ -2,7 +2,7 @@ from datetime import date
 
 from rest_framework import serializers
 
-from .models import InventoryItem, ConsumptionEvent, ShoppingTask, CookHistory
+from .models import InventoryItem, ConsumptionEvent, ShoppingTask, CookHistory, normalize_name
 
 
 class QuickAddItemSerializer(serializers.Serializer):
@@ -23,10 +23,11 @@ class QuickAddRequestSerializer(serializers.Serializer):
 class InventoryItemSerializer(serializers.ModelSerializer):
     days_to_expiry = serializers.SerializerMethodField()
     is_low_stock = serializers.SerializerMethodField()
+    daily_rate = serializers.SerializerMethodField()
 
     class Meta:
         model = InventoryItem
-        read_only_fields = ("id", "owner", "created_at", "updated_at", "days_to_expiry", "is_low_stock")
+        read_only_fields = ("id", "owner", "created_at", "updated_at", "days_to_expiry", "is_low_stock", "daily_rate")
         fields = (
             "id",
             "name",
@@ -44,15 +45,30 @@ class InventoryItemSerializer(serializers.ModelSerializer):
             "notes",
             "days_to_expiry",
             "is_low_stock",
+            "daily_rate",
             "created_at",
             "updated_at",
         )
 
+    def validate_name(self, value: str):
+        request = self.context.get("request")
+        if request is None or not normalize_name(value):
+            return value
+        clash = InventoryItem.objects.filter(owner=request.user).named(value)
+        if self.instance is not None:
+            clash = clash.exclude(pk=self.instance.pk)
+        if clash.exists():
+            raise serializers.ValidationError("An item with this name already exists.")
+        return value
+
     def get_days_to_expiry(self, obj: InventoryItem):
         if not obj.expiry_date:
             return None
         return (obj.expiry_date - date.today()).days
 
+    def get_daily_rate(self, obj: InventoryItem):
+        return round(obj.daily_rate(), 3)
+
     def get_is_low_stock(self, obj: InventoryItem):
         try:
             return obj.quantity <= obj.min_stock
@@ -100,6 +116,17 @@ class ShoppingTaskSerializer(serializers.ModelSerializer):
         )
         read_only_fields = ("id", "created_at")
 
+    def validate(self, attrs):
+        item = attrs.get("item", getattr(self.instance, "item", None))
+        status = attrs.get("status", getattr(self.instance, "status", "pending"))
+        if item is not None and status == "pending":
+            clash = ShoppingTask.objects.filter(item=item, status="pending")
+            if self.instance is not None:
+                clash = clash.exclude(pk=self.instance.pk)
+            if clash.exists():
+                raise serializers.ValidationError({"item": "This item already has a pending shopping task."})
+        return attrs
+
 
 class CookHistorySerializer(serializers.ModelSerializer):
     class Meta:
@@ -1,15 +1,30 @@
+import copy
+from decimal import Decimal
 from typing import Any
 
 from django.db import transaction
 from django.db import models as dj_models
-from django.db.models import Q, F, Sum
+from django.contrib.auth import get_user_model
+from django.db.models import Q, F, Exists, OuterRef
 from rest_framework import permissions, status, viewsets
 from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 
-from ai.shelf_life import estimate_expiry_date
-from .models import InventoryItem, ConsumptionEvent, ShoppingTask, CookHistory
+from ai.shelf_life import estimate_expiry_date, estimate_expiry_dates
+from .models import InventoryItem, ConsumptionEvent, ShoppingTask, CookHistory, normalize_name
+from .pagination import NameKeysetPagination
+from .dashboard import (
+    BEST_BEFORE_DAYS,
+    DEFAULT_WINDOW_DAYS,
+    MAX_PRIORITY_LIMIT,
+    MAX_WINDOW_DAYS,
+    PRIORITY_LIMIT,
+    USE_BY_DAYS,
+    get_snapshot,
+    items_changed,
+    live,
+)
 from .serializers import (
     InventoryItemSerializer,
     AdjustSerializer,
@@ -32,6 +47,7 @@ class IsOwner(permissions.BasePermission):
 class InventoryItemViewSet(viewsets.ModelViewSet):
     serializer_class = InventoryItemSerializer
     permission_classes = [permissions.IsAuthenticated, IsOwner]
+    pagination_class = NameKeysetPagination
 
     def get_queryset(self):
         qs = InventoryItem.objects.filter(owner=self.request.user)
@@ -58,10 +74,20 @@ class InventoryItemViewSet(viewsets.ModelViewSet):
             target = date.today() + timedelta(days=int(days_to))
             qs = qs.filter(expiry_date__lte=target)
 
-        return qs.order_by("name")
+        return qs.order_by("name", "id")
 
     def perform_create(self, serializer):
-        serializer.save(owner=self.request.user)
+        item = serializer.save(owner=self.request.user)
+        items_changed(self.request.user.id, [item.id])
+
+    def perform_update(self, serializer):
+        item = serializer.save()
+        items_changed(self.request.user.id, [item.id])
+
+    def perform_destroy(self, instance):
+        pk = instance.pk
+        instance.delete()
+        items_changed(self.request.user.id, [pk])
 
     @action(detail=True, methods=["post"], url_path="adjust")
     def adjust(self, request, pk=None):
@@ -86,6 +112,7 @@ class InventoryItemViewSet(viewsets.ModelViewSet):
                 delta=delta,
                 note=note,
             )
+            items_changed(request.user.id, [item.id])
         return Response({"quantity": str(item.quantity), "event_id": ev.id})
 
     @action(detail=False, methods=["post"], url_path="bulk")
@@ -94,12 +121,14 @@ class InventoryItemViewSet(viewsets.ModelViewSet):
         serializer.is_valid(raise_exception=True)
         items_data = serializer.validated_data["items"]
         created = []
-        for d in items_data:
-            d["owner"] = request.user.id
-            item_ser = InventoryItemSerializer(data=d)
-            item_ser.is_valid(raise_exception=True)
-            item = item_ser.save(owner=request.user)
-            created.append(InventoryItemSerializer(item).data)
+        with transaction.atomic():
+            for d in items_data:
+                d["owner"] = request.user.id
+                item_ser = InventoryItemSerializer(data=d, context=self.get_serializer_context())
+                item_ser.is_valid(raise_exception=True)
+                item = item_ser.save(owner=request.user)
+                created.append(InventoryItemSerializer(item).data)
+            items_changed(request.user.id, [d["id"] for d in created])
         return Response(created, status=status.HTTP_201_CREATED)
 
     @action(detail=False, methods=["post"], url_path="quick-add")
@@ -109,138 +138,118 @@ class InventoryItemViewSet(viewsets.ModelViewSet):
         serializer.is_valid(raise_exception=True)
         items = serializer.validated_data["items"]
 
+        rows = []
+        for row in items:
+            name = (row.get("name") or "").strip()
+            if not name:
+                continue
+            rows.append((normalize_name(name), name, row.get("quantity") or 1, row))
+
         results = []
+        if not rows:
+            return Response({"results": results}, status=status.HTTP_200_OK)
+
+        meta_fields = ["category", "location", "container", "expiry_type", "expiry_date"]
         with transaction.atomic():
-            for row in items:
-                name = (row.get("name") or "").strip()
-                if not name:
-                    continue
-                qty = row.get("quantity") or 1
+            # <= 2 queries: lock every matching item, create the missing ones (first row wins their metadata)
+            entries = {}
+            for key, name, _, row in rows:
+                entries.setdefault(key, {
+                    "name": name,
+                    "unit": (row.get("unit") or "").strip() or "pcs",
+                    "category": row.get("category") or "",
+                    "location": row.get("location") or "",
+                    "container": row.get("container") or "",
+                    "expiry_type": row.get("expiry_type") or "best_before",
+                    "expiry_date": row.get("expiry_date"),
+                })
+            by_key = InventoryItem.objects.lock_or_create_named(request.user, entries)
+
+            # fill missing metadata (do not overwrite unless empty) and total the increments
+            totals = {}
+            filled = {}
+            for key, _, qty, row in rows:
+                it = by_key[key]
+                for k in meta_fields:
+                    v = row.get(k)
+                    if v in [None, ""]:
+                        continue
+                    if getattr(it, k, None) in ["", None]:
+                        setattr(it, k, v)
+                        filled[it.pk] = it
                 unit = (row.get("unit") or "").strip()
-
-                # merge by case-insensitive name; if duplicates exist, pick the most recently updated
-                existing = (
-                    InventoryItem.objects.filter(owner=request.user, name__iexact=name)
-                    .order_by("-updated_at", "id")
-                    .first()
-                )
-                if existing is None:
-                    existing = InventoryItem.objects.create(
-                        owner=request.user,
-                        name=name,
-                        quantity=0,
-                        unit=unit or "pcs",
-                        category=row.get("category") or "",
-                        location=row.get("location") or "",
-                        container=row.get("container") or "",
-                        expiry_type=row.get("expiry_type") or "best_before",
-                        expiry_date=row.get("expiry_date"),
-                    )
-                else:
-                    # Optionally fill missing metadata (do not overwrite unless empty)
-                    changed = False
-                    for k in ["category", "location", "container", "expiry_type", "expiry_date"]:
-                        v = row.get(k)
-                        if v in [None, ""]:
-                            continue
-                        if getattr(existing, k, None) in ["", None]:
-                            setattr(existing, k, v)
-                            changed = True
-                    if unit and (existing.unit or "") == "":
-                        existing.unit = unit
-                        changed = True
-                    if changed:
-                        existing.save()
-
-                existing.quantity = F("quantity") + qty
-                existing.save(update_fields=["quantity", "updated_at"])
-                existing.refresh_from_db()
-                ConsumptionEvent.objects.create(
-                    owner=request.user,
-                    item=existing,
-                    action="add",
-                    delta=qty,
-                    note="quick-add",
-                )
-                results.append(InventoryItemSerializer(existing).data)
+                if unit and (it.unit or "") == "":
+                    it.unit = unit
+                    filled[it.pk] = it
+                totals[key] = totals.get(key, 0) + qty
+            if filled:
+                InventoryItem.objects.bulk_update(list(filled.values()), ["unit", *meta_fields])
+
+            # 1 query: a single CASE update applying every increment
+            InventoryItem.objects.add_quantities({by_key[key].pk: total for key, total in totals.items()})
+
+            # 1 query: read back the committed quantities
+            fresh = {it.pk: it for it in InventoryItem.objects.filter(pk__in=[by_key[key].pk for key in totals])}
+
+            # 1 query: all events
+            ConsumptionEvent.objects.record([
+                ConsumptionEvent(owner=request.user, item_id=by_key[key].pk, action="add", delta=qty, note="quick-add")
+                for key, _, qty, _ in rows
+            ])
+            items_changed(request.user.id, fresh)
+
+        # one result per row, carrying the running quantity right after that row was applied
+        running = {it.pk: it.quantity - totals[it.normalized_name] for it in fresh.values()}
+        for key, _, qty, _ in rows:
+            pk = by_key[key].pk
+            running[pk] += qty
+            snapshot = copy.copy(fresh[pk])
+            snapshot.quantity = running[pk]
+            results.append(InventoryItemSerializer(snapshot).data)
 
         return Response({"results": results}, status=status.HTTP_200_OK)
 
 
+def _bounded_param(request, name: str, default: int, maximum: int) -> int:
+    """Integer query parameter clamped to 1..maximum; the default when absent or not a number."""
+    try:
+        value = int(request.query_params.get(name, default))
+    except ValueError:
+        value = default
+    return min(max(value, 1), maximum)
+
+
 @extend_schema(responses={200: OpenApiTypes.OBJECT}, description="Dashboard summary: low stock, near expiry, priority")
 @api_view(["GET"])
 @permission_classes([permissions.IsAuthenticated])
 def summary(request):
-    from datetime import date, timedelta
-
-    use_by_days = 2
-    best_before_days = 5
-    today = date.today()
-    target_use_by = today + timedelta(days=use_by_days)
-    target_best_before = today + timedelta(days=best_before_days)
+    window_days = _bounded_param(request, "window_days", DEFAULT_WINDOW_DAYS, MAX_WINDOW_DAYS)
+    limit = _bounded_param(request, "limit", PRIORITY_LIMIT, MAX_PRIORITY_LIMIT)
+    if window_days == DEFAULT_WINDOW_DAYS and limit <= PRIORITY_LIMIT:
+        snapshot = get_snapshot(request.user.id)
+        data = {
+            "low_stock_ids": snapshot.low_stock_ids,
+            "near_expiry_ids": snapshot.near_expiry_ids,
+            "priority": snapshot.priority[:limit],
+        }
+    else:
+        # only the default window and top PRIORITY_LIMIT rows are snapshotted
+        data = live(request.user.id, window_days, limit)
 
     qs = InventoryItem.objects.filter(owner=request.user)
-    low_stock = qs.filter(quantity__lte=F("min_stock"))
-    near_expiry = (
-        qs.filter(expiry_date__isnull=False)
-        .filter(
-            Q(expiry_type="use_by", expiry_date__lte=target_use_by)
-            | Q(expiry_type="best_before", expiry_date__lte=target_best_before)
-        )
-        .order_by("expiry_date")
-    )
-    # priority list: combine near-expiry and days_to_empty (based on recent consumption)
-    window_days = int(request.query_params.get("window_days", 14))
-    from django.utils import timezone
-    since = timezone.now() - timedelta(days=window_days)
-    ev = (
-        ConsumptionEvent.objects.filter(owner=request.user, created_at__gte=since, delta__lt=0)
-        .values("item_id")
-        .annotate(total=Sum("delta"))
-    )
-    consumption_map = {e["item_id"]: float(-e["total"]) / max(window_days, 1) for e in ev}
-
-    priority = []
-    for item in qs:
-        rate = consumption_map.get(item.id, 0.0)
-        days_to_empty = None
-        if rate and rate > 0:
-            try:
-                days_to_empty = float(item.quantity) / rate
-            except Exception:
-                days_to_empty = None
-        # days to expiry
-        dte = None
-        if item.expiry_date:
-            dte = (item.expiry_date - today).days
-        # priority score: smaller is more urgent
-        candidates = [v for v in [dte, days_to_empty] if v is not None]
-        if not candidates:
-            continue
-        score = min(candidates)
-        reason = "expiry" if (dte is not None and dte == score) else "empty"
-        priority.append({
-            "id": item.id,
-            "name": item.name,
-            "quantity": float(item.quantity),
-            "unit": item.unit,
-            "days_to_expiry": dte,
-            "days_to_empty": round(days_to_empty, 2) if days_to_empty is not None else None,
-            "reason": reason,
-            "score": round(score, 2) if isinstance(score, float) else score,
-        })
-    priority.sort(key=lambda x: (x["score"] if x["score"] is not None else 1e9))
-    priority = priority[:10]
+    low_stock = qs.filter(id__in=data["low_stock_ids"])
+    near_expiry = qs.filter(id__in=data["near_expiry_ids"]).order_by("expiry_date")
 
     return Response({
         "low_stock": InventoryItemSerializer(low_stock, many=True).data,
         "near_expiry": InventoryItemSerializer(near_expiry, many=True).data,
-        "priority": priority,
+        "priority": data["priority"],
         "expiry_thresholds": {
-            "use_by_days": use_by_days,
-            "best_before_days": best_before_days,
+            "use_by_days": USE_BY_DAYS,
+            "best_before_days": BEST_BEFORE_DAYS,
         },
         "window_days": window_days,
+        "limit": limit,
     })
 
 
@@ -261,27 +270,42 @@ def cook(request):
             m = re.search(r"(-?\d+(?:\.\d+)?)", str(v))
             return float(m.group(1)) if m else 0.0
 
+    rows = []
+    for it in items:
+        name = str(it.get("name") or "").strip()
+        if not name:
+            continue
+        rows.append((normalize_name(name), name, to_float(it.get("quantity") or 0), it.get("unit") or ""))
+
     with transaction.atomic():
-        for it in items:
-            name = str(it.get("name") or "").strip()
-            if not name:
-                continue
-            qty = to_float(it.get("quantity") or 0)
-            unit = it.get("unit") or ""
-            matched = InventoryItem.objects.filter(owner=request.user, name__iexact=name).first()
+        # resolve every ingredient in one query; lock in id order so concurrent cooks cannot deadlock
+        matched = {
+            m.normalized_name: m
+            for m in InventoryItem.objects.select_for_update()
+            .filter(owner=request.user, normalized_name__in={key for key, _, _, _ in rows})
+            .order_by("id")
+        }
+
+        remaining = {m.pk: float(m.quantity) for m in matched.values()}
+        used_by_item = {}
+        events = []
+        for key, name, qty, unit in rows:
+            m = matched.get(key)
             used = 0.0
-            if matched and qty > 0:
-                matched.refresh_from_db()
-                current = float(matched.quantity)
-                used = min(qty, current)
-                matched.quantity = F("quantity") - used
-                matched.save(update_fields=["quantity"])
-                ConsumptionEvent.objects.create(owner=request.user, item=matched, action="consume", delta=-used, note=f"cook: {title}")
-                matched.refresh_from_db()
-            results.append({"name": name, "quantity": qty, "unit": unit, "item_id": matched.id if matched else None, "used": used})
-
-        # lazy import to avoid circular
-        from .models import CookHistory  # noqa: WPS433
+            if m and qty > 0:
+                used = min(qty, remaining[m.pk])
+                remaining[m.pk] -= used
+                used_by_item[m.pk] = used_by_item.get(m.pk, 0.0) + used
+                events.append(ConsumptionEvent(owner=request.user, item=m, action="consume", delta=-used, note=f"cook: {title}"))
+            results.append({"name": name, "quantity": qty, "unit": unit, "item_id": m.id if m else None, "used": used})
+
+        if used_by_item:
+            InventoryItem.objects.add_quantities(
+                {pk: -Decimal(str(used)) for pk, used in used_by_item.items()}, touch=False
+            )
+            ConsumptionEvent.objects.record(events)
+            items_changed(request.user.id, used_by_item)
+
         history = CookHistory.objects.create(owner=request.user, title=title, items=results)
 
     consumed_count = sum(1 for r in results if r.get("used", 0) > 0)
@@ -318,21 +342,26 @@ class ShoppingTaskViewSet(viewsets.ModelViewSet):
 
     @action(detail=False, methods=["post"], url_path="generate")
     def generate_from_low_stock(self, request):
-        created = []
-        low = InventoryItem.objects.filter(owner=request.user, quantity__lte=F("min_stock"))
-        for it in low:
-            exists = ShoppingTask.objects.filter(owner=request.user, status="pending", item=it).exists()
-            if exists:
-                continue
-            task = ShoppingTask.objects.create(
-                owner=request.user,
-                item=it,
-                name=it.name,
-                quantity=max(it.min_stock - it.quantity, 1),
-                unit=it.unit,
-                source="low_stock",
+        pending = ShoppingTask.objects.filter(item=OuterRef("pk"), status="pending")
+        with transaction.atomic():
+            # serialize concurrent "generate" calls per user; the partial unique constraint is the backstop
+            get_user_model().objects.select_for_update().only("pk").get(pk=request.user.pk)
+            low = (
+                InventoryItem.objects.filter(owner=request.user, quantity__lte=F("min_stock"))
+                .filter(~Exists(pending))
+                .order_by("name", "id")
             )
-            created.append(task)
+            created = ShoppingTask.objects.bulk_create([
+                ShoppingTask(
+                    owner=request.user,
+                    item=it,
+                    name=it.name,
+                    quantity=max(it.min_stock - it.quantity, 1),
+                    unit=it.unit,
+                    source="low_stock",
+                )
+                for it in low
+            ])
         return Response(ShoppingTaskSerializer(created, many=True).data, status=status.HTTP_201_CREATED)
 
     @action(detail=True, methods=["post"], url_path="purchase")
@@ -345,31 +374,34 @@ class ShoppingTaskViewSet(viewsets.ModelViewSet):
             qty = float(task.quantity)
         expiry_date = request.data.get("expiry_date")
 
+        # optional expiry update if provided
+        if not expiry_date:
+            expiry_date = estimate_expiry_date(task.name)
+        try:
+            from datetime import date as _date
+            expiry_date = _date.fromisoformat(str(expiry_date))
+        except Exception:
+            expiry_date = None
+
         with transaction.atomic():
             # If linked item, add to its quantity; otherwise create/merge item by name
             if task.item:
                 item = task.item
+                item.quantity = F("quantity") + qty
+                update_fields = ["quantity"]
+                if expiry_date:
+                    item.expiry_date = expiry_date
+                    update_fields.append("expiry_date")
+                item.save(update_fields=update_fields)
+                item.refresh_from_db()
             else:
-                item, _ = InventoryItem.objects.get_or_create(
-                    owner=request.user, name=task.name,
-                    defaults={"unit": task.unit, "quantity": 0}
+                item = InventoryItem.objects.upsert_add(
+                    request.user, task.name, qty, unit=task.unit, expiry_date=expiry_date, overwrite_expiry=True
                 )
-            item.quantity = F("quantity") + qty
-            update_fields = ["quantity"]
-            # optional expiry update if provided
-            if not expiry_date:
-                expiry_date = estimate_expiry_date(task.name)
-            try:
-                from datetime import date as _date
-                item.expiry_date = _date.fromisoformat(str(expiry_date))
-                update_fields.append("expiry_date")
-            except Exception:
-                pass
-            item.save(update_fields=update_fields)
-            item.refresh_from_db()
             ConsumptionEvent.objects.create(
                 owner=request.user, item=item, action="add", delta=qty, note=f"purchase task #{task.id}"
             )
+            items_changed(request.user.id, [item.id])
 
             task.status = "done"
             task.save(update_fields=["status"])
@@ -382,49 +414,88 @@ class ShoppingTaskViewSet(viewsets.ModelViewSet):
         if not isinstance(items, list):
             return Response({"detail": "items must be an array"}, status=status.HTTP_400_BAD_REQUEST)
         results = []
-        for row in items:
-            pk = row.get("id")
-            if not pk:
-                continue
+        errors = []
+
+        # validate ids, then fetch every task (and its item) in one query
+        wanted = []
+        seen = set()
+        for index, row in enumerate(items):
+            raw = row.get("id") if isinstance(row, dict) else None
             try:
-                task = ShoppingTask.objects.get(id=pk, owner=request.user)
-            except ShoppingTask.DoesNotExist:
+                pk = int(raw)
+            except (TypeError, ValueError):
+                errors.append({"index": index, "id": raw, "detail": "id is required" if not raw else "invalid id"})
+                continue
+            if pk in seen:
+                errors.append({"index": index, "id": pk, "detail": "duplicate id"})
+                continue
+            seen.add(pk)
+            wanted.append((index, pk, row))
+        tasks = ShoppingTask.objects.select_related("item").filter(owner=request.user).in_bulk([pk for _, pk, _ in wanted])
+
+        rows = []
+        for index, pk, row in wanted:
+            task = tasks.get(pk)
+            if task is None:
+                errors.append({"index": index, "id": pk, "detail": "not found"})
                 continue
             qty = row.get("quantity")
-            expiry_date = row.get("expiry_date")
             try:
                 qty = float(qty) if qty is not None else float(task.quantity)
             except Exception:
                 qty = float(task.quantity)
+            rows.append((task, Decimal(str(qty)), row.get("expiry_date")))
+
+        # shelf-life estimates may call the model: one batched call for all unknown names, outside the transaction
+        estimates = estimate_expiry_dates([t.name for t, _, exp in rows if not exp])
 
+        from datetime import date as _date
+
+        def parse_day(value):
+            try:
+                return _date.fromisoformat(str(value))
+            except Exception:
+                return None
+
+        if rows:
             with transaction.atomic():
-                if task.item:
-                    item = task.item
-                else:
-                    item, _ = InventoryItem.objects.get_or_create(
-                        owner=request.user, name=task.name,
-                        defaults={"unit": task.unit, "quantity": 0}
+                entries = {}
+                for task, _, _ in rows:
+                    if not task.item_id:
+                        entries.setdefault(normalize_name(task.name), {"name": task.name.strip(), "unit": task.unit})
+                by_key = InventoryItem.objects.lock_or_create_named(request.user, entries) if entries else {}
+
+                deltas = {}
+                expiry_dates = {}
+                item_ids = []
+                for task, qty, expiry_date in rows:
+                    item_id = task.item_id or by_key[normalize_name(task.name)].pk
+                    item_ids.append(item_id)
+                    deltas[item_id] = deltas.get(item_id, 0) + qty
+                    day = parse_day(expiry_date or estimates[task.name])
+                    if day:
+                        expiry_dates[item_id] = day
+
+                InventoryItem.objects.add_quantities(deltas, expiry_dates=expiry_dates)
+                fresh = InventoryItem.objects.in_bulk(list(deltas))
+                ConsumptionEvent.objects.record([
+                    ConsumptionEvent(
+                        owner=request.user, item_id=item_id, action="add", delta=qty,
+                        note=f"purchase task #{task.id} (batch)",
                     )
-                item.quantity = F("quantity") + qty
-                update_fields = ["quantity"]
-                if not expiry_date:
-                    expiry_date = estimate_expiry_date(task.name)
-                try:
-                    from datetime import date as _date
-                    item.expiry_date = _date.fromisoformat(str(expiry_date))
-                    update_fields.append("expiry_date")
-                except Exception:
-                    pass
-                item.save(update_fields=update_fields)
-                item.refresh_from_db()
-                ConsumptionEvent.objects.create(
-                    owner=request.user, item=item, action="add", delta=qty, note=f"purchase task #{task.id} (batch)"
-                )
-                task.status = "done"
-                task.save(update_fields=["status"])
-                results.append({"task": task.id, "item": item.id, "quantity": float(item.quantity)})
+                    for (task, qty, _), item_id in zip(rows, item_ids)
+                ])
+                ShoppingTask.objects.filter(id__in=[t.id for t, _, _ in rows]).update(status="done")
+                items_changed(request.user.id, deltas)
+
+            # report the running quantity right after each row, as the per-row loop used to
+            running = {pk: item.quantity - deltas[pk] for pk, item in fresh.items()}
+            for (task, qty, _), item_id in zip(rows, item_ids):
+                running[item_id] += qty
+                results.append({"task": task.id, "item": item_id, "quantity": float(running[item_id])})
 
-        return Response({"results": results})
+        errors.sort(key=lambda e: e["index"])
+        return Response({"results": results, "errors": errors})
 
 
     @action(detail=False, methods=["get"], url_path="summary")
@@ -432,56 +503,3 @@ class ShoppingTaskViewSet(viewsets.ModelViewSet):
         qs = self.get_queryset()
         by_source = qs.values("source").annotate(count=dj_models.Count("id"))
         return Response({"by_source": list(by_source), "total": qs.count()})
-
-
-@api_view(["POST"])
-@permission_classes([permissions.IsAuthenticated])
-def cook(request):
-    data = request.data or {}
-    title = str(data.get("title") or "Cooked")
-    items = data.get("items") or []
-    results = []
-
-    def to_float(v):
-        try:
-            return float(v)
-        except Exception:
-            import re
-            m = re.search(r"(-?\d+(?:\.\d+)?)", str(v))
-            return float(m.group(1)) if m else 0.0
-
-    with transaction.atomic():
-        for it in items:
-            name = str(it.get("name") or "").strip()
-            if not name:
-                continue
-            qty = to_float(it.get("quantity") or 0)
-            unit = it.get("unit") or ""
-            matched = InventoryItem.objects.filter(owner=request.user, name__iexact=name).first()
-            used = 0.0
-            if matched and qty > 0:
-                matched.refresh_from_db()
-                current = float(matched.quantity)
-                used = min(qty, current)
-                matched.quantity = F("quantity") - used
-                matched.save(update_fields=["quantity"])
-                ConsumptionEvent.objects.create(owner=request.user, item=matched, action="consume", delta=-used, note=f"cook: {title}")
-                matched.refresh_from_db()
-            results.append({"name": name, "quantity": qty, "unit": unit, "item_id": matched.id if matched else None, "used": used})
-
-        from .models import CookHistory  # ensure no circular
-        history = CookHistory.objects.create(owner=request.user, title=title, items=results)
-
-    consumed_count = sum(1 for r in results if r.get("used", 0) > 0)
-    return Response({"ok": True, "history_id": history.id, "consumed_count": consumed_count, "results": results})
-
-
-class CookHistoryViewSet(viewsets.ModelViewSet):
-    serializer_class = CookHistorySerializer
-    permission_classes = [permissions.IsAuthenticated]
-
-    def get_queryset(self):
-        return CookHistory.objects.filter(owner=self.request.user).order_by("-created_at")
-
-    def create(self, request, *args, **kwargs):
-        return Response(status=status.HTTP_405_METHOD_NOT_ALLOWED)
@@ -28,8 +28,18 @@ while true; do
   attempt=$((attempt + 1))
 done
 
-echo "[render_start] Starting gunicorn on 0.0.0.0:${PORT}..."
-exec gunicorn server.wsgi:application \
+# AI_ASYNC_VIEWS=1 serves the AI endpoints as async views: run the ASGI app on uvicorn workers
+# (uvicorn is in requirements.txt).
+# same test as settings.AI_ASYNC_VIEWS: case-insensitive 1/true/yes
+async_views="$(printf '%s' "${AI_ASYNC_VIEWS:-}" | tr '[:upper:]' '[:lower:]')"
+case "${async_views}" in
+  1|true|yes) APP="server.asgi:application"; WORKER_CLASS="uvicorn.workers.UvicornWorker" ;;
+  *) APP="server.wsgi:application"; WORKER_CLASS="sync" ;;  # gunicorn's default
+esac
+
+echo "[render_start] Starting gunicorn (${APP}, ${WORKER_CLASS} workers) on 0.0.0.0:${PORT}..."
+exec gunicorn "${APP}" \
+  --worker-class "${WORKER_CLASS}" \
   --bind "0.0.0.0:${PORT}" \
   --workers "${WEB_CONCURRENCY:-2}" \
   --timeout "${GUNICORN_TIMEOUT:-120}" \
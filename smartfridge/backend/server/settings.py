@@ -117,6 +117,37 @@ REST_FRAMEWORK = {
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
 }
 
+# Inventory list: keyset page size (?page_size= may override up to the max)
+INVENTORY_PAGE_SIZE = int(os.getenv("INVENTORY_PAGE_SIZE", "100"))
+INVENTORY_MAX_PAGE_SIZE = int(os.getenv("INVENTORY_MAX_PAGE_SIZE", "500"))
+# rows kept in the dashboard priority snapshot; larger ?limit= values are computed live
+INVENTORY_PRIORITY_LIMIT = int(os.getenv("INVENTORY_PRIORITY_LIMIT", "10"))
+# EWMA half-life of per-item consumption rates (days)
+INVENTORY_RATE_HALF_LIFE_DAYS = float(os.getenv("INVENTORY_RATE_HALF_LIFE_DAYS", "7"))
+# shelf-life knowledge: AI answers are re-asked after this many days; per-process LRU in front
+SHELF_LIFE_TTL_DAYS = int(os.getenv("SHELF_LIFE_TTL_DAYS", "90"))
+SHELF_LIFE_LRU_SIZE = int(os.getenv("SHELF_LIFE_LRU_SIZE", "1024"))
+SHELF_LIFE_LRU_TTL = float(os.getenv("SHELF_LIFE_LRU_TTL", "300"))
+# AI prompt inventory context: cached per user and inventory version (seconds; uses CACHES)
+AI_CONTEXT_CACHE_TTL = int(os.getenv("AI_CONTEXT_CACHE_TTL", "600"))
+# background AI jobs (manage.py run_ai_jobs): retries, limits and how long results stay pollable
+AI_JOB_MAX_ATTEMPTS = int(os.getenv("AI_JOB_MAX_ATTEMPTS", "3"))
+AI_JOB_RETRY_BACKOFF = float(os.getenv("AI_JOB_RETRY_BACKOFF", "10"))  # seconds, doubled per attempt
+AI_JOB_RESULT_TTL = int(os.getenv("AI_JOB_RESULT_TTL", "3600"))
+AI_JOB_LEASE_SECONDS = int(os.getenv("AI_JOB_LEASE_SECONDS", "300"))  # running longer = worker lost
+AI_JOB_WORKER_CONCURRENCY = int(os.getenv("AI_JOB_WORKER_CONCURRENCY", "2"))
+AI_JOB_MAX_RUNNING_PER_USER = int(os.getenv("AI_JOB_MAX_RUNNING_PER_USER", "1"))
+AI_JOB_MAX_QUEUED_PER_USER = int(os.getenv("AI_JOB_MAX_QUEUED_PER_USER", "10"))
+AI_JOB_MAX_WAIT = float(os.getenv("AI_JOB_MAX_WAIT", "25"))  # long-poll cap on jobs/<id>/?wait=
+# serve the AI endpoints with native async views (aiapi.async_views); enable under ASGI only
+AI_ASYNC_VIEWS = os.getenv("AI_ASYNC_VIEWS", "False").lower() in {"1", "true", "yes"}
+# answer plain add/import assistant commands with local rules instead of a model call
+AI_ASSISTANT_FAST_PATH = os.getenv("AI_ASSISTANT_FAST_PATH", "True").lower() in {"1", "true", "yes"}
+# identical concurrent menu/suggest-shopping requests share one model call (aiapi.singleflight)
+AI_SINGLE_FLIGHT = os.getenv("AI_SINGLE_FLIGHT", "True").lower() in {"1", "true", "yes"}
+AI_SINGLE_FLIGHT_WAIT = float(os.getenv("AI_SINGLE_FLIGHT_WAIT", "60"))  # then a duplicate calls on its own
+AI_SINGLE_FLIGHT_GRACE = float(os.getenv("AI_SINGLE_FLIGHT_GRACE", "2"))  # result kept for late duplicates
+
 SPECTACULAR_SETTINGS = {
     "TITLE": "SmartPantry API",
     "DESCRIPTION": "MVP API for inventory, planning and AI suggestions.",
@@ -8,6 +8,8 @@ import QuickAddBar from '../components/QuickAddBar.jsx'
 
 export default function Inventory() {
   const [items, setItems] = useState([])
+  const [nextUrl, setNextUrl] = useState(null)
+  const [loadingMore, setLoadingMore] = useState(false)
   const [loading, setLoading] = useState(true)
   const [q, setQ] = useState('')
   const [error, setError] = useState(null)
@@ -29,7 +31,8 @@ export default function Inventory() {
     setLoading(true)
     try {
       const { data } = await api.get('/api/v1/inventory/items/', { params })
-      setItems(data)
+      setItems(data.results)
+      setNextUrl(data.next)
       setError(null)
     } catch (e) {
       setError('Load failed')
@@ -38,6 +41,20 @@ export default function Inventory() {
     }
   }
 
+  const fetchMore = async () => {
+    if (!nextUrl) return
+    setLoadingMore(true)
+    try {
+      const { data } = await api.get(nextUrl)
+      setItems((prev) => prev.concat(data.results))
+      setNextUrl(data.next)
+    } catch (e) {
+      setError('Load failed')
+    } finally {
+      setLoadingMore(false)
+    }
+  }
+
   useEffect(() => { fetchItems() }, [])
 
   return (
@@ -116,6 +133,11 @@ export default function Inventory() {
               </div>
             </div>
           ))}
+          {nextUrl && (
+            <div className="px-5 py-3 flex justify-center">
+              <button className="btn-ghost" disabled={loadingMore} onClick={fetchMore}>{loadingMore ? 'Loading…' : 'Load more'}</button>
+            </div>
+          )}
         </div>
       )}
 
@@ -1,5 +1,5 @@
 import { useState, useEffect } from 'react'
-import api from '../lib/apiClient.js'
+import api, { postEventStream } from '../lib/apiClient.js'
 import Reveal from '../components/Reveal.jsx'
 import { formatUKDateTime } from '../lib/ukDate.js'
 
@@ -14,12 +14,31 @@ export default function Planner() {
 
   const generate = async () => {
     setLoading(true)
+    setError(null)
+    const body = { days, meals_per_day: meals, language: 'en' }
+    let streamed = false
     try {
-      const { data } = await api.post('/api/v1/ai/menu/', { days, meals_per_day: meals, language: 'en' })
-      setData(data)
-      setError(null)
+      // days appear as soon as the model has finished each one
+      setData({ plan: [] })
+      await postEventStream('/api/v1/ai/menu/stream/', body, (event, payload) => {
+        streamed = true
+        if (event === 'day') setData(d => ({ ...d, plan: [...(d?.plan || []), payload] }))
+        else if (event === 'done') setData(d => ({ ...d, shopping_diff: payload.shopping_diff }))
+        else if (event === 'error') setError(payload?.detail || 'Failed to generate')
+      })
     } catch (e) {
-      setError(e?.response?.data?.detail || 'Failed to generate')
+      if (streamed) {
+        setError('Connection lost while generating')
+      } else {
+        // stream unavailable (e.g. expired token): fall back to the blocking endpoint
+        try {
+          const { data } = await api.post('/api/v1/ai/menu/', body)
+          setData(data)
+        } catch (e2) {
+          setData(null)
+          setError(e2?.response?.data?.detail || 'Failed to generate')
+        }
+      }
     } finally { setLoading(false) }
   }
 
@@ -140,7 +140,10 @@ export default function Shopping() {
         actions={<button className="btn-primary" onClick={async()=>{
           try {
             const payload = { items: batchRows.map(r=>({ id: r.id, quantity: r.quantity, expiry_date: r.expiry_date })) }
-            await api.post('/api/v1/inventory/shopping/purchase-batch/', payload)
+            const { data } = await api.post('/api/v1/inventory/shopping/purchase-batch/', payload)
+            if (data.errors && data.errors.length) {
+              alert(`${data.errors.length} item(s) skipped: ` + data.errors.map(e=>`#${e.id ?? '?'} ${e.detail}`).join(', '))
+            }
             setOpenBatch(false)
             load()
           } catch(e) { alert('Stock-in failed') }